@@ -179,10 +179,13 @@ function getGitHubAPI(){
 
 let gitHubData={},OWNERS={},vendors=[],expenses=[],csvData=[],propertySettings={},currentOwner="",masterTotals={},propertyTotals={},taxByProperty={},githubToken="";
 let sessionExpenses=[];
+// Same codes as guesty_reports/tax.py MUNICIPALITIES; change both together.
 const municipalities=["SC","MB","NMB","SSB","HC"];
 
 function num(v){return parseFloat((v||"0").toString().replace(/[$,]/g,""))||0;}
 function money(v){return"$"+(Number(v)||0).toFixed(2);}
+function currentPeriod(){return document.getElementById("yearSelect").value+"-"+("0"+document.getElementById("monthSelect").value).slice(-2);}
+function expenseApplies(e,prop){return e.property===prop&&e.owner===currentOwner&&(!e.period||e.period===currentPeriod());}
 
 function updateTokenStatus(){
   const status=document.getElementById("tokenStatus");
@@ -333,17 +336,18 @@ function loadData(){
     return r.json();
   })
   .then(fileData=>{
-    const contentB64=fileData.content;
-    const contentDecoded=atob(contentB64);
-    const data=JSON.parse(contentDecoded);
+    const data=decodeContent(fileData.content);
     
     gitHubData=data;
-    OWNERS=data.owners||{};
-    vendors=data.vendors||[];
-    expenses=data.expenses||[];
-    propertySettings=data.properties||{};
+    syncedData=cloneData(data);
+    // Edits journaled by an earlier session that never reached GitHub.
+    adoptData(localBase());
     init();
     updateTokenStatus();
+    if(pendingEdits.length){
+      firstEditAt=lastEditAt=Date.now();
+      scheduleFlush();
+    }
   })
   .catch(e=>{
     init();
@@ -365,10 +369,11 @@ function init(){
 function buildOwners(){
   const sel=document.getElementById("ownerSelect");
   const current=sel.value;
-  sel.innerHTML='<option value="">-- SELECT --</option>';
+  let html='<option value="">-- SELECT --</option>';
   Object.keys(OWNERS).sort().forEach(name=>{
-    sel.innerHTML+="<option>"+name+"</option>";
+    html+="<option>"+name+"</option>";
   });
+  sel.innerHTML=html;
   if(current && OWNERS[current]){
     sel.value=current;
   }
@@ -377,18 +382,22 @@ function buildOwners(){
 function buildMonths(){
   const sel=document.getElementById("monthSelect");
   const months=["JANUARY","FEBRUARY","MARCH","APRIL","MAY","JUNE","JULY","AUGUST","SEPTEMBER","OCTOBER","NOVEMBER","DECEMBER"];
+  let html="";
   months.forEach((m,i)=>{
-    sel.innerHTML+="<option value='"+(i+1)+"'>"+m+"</option>";
+    html+="<option value='"+(i+1)+"'>"+m+"</option>";
   });
+  sel.innerHTML=html;
   sel.value=new Date().getMonth()+1;
 }
 
 function buildYears(){
   const sel=document.getElementById("yearSelect");
   const y=new Date().getFullYear();
+  let html="";
   for(let i=y-2;i<=y+2;i++){
-    sel.innerHTML+="<option>"+i+"</option>";
+    html+="<option>"+i+"</option>";
   }
+  sel.innerHTML=html;
   sel.value=y;
 }
 
@@ -547,67 +556,152 @@ function saveVendorData(){
   });
 }
 
+// Write-behind save queue, the browser side of guesty_reports/writequeue.py.
+// Saves become edit operations (same vocabulary as writequeue.apply_op),
+// journaled in localStorage so a closed tab or a failed request loses
+// nothing. Edits landing within SAVE_WINDOW ms of each other go out as one
+// commit; each attempt re-reads data.json and replays the edits on top of
+// it, so a conflicting save merges instead of overwriting, and failures
+// back off exponentially with full jitter.
+const SAVE_WINDOW=2000,SAVE_MAX_DELAY=10000,SAVE_ATTEMPTS=6,SAVE_BACKOFF_BASE=500,SAVE_BACKOFF_CAP=30000;
+let syncedData=null,pendingEdits=JSON.parse(localStorage.getItem("pending_edits")||"[]");
+let saveCallbacks=[],saveTimer=null,saveInFlight=false,firstEditAt=null,lastEditAt=null;
+
+function cloneData(d){return JSON.parse(JSON.stringify({owners:d.owners||{},vendors:d.vendors||[],properties:d.properties||{},expenses:d.expenses||[]}));}
+function currentData(){return cloneData({owners:OWNERS,vendors:vendors,properties:propertySettings,expenses:expenses});}
+function adoptData(d){OWNERS=d.owners;vendors=d.vendors;propertySettings=d.properties;expenses=d.expenses;}
+function decodeContent(b64){return JSON.parse(decodeURIComponent(escape(atob(b64.replace(/\n/g,"")))));}
+function encodeContent(d){return btoa(unescape(encodeURIComponent(JSON.stringify(d,null,2))));}
+
+function applyEdit(d,op){
+  if(op.op==="set_owner")d.owners[op.name]=op.config;
+  else if(op.op==="delete_owner")delete d.owners[op.name];
+  else if(op.op==="set_property")d.properties[op.name]=op.settings;
+  else if(op.op==="add_vendor"){d.vendors=d.vendors.filter(v=>v.id!==op.vendor.id);d.vendors.push(op.vendor);}
+  else if(op.op==="delete_vendor")d.vendors=d.vendors.filter(v=>v.id!==op.id);
+  else if(op.op==="add_expense"){d.expenses=d.expenses.filter(e=>e.id!==op.expense.id);d.expenses.push(op.expense);}
+  else if(op.op==="delete_expense")d.expenses=d.expenses.filter(e=>e.id!==op.id);
+}
+
+function diffEdits(base,cur){
+  const ops=[],same=(a,b)=>JSON.stringify(a)===JSON.stringify(b);
+  Object.keys(cur.owners).forEach(n=>{if(!same(base.owners[n],cur.owners[n]))ops.push({op:"set_owner",name:n,config:cur.owners[n]});});
+  Object.keys(base.owners).forEach(n=>{if(!(n in cur.owners))ops.push({op:"delete_owner",name:n});});
+  Object.keys(cur.properties).forEach(n=>{if(!same(base.properties[n],cur.properties[n]))ops.push({op:"set_property",name:n,settings:cur.properties[n]});});
+  [["vendors","vendor"],["expenses","expense"]].forEach(([key,one])=>{
+    const old={};
+    base[key].forEach(x=>old[x.id]=x);
+    const ids=new Set(cur[key].map(x=>x.id));
+    cur[key].forEach(x=>{if(!same(old[x.id],x))ops.push({op:"add_"+one,[one]:x});});
+    base[key].forEach(x=>{if(!ids.has(x.id))ops.push({op:"delete_"+one,id:x.id});});
+  });
+  return ops;
+}
+
+function localBase(){
+  const d=cloneData(syncedData||{});
+  pendingEdits.forEach(op=>applyEdit(d,op));
+  return d;
+}
+
+function writeJournal(){localStorage.setItem("pending_edits",JSON.stringify(pendingEdits));}
+
 function saveToGitHub(type,callback){
   if(!githubToken){
     alert("❌ No token");
     return;
   }
-  
-  const data=JSON.stringify({owners:OWNERS,vendors:vendors,properties:propertySettings,expenses:expenses},null,2);
-  const content=btoa(unescape(encodeURIComponent(data)));
-  
-  function attemptSave(retryCount=0){
-    fetch(getGitHubAPI(),{headers:{"Authorization":"token "+githubToken}})
-      .then(r=>{
-        if(r.status===404){
-          return {sha:null, create:true};
-        }
-        if(!r.ok)throw new Error("GET failed: "+r.status);
-        return r.json().then(data=>({sha:data.sha, create:false}));
-      })
-      .then(({sha,create})=>{
-        const body={message:"Update "+type,content:content};
-        if(sha) body.sha=sha;
-        
+  diffEdits(localBase(),currentData()).forEach(op=>{op.message=type;pendingEdits.push(op);});
+  writeJournal();
+  if(callback)saveCallbacks.push(callback);
+  const now=Date.now();
+  firstEditAt=firstEditAt||now;
+  lastEditAt=now;
+  scheduleFlush();
+}
+
+function scheduleFlush(){
+  clearTimeout(saveTimer);
+  if(!pendingEdits.length&&!saveCallbacks.length)return;
+  const due=Math.min(lastEditAt+SAVE_WINDOW,firstEditAt+SAVE_MAX_DELAY);
+  saveTimer=setTimeout(flushEdits,Math.max(0,due-Date.now()));
+}
+
+function fetchRemote(){
+  return fetch(getGitHubAPI(),{headers:{"Authorization":"token "+githubToken},cache:"no-store"})
+    .then(r=>{
+      if(r.status===404)return {data:cloneData({}),sha:null};
+      if(!r.ok)throw new Error("GET failed: "+r.status);
+      return r.json().then(f=>({data:cloneData(decodeContent(f.content)),sha:f.sha}));
+    });
+}
+
+function flushEdits(){
+  if(saveInFlight)return;
+  const batch=pendingEdits.slice(),callbacks=saveCallbacks;
+  saveCallbacks=[];
+  if(!batch.length){
+    callbacks.forEach(cb=>cb());
+    return;
+  }
+  saveInFlight=true;
+  const message="Update "+[...new Set(batch.map(op=>op.message))].sort().join(", ");
+  let attempt=0;
+  function tryCommit(){
+    fetchRemote()
+      .then(({data,sha})=>{
+        const merged=cloneData(data);
+        batch.forEach(op=>applyEdit(merged,op));
+        const body={message:message,content:encodeContent(merged)};
+        if(sha)body.sha=sha;
         return fetch(getGitHubAPI(),{
           method:"PUT",
           headers:{"Authorization":"token "+githubToken,"Content-Type":"application/json"},
           body:JSON.stringify(body)
-        }).then(r=>({response:r,sha:sha}));
+        }).then(r=>{
+          // 409: data.json changed since the GET; the retry replays onto the new copy.
+          if(!r.ok)throw new Error("PUT failed: "+r.status);
+          return merged;
+        });
       })
-      .then(({response,sha})=>{
-        if(response.status===409){
-          if(retryCount<3){
-            setTimeout(()=>attemptSave(retryCount+1), 2000);
-          }else{
-            alert("❌ Could not save after 4 attempts");
-          }
-          return;
-        }
-        
-        if(response.ok||response.status===200||response.status===201){
-          if(callback)callback();
-          return;
-        }
-        
-        throw new Error("PUT failed: "+response.status);
+      .then(merged=>{
+        // Keep edits made since the batch was taken on top of the merged copy.
+        const unsaved=diffEdits(localBase(),currentData());
+        syncedData=merged;
+        pendingEdits=pendingEdits.slice(batch.length);
+        writeJournal();
+        const d=localBase();
+        unsaved.forEach(op=>applyEdit(d,op));
+        adoptData(d);
+        saveInFlight=false;
+        firstEditAt=lastEditAt=pendingEdits.length?Date.now():null;
+        scheduleFlush();
+        callbacks.forEach(cb=>cb());
       })
       .catch(e=>{
-        if(retryCount<3){
-          setTimeout(()=>attemptSave(retryCount+1), 2000);
+        attempt++;
+        if(attempt<SAVE_ATTEMPTS){
+          setTimeout(tryCommit,Math.random()*Math.min(SAVE_BACKOFF_CAP,SAVE_BACKOFF_BASE*2**attempt));
+          return;
         }
+        // Out of retries: the edits stay journaled and go out with the next window.
+        saveInFlight=false;
+        saveCallbacks=callbacks.concat(saveCallbacks);
+        firstEditAt=lastEditAt=Date.now();
+        scheduleFlush();
+        alert("❌ Could not save yet ("+e.message+"); changes are kept and will be retried");
       });
   }
-  
-  attemptSave();
+  tryCommit();
 }
 
 function updateVendorDropdown(){
   const sel=document.getElementById("expenseVendor");
-  sel.innerHTML="<option>-- SELECT --</option>";
+  let html="<option>-- SELECT --</option>";
   vendors.forEach(v=>{
-    sel.innerHTML+="<option>"+v.name+"</option>";
+    html+="<option>"+v.name+"</option>";
   });
+  sel.innerHTML=html;
 }
 
 function openAddExpense(){
@@ -618,10 +712,11 @@ function openAddExpense(){
   document.getElementById("expenseFormContent").style.display="block";
   document.getElementById("expenseListDisplay").style.display="none";
   const prop=document.getElementById("expenseProperty");
-  prop.innerHTML="<option>-- SELECT --</option>";
+  let html="<option>-- SELECT --</option>";
   Object.keys(propertyTotals).forEach(p=>{
-    prop.innerHTML+="<option>"+p+"</option>";
+    html+="<option>"+p+"</option>";
   });
+  prop.innerHTML=html;
   document.getElementById("expenseType").value="MAINTENANCE";
   document.getElementById("expenseProperty").value="";
   document.getElementById("expenseVendor").value="";
@@ -638,7 +733,7 @@ function submitExpense(){
   if(!currentOwner||!prop||!vendor||!amount)return alert("Fill all fields");
   
   const expenseId=Date.now();
-  expenses.push({id:expenseId,owner:currentOwner,type:type,property:prop,vendor:vendor,amount:amount,notes:document.getElementById("expenseNotes").value});
+  expenses.push({id:expenseId,owner:currentOwner,type:type,property:prop,vendor:vendor,amount:amount,period:currentPeriod(),notes:document.getElementById("expenseNotes").value});
   sessionExpenses.push({id:expenseId,type:type,property:prop,vendor:vendor,amount:amount});
   
   document.getElementById("expenseType").value="MAINTENANCE";
@@ -808,7 +903,7 @@ function processData(){
         }
       }
     });
-    const exp=expenses.filter(e=>e.property===prop&&e.owner===currentOwner).reduce((sum,e)=>sum+e.amount,0);
+    const exp=expenses.filter(e=>expenseApplies(e,prop)).reduce((sum,e)=>sum+e.amount,0);
     const draft=pmc+clean+websiteFee+exp;
     const owner=acc-pmc-exp;
     propertyTotals[prop]={gross:gross,acc:acc,clean:clean,pmc:pmc,websiteFee:websiteFee,vrboFee:vrboFee,expenses:exp,draft:draft,owner:owner,tax:totalTax,reservations:byProp[prop]};
@@ -853,7 +948,7 @@ function displayStatement(){
   Object.keys(propertyTotals).forEach(prop=>{
     const p=propertyTotals[prop];
     const r=type==="draft"?p.draft:p.owner;
-    const exp=expenses.filter(e=>e.property===prop&&e.owner===currentOwner);
+    const exp=expenses.filter(e=>expenseApplies(e,prop));
     html+="<div class='property-section'><div class='property-title'><span class='property-icon'>🏠</span>"+prop.toUpperCase()+"</div>";
     
     if(type==="draft"){
@@ -0,0 +1,5 @@
+"""Python statement engine for the Ocean Vacations Guesty reports."""
+
+from .engine import Statement, Totals, load_export, prepare, process_data
+
+__all__ = ["Statement", "Totals", "load_export", "prepare", "process_data"]
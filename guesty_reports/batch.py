@@ -0,0 +1,258 @@
+"""Month-close batch run: every owner's statement from one export.
+
+    python -m guesty_reports.batch export.csv --data data.json \\
+        --month 9 --year 2026 --out statements/ [--format pdf] \\
+        [--snapshots snapshots.db] [--history history.db] [--income income.db] \\
+        [--trace trace.json]
+
+The export is streamed once in the parent, keeping only the projected
+columns and the month's rows. Those rows are handed to each worker
+process once, at start-up, and the per-owner aggregation and rendering
+run in parallel. Owners with listings in the ownership registry (see
+``registry``) get only their listings' rows, split once in the parent;
+owners without get only the rows on listings nobody is registered for,
+and when the registry is empty every owner gets the whole export, as
+before. The derived per-reservation columns are worked out in the parent
+once per distinct owner configuration and handed to the workers; with
+``--cache`` they are read from (or added to) the cached export. With
+``--snapshots`` each owner's monthly totals are also recorded for the
+year-to-date 1099 rollup, and ``--history`` keeps every generated
+statement for later lookup. ``--income`` adds the month to the
+income/GRI cube. ``--trace`` writes a Chrome trace of the run, worker
+processes included, and prints time per stage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import trace
+from .cache import ExportCache
+from .derived import DerivedColumns, config_key, take
+from .history import HistoryStore, Record, make_record
+from .income import IncomeCube
+from .ingest import read_export
+from .ledger import ExpenseLedger
+from .pdf import write_statement_pdf
+from .registry import OwnershipRegistry, owner_rows, owner_statement
+from .render import write_statement
+from .snapshots import SnapshotStore, snapshot_rows
+from .sync import ReservationStore
+from .store import load_data, owner_key
+
+# Per-process state installed by ``_init_worker``.
+_ROWS = None
+_DATA = None
+_LEDGER = None
+_SPLIT: dict = {}
+_DERIVED: dict = {}
+
+
+@dataclass
+class OwnerResult:
+    owner: str
+    path: str | None
+    seconds: float
+    error: str | None = None
+    snapshot: list[tuple] | None = None
+    record: Record | None = None
+    trace: dict | None = None
+
+
+def _init_worker(rows, data, split: dict, derived: dict, traced: bool = False) -> None:
+    global _ROWS, _DATA, _LEDGER, _SPLIT, _DERIVED
+    _ROWS, _DATA, _SPLIT, _DERIVED = rows, data, split, derived
+    _LEDGER = ExpenseLedger(data["expenses"])
+    if traced:
+        trace.enable(trace.Tracer("batch worker"))
+
+
+def _run_owner(
+    owner: str, year: int, month: int, out_dir: str, fmt: str, keep: bool = False
+) -> OwnerResult:
+    start = time.perf_counter()
+    try:
+        config = _DATA["owners"][owner]
+        statement = owner_statement(
+            _ROWS, owner, config, year, month, _LEDGER, _SPLIT, derived=_DERIVED.get(config_key(config))
+        )
+        # The key, unlike the bare slug, is distinct for distinct owners.
+        path = Path(out_dir) / f"{owner_key(owner)}-{year}-{month:02d}.{fmt}"
+        if fmt == "pdf":
+            write_statement_pdf(path, statement, _LEDGER)
+        else:
+            write_statement(path, statement, _LEDGER)
+        record = make_record(statement, _LEDGER, path.read_bytes(), fmt) if keep else None
+        result = OwnerResult(
+            owner, str(path), time.perf_counter() - start,
+            snapshot=snapshot_rows(statement), record=record,
+        )
+    except Exception:
+        result = OwnerResult(owner, None, time.perf_counter() - start, traceback.format_exc())
+    tracer = trace.current()
+    if tracer is not None:
+        result.trace = tracer.drain()
+    return result
+
+
+def run_batch(
+    export,
+    data: dict,
+    year: int,
+    month: int,
+    out_dir,
+    owners: list[str] | None = None,
+    workers: int | None = None,
+    cache: ExportCache | None = None,
+    fmt: str = "html",
+    snapshots: SnapshotStore | None = None,
+    history: HistoryStore | None = None,
+    income: IncomeCube | None = None,
+) -> list[OwnerResult]:
+    """Write one statement per owner and return per-owner results."""
+    positions = None
+    if str(export).endswith(".db"):
+        store = ReservationStore(export, readonly=True)
+        rows = store.frame([(year, month)])
+        store.close()
+    elif cache is not None:
+        digest = cache.digest(export)
+        parsed = digest in cache
+        frame, index = cache.load_indexed(export)
+        if parsed:
+            # Parsed by an earlier run: report what that parse read and dropped.
+            read = cache.rows_read(digest)
+            trace.count("rows_read", read)
+            trace.count("rows_skipped", read - len(frame))
+        positions = index.rows(year, month)
+        trace.count("rows_skipped", len(frame) - len(positions))
+        rows = frame.iloc[positions]
+        layers = DerivedColumns(cache)
+        layers.prune(digest, data["owners"].values())
+    else:
+        rows = read_export(export, [(year, month)])
+    if positions is None:
+        # No cache: derived columns of the month's rows, kept for this run.
+        frame, digest, layers = rows, "month", DerivedColumns()
+
+    def month_rows(columns: dict) -> dict:
+        return columns if positions is None else take(columns, positions)
+
+    if income is not None:
+        income.ingest(rows, month_rows(layers.base(digest, frame)))
+    owners = sorted(owners or data["owners"])
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    missing = [o for o in owners if o not in data["owners"]]
+    results = [OwnerResult(o, None, 0.0, "unknown owner") for o in missing]
+    todo = [o for o in owners if o in data["owners"]]
+    if not todo:
+        return results
+
+    registry = OwnershipRegistry.from_owners(data["owners"])
+    # Owners whose listings overlap another's would get the wrong rows.
+    conflicted = [o for o in todo if o in registry.conflicts]
+    results += [
+        OwnerResult(o, None, 0.0, "overlapping ownership: " + "; ".join(registry.conflicts[o]))
+        for o in conflicted
+    ]
+    todo = [o for o in todo if o not in registry.conflicts]
+    if not todo:
+        results.sort(key=lambda r: r.owner)
+        return results
+    split = owner_rows(rows, registry) if len(registry) else {}
+    split = {o: split[o] for o in todo if o in split}
+    derived = {}
+    for o in todo:
+        key = config_key(data["owners"][o])
+        if key not in derived:
+            derived[key] = month_rows(layers.get(digest, frame, data["owners"][o]))
+
+    workers = workers or min(len(todo), os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker,
+        initargs=(rows, data, split, derived, trace.enabled()),
+    ) as pool:
+        keep = history is not None
+        futures = [
+            pool.submit(_run_owner, o, year, month, str(out_dir), fmt, keep) for o in todo
+        ]
+        for fut in as_completed(futures):
+            result = fut.result()
+            if result.trace is not None:
+                trace.current().merge(result.trace)
+                result.trace = None
+            if snapshots is not None and result.snapshot is not None:
+                snapshots.record(result.owner, year, month, result.snapshot)
+            if history is not None and result.record is not None:
+                history.put(result.record)
+                result.record = None
+            results.append(result)
+    results.sort(key=lambda r: r.owner)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("export", help="Guesty CSV export, or a synced reservations .db")
+    parser.add_argument("--data", required=True, help="local copy of data.json")
+    parser.add_argument("--month", type=int, required=True)
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--out", default="statements", help="output directory")
+    parser.add_argument("--owner", action="append", help="limit to this owner (repeatable)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", help="directory for the parsed-export cache")
+    parser.add_argument("--format", choices=["html", "pdf"], default="html")
+    parser.add_argument("--snapshots", help="record monthly totals in this database")
+    parser.add_argument("--history", help="keep generated statements in this database")
+    parser.add_argument("--income", help="add the month to this income/GRI cube")
+    parser.add_argument("--trace", help="write a Chrome trace of the run here")
+    args = parser.parse_args(argv)
+    if not Path(args.export).is_file():
+        parser.error(f"no such export: {args.export}")
+
+    start = time.perf_counter()
+    snapshots = SnapshotStore(args.snapshots) if args.snapshots else None
+    history = HistoryStore(args.history) if args.history else None
+    income = IncomeCube(args.income) if args.income else None
+    try:
+        with trace.tracing(args.trace) if args.trace else nullcontext() as tracer:
+            results = run_batch(
+                args.export, load_data(args.data), args.year, args.month,
+                args.out, args.owner, args.workers,
+                ExportCache(args.cache) if args.cache else None, args.format,
+                snapshots, history, income,
+            )
+    finally:
+        for store in (snapshots, history, income):
+            if store is not None:
+                store.close()
+    failed = [r for r in results if r.error]
+    for r in results:
+        status = "FAILED" if r.error else r.path
+        print(f"{r.seconds:8.3f}s  {r.owner}: {status}")
+    for r in failed:
+        print(f"\n--- {r.owner} ---\n{r.error}", file=sys.stderr)
+    print(
+        f"{len(results) - len(failed)} ok, {len(failed)} failed "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    if tracer is not None:
+        summary = tracer.summary()
+        for name, s in summary["spans"].items():
+            print(f"  {name:<10} {s['seconds']:9.3f}s  x{s['count']}")
+        for name, n in summary["counters"].items():
+            print(f"  {name:<16} {n}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
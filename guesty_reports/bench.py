@@ -0,0 +1,254 @@
+"""End-to-end benchmarks of the statement flow on synthetic exports.
+
+    python -m guesty_reports.bench --rows 100000 1000000 [--owners 60] \\
+        [--stages parse filter split aggregate render pdf cache store] [--repeat 3] \\
+        [--history bench/history.jsonl] [--fail-on-regression]
+
+For every size a synthetic export and data.json are generated (and kept
+in ``--work`` for the next run), then each stage is timed ``--repeat``
+times:
+
+    parse      stream the CSV into a prepared frame
+    filter     one month's rows, by mask and through the partition index
+    split      every row's owner from the ownership registry
+    aggregate  ``process_data`` for every owner for that month
+    render     HTML for every statement, with the fragment cache cold
+    pdf        PDF for every statement
+    cache      export cache put and open
+    store      sharded data document save and load
+
+Each run appends one JSON line (time, git revision, interpreter, machine
+and CPU count, size, seed and per-stage min/median seconds) to
+``--history`` and is compared with the last run there of the same size
+and seed on the same machine; stages slower by more than
+``--threshold`` are reported, and fail the run with
+``--fail-on-regression``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from .cache import ExportCache
+from .engine import process_data, select_period
+from .github import LocalContents
+from .index import PartitionIndex
+from .ingest import read_export
+from .ledger import ExpenseLedger
+from .pdf import write_statement_pdf
+from .registry import OwnershipRegistry, owner_rows
+from .render import FRAGMENTS, render_statement
+from .store import ShardedStore, load_data, write_data
+from .synth import listing_map, make_data, owner_names, write_export
+
+STAGES = ["parse", "filter", "split", "aggregate", "render", "pdf", "cache", "store"]
+REPEAT = 3
+THRESHOLD = 0.2
+START = date(2026, 1, 1)
+MONTHS = 12
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def timed(fn, repeat: int) -> dict:
+    """Run ``fn`` ``repeat`` times; min and median wall-clock seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def fixture(work, rows: int, owners: int, listings: int, seed: int) -> tuple[Path, Path, dict]:
+    """Export, data.json and ``{owner: listings}`` for one size, generated once."""
+    work = Path(work)
+    stem = f"export-{rows}-{owners}-{listings}-{seed}"
+    export, data_path = work / f"{stem}.csv", work / f"{stem}.json"
+    mapping = listing_map(owner_names(owners), listings, seed)
+    if not export.exists():
+        names = [name for names in mapping.values() for name in names]
+        write_export(export, rows, names, seed, START, MONTHS)
+    if not data_path.exists():
+        write_data(data_path, make_data(mapping, seed, START, MONTHS))
+    return export, data_path, mapping
+
+
+def run(
+    export,
+    data: dict,
+    mapping: dict[str, list[str]],
+    stages: list[str] = STAGES,
+    repeat: int = REPEAT,
+    year: int = START.year,
+    month: int = START.month,
+) -> dict[str, dict]:
+    """Time ``stages`` against one export; ``{stage: {"min", "median"}}``."""
+    results: dict[str, dict] = {}
+    frame = read_export(export)
+    index = PartitionIndex.build(frame)
+    ledger = ExpenseLedger(data["expenses"])
+    owners = sorted(data["owners"])
+
+    def aggregate():
+        return [
+            process_data(frame, o, data["owners"][o], year, month, ledger,
+                         index=index, listings=mapping.get(o))
+            for o in owners
+        ]
+
+    statements = aggregate()
+    scratch = Path(tempfile.mkdtemp(prefix="guesty-bench-"))
+    try:
+        for stage in stages:
+            if stage == "parse":
+                results[stage] = timed(lambda: read_export(export), repeat)
+            elif stage == "filter":
+                results["filter.mask"] = timed(lambda: select_period(frame, year, month), repeat)
+                results["filter.index"] = timed(lambda: index.take(frame, year, month), repeat)
+            elif stage == "split":
+                registry = OwnershipRegistry.from_owners(data["owners"])
+                results[stage] = timed(lambda: owner_rows(frame, registry), repeat)
+            elif stage == "aggregate":
+                results[stage] = timed(aggregate, repeat)
+            elif stage == "render":
+                def render():
+                    FRAGMENTS.clear()
+                    for s in statements:
+                        render_statement(s, ledger)
+                results[stage] = timed(render, repeat)
+            elif stage == "pdf":
+                def pdf():
+                    for i, s in enumerate(statements):
+                        write_statement_pdf(scratch / f"{i}.pdf", s, ledger)
+                results[stage] = timed(pdf, repeat)
+            elif stage == "cache":
+                cache = ExportCache(scratch / "cache")
+
+                def put():
+                    cache.put("bench", frame)
+                results["cache.put"] = timed(put, repeat)
+                results["cache.open"] = timed(lambda: cache.open("bench"), repeat)
+            elif stage == "store":
+                backend = LocalContents(scratch / "repo")
+                ShardedStore(backend).save(data)
+                saves = iter(range(repeat))
+
+                def save():
+                    # Every shard written, into an empty repository.
+                    ShardedStore(LocalContents(scratch / f"repo-{next(saves)}")).save(data)
+                results["store.save"] = timed(save, repeat)
+                results["store.load"] = timed(lambda: ShardedStore(backend).load(), repeat)
+            else:
+                raise ValueError(f"unknown stage {stage!r}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def read_history(path) -> list[dict]:
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def append_history(path, entry: dict) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry, sort_keys=True) + "\n")
+
+
+def previous(history: list[dict], match: dict) -> dict | None:
+    """Most recent entry agreeing with ``match`` on every key (size, seed, machine)."""
+    for entry in reversed(history):
+        if all(entry.get(k) == v for k, v in match.items()):
+            return entry
+    return None
+
+
+def regressions(current: dict, before: dict | None, threshold: float = THRESHOLD) -> dict:
+    """``{stage: (before, now)}`` for stages whose min grew by more than ``threshold``."""
+    if before is None:
+        return {}
+    out = {}
+    for stage, now in current.items():
+        then = before["stages"].get(stage)
+        if then and now["min"] > then["min"] * (1 + threshold):
+            out[stage] = (then["min"], now["min"])
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the statement flow")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--owners", type=int, default=40)
+    parser.add_argument("--listings", type=int, default=4, help="average listings per owner")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--work", default="bench/exports", help="directory for generated exports")
+    parser.add_argument("--history", default="bench/history.jsonl")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="slowdown reported as a regression (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    history = read_history(args.history)
+    meta = {
+        "rev": git_revision(),
+        "python": platform.python_version(),
+        "machine": f"{platform.machine()} {platform.node()}",
+        "cpus": os.cpu_count(),
+    }
+    failed = False
+    for rows in args.rows:
+        size = {"rows": rows, "owners": args.owners, "listings": args.listings, "seed": args.seed}
+        export, data_path, mapping = fixture(args.work, rows, args.owners, args.listings, args.seed)
+        stages = run(export, load_data(data_path), mapping, args.stages, args.repeat)
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **meta, **size, "repeat": args.repeat, "stages": stages,
+        }
+        before = previous(
+            history, {**size, "machine": meta["machine"], "cpus": meta["cpus"]}
+        )
+        slower = regressions(stages, before, args.threshold)
+        append_history(args.history, entry)
+        history.append(entry)
+
+        print(f"{rows} rows, {args.owners} owners"
+              + (f" (vs {before['rev'] or '?'} at {before['at']})" if before else ""))
+        for stage, t in stages.items():
+            then = before["stages"].get(stage) if before else None
+            change = f"  {t['min'] / then['min'] - 1:+7.1%}" if then else ""
+            flag = "  REGRESSION" if stage in slower else ""
+            print(f"  {stage:<14} min {t['min']:9.4f}s  median {t['median']:9.4f}s{change}{flag}")
+        failed = failed or bool(slower)
+    return 1 if failed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
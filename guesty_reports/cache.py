@@ -0,0 +1,254 @@
+"""Content-addressed columnar cache of parsed Guesty exports.
+
+Each parsed export is stored under the SHA-256 of the CSV bytes as one
+``.npy`` file per column: numeric columns as-is, text columns dictionary
+encoded (int32 codes plus the distinct values in ``meta.json``). Columns
+are opened memory-mapped, so a cached export loads without touching the
+CSV text. Entries are evicted least-recently-used once the cache grows
+past ``max_bytes``; a changed export hashes to a new key, so stale
+entries are never served.
+
+``LRU`` is the small in-memory counterpart used for rendered fragments
+and computed results; ``SingleFlight`` puts one in front of a computation
+shared by several threads, so concurrent misses on a key compute it once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .index import PartitionIndex
+from .ingest import read_export
+
+# 2: money columns are int64 cents.
+FORMAT_VERSION = 2
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class LRU:
+    """Thread-safe in-memory mapping bounded to ``maxsize`` entries."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+
+
+class SingleFlight:
+    """``LRU`` of computed values, each computed once however many threads ask.
+
+    The first caller of ``get(key, compute)`` on a miss runs ``compute``;
+    callers arriving while it runs wait for that result instead of
+    repeating the work. A failure is raised in every waiting caller and is
+    not cached.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.lru = LRU(maxsize=maxsize)
+        self.lock = threading.Lock()
+        self.pending: dict = {}
+        self.computed = self.joined = 0
+
+    def get(self, key, compute):
+        with self.lock:
+            if key in self.lru.data:
+                return self.lru.get(key)
+            future = self.pending.get(key)
+            leader = future is None
+            if leader:
+                future = self.pending[key] = Future()
+            else:
+                self.joined += 1
+        if not leader:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self.lock:
+                del self.pending[key]
+            future.set_exception(exc)
+            raise
+        with self.lock:
+            self.lru.put(key, value)
+            del self.pending[key]
+            self.computed += 1
+        future.set_result(value)
+        return value
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.lru), "hits": self.lru.hits,
+                "computed": self.computed, "joined": self.joined,
+            }
+
+    def clear(self) -> None:
+        self.lru.clear()
+
+
+def file_digest(path, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(block):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+class ExportCache:
+    """On-disk cache of prepared export frames keyed by content hash."""
+
+    def __init__(self, root, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._digests: dict[tuple, str] = {}
+
+    def digest(self, path) -> str:
+        """Content hash of ``path``, memoized on (path, size, mtime)."""
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        if key not in self._digests:
+            self._digests[key] = file_digest(path)
+        return self._digests[key]
+
+    def entry(self, digest: str) -> Path:
+        return self.root / digest
+
+    def __contains__(self, digest: str) -> bool:
+        meta = self.entry(digest) / "meta.json"
+        if not meta.exists():
+            return False
+        return json.loads(meta.read_text()).get("version") == FORMAT_VERSION
+
+    def load(self, path) -> pd.DataFrame:
+        """Prepared frame for the export at ``path``, parsing it only on a miss."""
+        digest = self.digest(path)
+        if digest in self:
+            return self.open(digest)
+        counts: dict = {}
+        frame = read_export(path, counts=counts)
+        self.put(digest, frame, counts["rows_read"])
+        return frame
+
+    def rows_read(self, digest: str) -> int:
+        """Rows the parse of a cached export read, kept ones and skipped ones."""
+        meta = json.loads((self.entry(digest) / "meta.json").read_text())
+        return meta.get("rows_read", meta["rows"])
+
+    def index(self, digest: str, frame: pd.DataFrame | None = None) -> PartitionIndex:
+        """Partition index for a cached export, built on first use and kept with it."""
+        entry = self.entry(digest)
+        if (entry / "index.json").exists():
+            return PartitionIndex.load(entry)
+        idx = PartitionIndex.build(frame if frame is not None else self.open(digest))
+        idx.save(entry)
+        return idx
+
+    def load_indexed(self, path) -> tuple[pd.DataFrame, PartitionIndex]:
+        """Cached frame and its partition index for the export at ``path``."""
+        frame = self.load(path)
+        return frame, self.index(self.digest(path), frame)
+
+    def open(self, digest: str) -> pd.DataFrame:
+        entry = self.entry(digest)
+        meta = json.loads((entry / "meta.json").read_text())
+        os.utime(entry / "meta.json")
+        data = {}
+        for i, col in enumerate(meta["columns"]):
+            arr = np.load(entry / f"{i}.npy", mmap_mode="r")
+            values = meta["dictionaries"].get(col)
+            if values is not None:
+                arr = np.asarray(values, dtype=object)[arr]
+            data[col] = arr
+        return pd.DataFrame(data, copy=False)
+
+    def put(self, digest: str, frame: pd.DataFrame, rows_read: int | None = None) -> None:
+        meta = {
+            "version": FORMAT_VERSION, "rows": len(frame),
+            "rows_read": len(frame) if rows_read is None else rows_read,
+            "columns": [], "dictionaries": {},
+        }
+        tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".tmp-"))
+        try:
+            for i, col in enumerate(frame.columns):
+                series = frame[col]
+                if pd.api.types.is_numeric_dtype(series):
+                    arr = series.to_numpy()
+                else:
+                    codes, uniques = pd.factorize(series.astype(str), sort=False)
+                    arr = codes.astype(np.int32)
+                    meta["dictionaries"][col] = [str(u) for u in uniques]
+                np.save(tmp / f"{i}.npy", arr, allow_pickle=False)
+                meta["columns"].append(col)
+            (tmp / "meta.json").write_text(json.dumps(meta))
+            target = self.entry(digest)
+            if target.exists():
+                shutil.rmtree(target)
+            os.replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=digest)
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """Drop least recently used entries until the cache fits ``max_bytes``."""
+        entries = []
+        for d in self.root.iterdir():
+            meta = d / "meta.json"
+            if d.is_dir() and meta.exists():
+                entries.append((meta.stat().st_mtime, d.name, _dir_size(d)))
+        total = sum(size for _, _, size in entries)
+        removed = []
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(self.root / name, ignore_errors=True)
+            total -= size
+            removed.append(name)
+        return removed
+
+    def clear(self) -> None:
+        for d in self.root.iterdir():
+            if d.is_dir():
+                shutil.rmtree(d, ignore_errors=True)
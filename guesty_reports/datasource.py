@@ -0,0 +1,77 @@
+"""Stale-while-revalidate access to the data document.
+
+``loadData`` in the browser blocks start-up on a full download of
+data.json. ``DataSource`` keeps the last document it saw on disk, returns
+it immediately and revalidates in a background thread; the revalidation
+itself goes through conditional GETs, so an unchanged repository costs a
+handful of 304 responses and almost no bytes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from .github import ContentCache, GitHubContents
+from .store import ShardedStore, dump_data, normalize
+
+
+class DataSource:
+    def __init__(self, store: ShardedStore, snapshot, on_update=None):
+        self.store = store
+        self.snapshot = Path(snapshot)
+        self.on_update = on_update
+        self.data: dict | None = None
+        self.lock = threading.Lock()
+        self._revalidating: threading.Thread | None = None
+
+    def load(self, wait: bool = False) -> dict:
+        """The data document, from the local copy when there is one.
+
+        With a local copy the call returns at once and a background
+        revalidation replaces ``self.data`` (and calls ``on_update``) if the
+        remote changed. ``wait=True`` or a cold cache fetches synchronously.
+        """
+        if not wait and self.snapshot.exists():
+            with self.lock:
+                if self.data is None:
+                    self.data = normalize(json.loads(self.snapshot.read_bytes()))
+            self.revalidate()
+            return self.data
+        return self.refresh()
+
+    def refresh(self) -> dict:
+        """Fetch from the store now and update the local copy if it changed."""
+        data = normalize(self.store.load())
+        body = dump_data(data)
+        with self.lock:
+            changed = self.data != data
+            self.data = data
+            if changed or not self.snapshot.exists():
+                self.snapshot.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.snapshot.with_suffix(".tmp")
+                tmp.write_bytes(body)
+                os.replace(tmp, self.snapshot)
+        if changed and self.on_update:
+            self.on_update(data)
+        return data
+
+    def revalidate(self) -> threading.Thread:
+        """Start a background refresh unless one is already running."""
+        with self.lock:
+            if self._revalidating and self._revalidating.is_alive():
+                return self._revalidating
+            self._revalidating = threading.Thread(
+                target=self.refresh, name="data-revalidate", daemon=True
+            )
+            self._revalidating.start()
+            return self._revalidating
+
+
+def github_source(token: str, cache_dir, on_update=None, **kw) -> DataSource:
+    """``DataSource`` over the reports repository with on-disk HTTP caching."""
+    cache_dir = Path(cache_dir)
+    backend = GitHubContents(token, cache=ContentCache(cache_dir / "http"), **kw)
+    return DataSource(ShardedStore(backend), cache_dir / "data.json", on_update)
@@ -0,0 +1,141 @@
+"""Derived per-reservation columns, materialized once per export and config.
+
+``displayStatement`` recomputes accommodation, cleaning, PMC and the
+website fee for rows ``processData`` already went through, and
+``runIncomeReport`` computes them a third time. ``DerivedColumns`` works
+them out once for every row of an export and keeps them next to the
+cached export (see ``cache.ExportCache``):
+
+    <cache>/<export sha>/derived/base/{gross,acc,clean}.npy
+    <cache>/<export sha>/derived/<config key>/{pmc,website_fee,vrbo_fee,tax}.npy
+
+The base layer does not depend on any owner; the config layer is keyed
+by a hash of the configuration fields it reads (``type`` and ``percent``)
+and of the fee rules, so owners sharing a configuration share a layer,
+and changing one owner's commission only leaves that owner without one
+until it is computed again. Layers are opened memory-mapped and kept in
+a small in-memory ``SingleFlight``, so concurrent requests for a missing
+layer build it once; without a cache directory they live only there.
+Statements read them through ``process_data(..., derived=...)`` and the
+income cube through ``cube_rows(..., base=...)``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import ExportCache, SingleFlight
+from .engine import BASE_COLUMNS, CONFIG_COLUMNS, base_columns, config_columns
+from .rules import FEE_RULES
+
+# Bump when the meaning of a derived column changes.
+LAYER_VERSION = 2
+CONFIG_FIELDS = ("type", "percent")
+
+
+def config_key(config: dict) -> str:
+    """Key of the config layer: the fields it depends on, plus the fee rules."""
+    spec = {f: config.get(f) for f in CONFIG_FIELDS}
+    spec["percent"] = float(spec["percent"] or 0)
+    blob = json.dumps([LAYER_VERSION, spec, repr(FEE_RULES)], sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class DerivedColumns:
+    def __init__(self, cache: ExportCache | None = None, maxsize: int = 64):
+        self.cache = cache
+        # Threads asking for the same missing layer wait for one build.
+        self.memory = SingleFlight(maxsize=maxsize)
+
+    def _dir(self, digest: str, layer: str) -> Path | None:
+        if self.cache is None:
+            return None
+        return self.cache.entry(digest) / "derived" / layer
+
+    def _layer(self, digest: str, layer: str, columns: list[str], compute) -> dict[str, np.ndarray]:
+        return self.memory.get((digest, layer), lambda: self._build(digest, layer, columns, compute))
+
+    def _build(self, digest: str, layer: str, columns: list[str], compute) -> dict[str, np.ndarray]:
+        directory = self._dir(digest, layer)
+        if directory is not None and self._complete(directory, columns):
+            return self._load(directory, columns)
+        found = compute()
+        if directory is not None and directory.parent.parent.exists():
+            if not self._write(directory, found):
+                # Another process published the layer first; use its copy.
+                return self._load(directory, columns)
+        return found
+
+    @staticmethod
+    def _complete(directory: Path, columns: list[str]) -> bool:
+        return all((directory / f"{c}.npy").exists() for c in columns)
+
+    @staticmethod
+    def _load(directory: Path, columns: list[str]) -> dict[str, np.ndarray]:
+        return {c: np.load(directory / f"{c}.npy", mmap_mode="r") for c in columns}
+
+    @classmethod
+    def _write(cls, directory: Path, arrays: dict[str, np.ndarray]) -> bool:
+        """Publish ``arrays`` as ``directory``; False if another writer already did."""
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=directory.parent, prefix=".tmp-"))
+        try:
+            for name, values in arrays.items():
+                np.save(tmp / f"{name}.npy", np.asarray(values, dtype="int64"), allow_pickle=False)
+            if directory.exists() and not cls._complete(directory, list(arrays)):
+                shutil.rmtree(directory, ignore_errors=True)
+            try:
+                os.replace(tmp, directory)
+            except OSError:
+                if not cls._complete(directory, list(arrays)):
+                    raise
+                shutil.rmtree(tmp, ignore_errors=True)
+                return False
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return True
+
+    def base(self, digest: str, frame: pd.DataFrame) -> dict[str, np.ndarray]:
+        """``BASE_COLUMNS`` for every row of the export ``digest``."""
+        return self._layer(digest, "base", BASE_COLUMNS, lambda: base_columns(frame))
+
+    def get(self, digest: str, frame: pd.DataFrame, config: dict) -> dict[str, np.ndarray]:
+        """Every derived column for every row of ``digest`` under ``config``."""
+        base = self.base(digest, frame)
+        layer = self._layer(
+            digest, config_key(config), CONFIG_COLUMNS,
+            lambda: config_columns(frame, config, base),
+        )
+        return {**base, **layer}
+
+    def keys(self, digest: str) -> list[str]:
+        """Config layers stored for ``digest``."""
+        root = self._dir(digest, "")
+        if root is None or not root.exists():
+            return []
+        return sorted(
+            p.name for p in root.iterdir()
+            if p.is_dir() and p.name != "base" and not p.name.startswith(".")
+        )
+
+    def prune(self, digest: str, configs) -> list[str]:
+        """Drop stored config layers of ``digest`` no configuration in ``configs`` uses."""
+        live = {config_key(c) for c in configs}
+        removed = [k for k in self.keys(digest) if k not in live]
+        for k in removed:
+            shutil.rmtree(self._dir(digest, k), ignore_errors=True)
+        return removed
+
+
+def take(columns: dict[str, np.ndarray], positions) -> dict[str, np.ndarray]:
+    """The derived columns of the rows at ``positions``."""
+    return {c: np.asarray(v)[positions] for c, v in columns.items()}
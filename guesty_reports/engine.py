@@ -0,0 +1,254 @@
+"""Column-wise statement engine.
+
+Mirrors ``processData`` in app.py: money columns are parsed once into
+integer cents (see ``money``), per-reservation figures are derived with
+column operations and the property/master totals come from a single
+group-by.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+import pandas as pd
+
+from . import trace
+from .ledger import as_ledger, period_key
+from .money import apply_rate, parse_cents
+from .rules import FEE_RULES, RuleSet
+
+CHECK_IN = "CHECK-IN DATE"
+CHECK_OUT = "CHECK-OUT DATE"
+LISTING = "LISTING'S NICKNAME"
+CODE = "CONFIRMATION CODE"
+PLATFORM = "PLATFORM"
+STATUS = "STATUS"
+
+MONEY_COLUMNS = [
+    "TOTAL PAYOUT",
+    "ACCOMMODATION FARE",
+    "MARKUP",
+    "LENGTH OF STAY DISCOUNT",
+    "COMMUNITY FEE",
+    "CLEANING FARE",
+    "CITY TAX",
+    "STATE TAX",
+    "COUNTY TAX",
+    "OCCUPANCY TAX",
+]
+TAX_COLUMNS = ["CITY TAX", "STATE TAX", "COUNTY TAX", "OCCUPANCY TAX"]
+TEXT_COLUMNS = [CHECK_IN, CHECK_OUT, LISTING, CODE, PLATFORM, STATUS]
+
+# Derived per-reservation columns added by ``derive``; the first three do
+# not depend on the owner configuration.
+DERIVED_COLUMNS = ["gross", "acc", "clean", "pmc", "website_fee", "vrbo_fee", "tax"]
+BASE_COLUMNS = DERIVED_COLUMNS[:3]
+CONFIG_COLUMNS = DERIVED_COLUMNS[3:]
+
+FEES = RuleSet(FEE_RULES, platform=PLATFORM, code=CODE, status=STATUS)
+
+
+@dataclass
+class Totals:
+    """Running totals for one property or for the whole statement, in cents."""
+
+    gross: int = 0
+    acc: int = 0
+    clean: int = 0
+    pmc: int = 0
+    website_fee: int = 0
+    vrbo_fee: int = 0
+    expenses: int = 0
+    draft: int = 0
+    owner: int = 0
+    tax: int = 0
+
+    def add(self, other: "Totals", sign: int = 1) -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + sign * getattr(other, f.name))
+
+    def settle(self, deduct_fees: bool = False) -> "Totals":
+        """Recompute the amount due and owner net from the components.
+
+        Platform fees are charged once, either way: ``deduct_fees`` takes
+        them out of the owner net, as for payout owners; otherwise the
+        owner pays them in the draft, as draft owners do.
+        """
+        fees = self.website_fee + self.vrbo_fee
+        self.draft = self.pmc + self.clean + self.expenses
+        self.owner = self.acc - self.pmc - self.expenses
+        if deduct_fees:
+            self.owner -= fees
+        else:
+            self.draft += fees
+        return self
+
+    def as_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass
+class Statement:
+    """Result of one owner/month run, the Python side of ``propertyTotals``."""
+
+    owner: str
+    config: dict
+    year: int
+    month: int
+    properties: dict[str, Totals] = field(default_factory=dict)
+    master: Totals = field(default_factory=Totals)
+    reservations: dict[str, pd.DataFrame] = field(default_factory=dict)
+    tax_by_property: dict[str, dict] = field(default_factory=dict)
+
+
+def load_export(path) -> pd.DataFrame:
+    """Read a Guesty CSV export with every cell kept as text."""
+    return pd.read_csv(path, dtype=str, keep_default_na=False, skip_blank_lines=True)
+
+
+def prepare(frame: pd.DataFrame) -> pd.DataFrame:
+    """Parse money columns into cents and check-in year/month once, in place.
+
+    Missing columns are filled with zeros/blanks so exports with a
+    trimmed column set still aggregate. Already prepared (``int64``)
+    money columns are left alone.
+    """
+    for col in MONEY_COLUMNS:
+        if col not in frame:
+            frame[col] = np.zeros(len(frame), dtype="int64")
+        elif frame[col].dtype != "int64":
+            frame[col] = parse_cents(frame[col])
+    for col in TEXT_COLUMNS:
+        if col not in frame:
+            frame[col] = ""
+        else:
+            frame[col] = frame[col].fillna("").astype(str)
+    if "year" not in frame or "month" not in frame:
+        parts = frame[CHECK_IN].str.split("-", n=2, expand=True).reindex(columns=[0, 1])
+        frame["year"] = pd.to_numeric(parts[0], errors="coerce").fillna(0).astype("int32")
+        frame["month"] = pd.to_numeric(parts[1], errors="coerce").fillna(0).astype("int32")
+    return frame
+
+
+def select_period(frame: pd.DataFrame, year: int, month: int) -> pd.DataFrame:
+    """Rows whose check-in falls in ``year``/``month``."""
+    mask = (frame["year"].to_numpy() == year) & (frame["month"].to_numpy() == month)
+    return frame[mask]
+
+
+def accommodation(rows: pd.DataFrame) -> np.ndarray:
+    """Accommodation fare less markup and community fee, plus the stay discount."""
+    return (
+        rows["ACCOMMODATION FARE"].to_numpy()
+        - rows["MARKUP"].to_numpy()
+        + rows["LENGTH OF STAY DISCOUNT"].to_numpy()
+        - rows["COMMUNITY FEE"].to_numpy()
+    )
+
+
+def cleaning(rows: pd.DataFrame) -> np.ndarray:
+    """Cleaning fare, zero for cancelled reservations."""
+    cancelled = rows[STATUS].str.lower().str.contains("cancelled", regex=False).to_numpy()
+    return np.where(cancelled, 0, rows["CLEANING FARE"].to_numpy())
+
+
+def base_columns(rows: pd.DataFrame) -> dict[str, np.ndarray]:
+    """``BASE_COLUMNS``: gross, accommodation and cleaning per reservation."""
+    return {
+        "gross": rows["TOTAL PAYOUT"].to_numpy(),
+        "acc": accommodation(rows),
+        "clean": cleaning(rows),
+    }
+
+
+def config_columns(rows: pd.DataFrame, config: dict, base: dict) -> dict[str, np.ndarray]:
+    """``CONFIG_COLUMNS`` for an owner configuration: PMC, fees and tax."""
+    out = {"pmc": apply_rate(base["acc"], config.get("percent") or 0)}
+    out.update(FEES.evaluate(rows[[PLATFORM, CODE, STATUS]].assign(**base), config.get("type")))
+    if config.get("type") == "payout":
+        out["tax"] = rows[TAX_COLUMNS].to_numpy().sum(axis=1)
+    else:
+        out["tax"] = np.zeros(len(rows), dtype="int64")
+    return out
+
+
+def derive(rows: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """Add the per-reservation figures ``processData`` computes row by row."""
+    rows = rows.copy()
+    base = base_columns(rows)
+    for name, values in {**base, **config_columns(rows, config, base)}.items():
+        rows[name] = values
+    return rows
+
+
+def process_data(
+    frame: pd.DataFrame,
+    owner: str,
+    config: dict,
+    year: int,
+    month: int,
+    expenses=None,
+    property_settings: dict | None = None,
+    index=None,
+    listings=None,
+    derived=None,
+) -> Statement:
+    """Aggregate one owner's statement for ``year``/``month``.
+
+    ``frame`` must have been through ``prepare``. ``expenses`` is the
+    data.json list or an ``ExpenseLedger``; pass a ledger when running
+    several statements so the expense index is built once. With a
+    ``PartitionIndex`` only the period's rows are touched; ``listings``
+    restricts the run to those properties. When ``property_settings`` is
+    given, listings seen in the period get an empty settings entry, as the
+    browser does. ``derived`` holds ``DERIVED_COLUMNS`` for every row of
+    ``frame`` under this ``config`` (see ``derived``); they are then read
+    rather than computed.
+    """
+    with trace.span("filter", owner=owner):
+        if index is not None:
+            pos = index.rows(year, month, listings)
+        else:
+            period = (frame["year"].to_numpy() == year) & (frame["month"].to_numpy() == month)
+            pos = np.flatnonzero(period)
+            trace.count("rows_skipped", len(frame) - len(pos))
+        pos = pos[frame[CHECK_IN].to_numpy()[pos] != ""]
+        rows = frame.iloc[pos]
+    with trace.span("aggregate", owner=owner, rows=len(rows)):
+        if derived is None:
+            rows = derive(rows, config)
+        else:
+            rows = rows.assign(**{c: np.asarray(derived[c])[pos] for c in DERIVED_COLUMNS})
+        rows["property"] = rows[LISTING].replace("", "Unknown")
+        if listings is not None and index is None:
+            rows = rows[rows["property"].isin(list(listings))]
+
+        statement = Statement(owner=owner, config=config, year=year, month=month)
+        if rows.empty:
+            return statement
+
+        sums = rows.groupby("property", sort=False)[DERIVED_COLUMNS].sum()
+        expense_sums = as_ledger(expenses).totals_for(owner, period_key(year, month))
+        groups = rows.groupby("property", sort=False).indices
+
+        for prop, sum_row in zip(sums.index, sums.itertuples(index=False)):
+            if property_settings is not None:
+                property_settings.setdefault(prop, {})
+            exp = expense_sums.get(prop, 0)
+            t = Totals(expenses=exp, **{k: int(v) for k, v in sum_row._asdict().items()})
+            t.settle(deduct_fees=config.get("type") == "payout")
+            statement.properties[prop] = t
+            statement.master.add(t)
+
+            res = rows.iloc[groups[prop]]
+            statement.reservations[prop] = res
+            taxed = res[res["tax"].to_numpy() > 0]
+            if not taxed.empty:
+                first = taxed.iloc[0]
+                statement.tax_by_property[prop] = {
+                    "gross": int(first["gross"]),
+                    "tax": int(first["tax"]),
+                    "netReportable": t.owner - t.tax,
+                }
+        return statement
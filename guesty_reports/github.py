@@ -0,0 +1,330 @@
+"""GitHub contents API client and a local stand-in with the same interface.
+
+Both expose ``get``/``put``/``delete`` on repository paths and ``commit``
+for writing several paths as one commit. ``sha`` values are git blob
+hashes, so a file's sha only changes when its bytes do, and a write with a
+stale sha raises ``Conflict`` just as GitHub answers 409.
+
+``GitHubContents`` shares one pooled ``requests.Session`` per process and,
+given a ``ContentCache``, keeps each file on disk with its ETag so
+re-reading an unchanged file is a conditional GET answered with 304.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from . import trace
+
+API = "https://api.github.com"
+REPO = "oceanvacationsmb/reports"
+
+
+class Conflict(Exception):
+    """The file changed remotely since its sha was read."""
+
+
+def blob_sha(content: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def shared_session(pool_size: int = 16):
+    """Process-wide ``requests.Session`` with a pooled HTTPS adapter."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+class ContentCache:
+    """On-disk copies of fetched files with their ETag and blob sha."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _base(self, key: str) -> Path:
+        return self.root / hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> tuple[str, bytes, str] | None:
+        base = self._base(key)
+        try:
+            meta = json.loads(base.with_suffix(".json").read_text())
+            return meta["etag"], base.with_suffix(".body").read_bytes(), meta["sha"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, etag: str, content: bytes, sha: str) -> None:
+        base = self._base(key)
+        base.with_suffix(".body").write_bytes(content)
+        base.with_suffix(".json").write_text(json.dumps({"etag": etag, "sha": sha}))
+
+    def discard(self, key: str) -> None:
+        base = self._base(key)
+        base.with_suffix(".json").unlink(missing_ok=True)
+        base.with_suffix(".body").unlink(missing_ok=True)
+
+
+class GitHubContents:
+    def __init__(
+        self,
+        token: str,
+        repo: str = REPO,
+        branch: str | None = None,
+        session=None,
+        cache: ContentCache | None = None,
+        api: str = API,
+    ):
+        self.api = api
+        self.repo = repo
+        self.branch = branch
+        self.cache = cache
+        self._default_branch: str | None = None
+        self.session = session or shared_session()
+        self.headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github+json",
+        }
+        self.stats = {"requests": 0, "not_modified": 0, "bytes_sent": 0, "bytes_received": 0}
+
+    def url(self, path: str) -> str:
+        return f"{self.api}/repos/{self.repo}/contents/{path}"
+
+    def _request(self, method: str, url: str, headers=None, **kw):
+        self.stats["requests"] += 1
+        with trace.span("publish", method=method, url=url):
+            r = self.session.request(method, url, headers={**self.headers, **(headers or {})}, **kw)
+        sent = len(r.request.body or b"")
+        self.stats["bytes_sent"] += sent
+        self.stats["bytes_received"] += len(r.content)
+        trace.count("bytes_sent", sent)
+        trace.count("bytes_received", len(r.content))
+        return r
+
+    def _api(self, method: str, path: str, **kw):
+        r = self._request(method, f"{self.api}/repos/{self.repo}/{path}", **kw)
+        r.raise_for_status()
+        return r.json()
+
+    def _branch(self) -> str:
+        if self.branch:
+            return self.branch
+        if self._default_branch is None:
+            self._default_branch = self._api("GET", "")["default_branch"]
+        return self._default_branch
+
+    def get(self, path: str) -> tuple[bytes, str] | None:
+        params = {"ref": self.branch} if self.branch else None
+        key = f"{self.repo}@{self.branch or ''}:{path}"
+        cached = self.cache.get(key) if self.cache else None
+        headers = {"If-None-Match": cached[0]} if cached else None
+        r = self._request("GET", self.url(path), headers=headers, params=params)
+        if r.status_code == 304 and cached:
+            self.stats["not_modified"] += 1
+            return cached[1], cached[2]
+        if r.status_code == 404:
+            if self.cache:
+                self.cache.discard(key)
+            return None
+        r.raise_for_status()
+        body = r.json()
+        content = base64.b64decode(body["content"])
+        if self.cache and r.headers.get("ETag"):
+            self.cache.put(key, r.headers["ETag"], content, body["sha"])
+        return content, body["sha"]
+
+    def put(self, path: str, content: bytes, message: str, sha: str | None = None) -> str:
+        body = {"message": message, "content": base64.b64encode(content).decode("ascii")}
+        if sha:
+            body["sha"] = sha
+        if self.branch:
+            body["branch"] = self.branch
+        r = self._request("PUT", self.url(path), json=body)
+        # 409: stale sha; 422 without a sha: the file was created meanwhile.
+        if r.status_code == 409 or (r.status_code == 422 and sha is None):
+            raise Conflict(path)
+        r.raise_for_status()
+        return r.json()["content"]["sha"]
+
+    def delete(self, path: str, message: str, sha: str) -> None:
+        body = {"message": message, "sha": sha}
+        if self.branch:
+            body["branch"] = self.branch
+        r = self._request("DELETE", self.url(path), json=body)
+        if r.status_code == 409:
+            raise Conflict(path)
+        if r.status_code != 404:
+            r.raise_for_status()
+
+    def _blob_shas(self, tree: str, paths) -> dict[str, str | None]:
+        """Blob sha of each of ``paths`` in ``tree``; ``None`` where missing.
+
+        Reads the (non-recursive) tree listing of each directory on the way
+        to the paths, once each: names and shas only, never file bodies.
+        """
+        listings: dict[str, dict | None] = {}
+
+        def listing(directory: str) -> dict | None:
+            if directory not in listings:
+                if directory:
+                    parent, _, name = directory.rpartition("/")
+                    entry = (listing(parent) or {}).get(name)
+                    sha = entry["sha"] if entry and entry["type"] == "tree" else None
+                else:
+                    sha = tree
+                found = None
+                if sha is not None:
+                    body = self._api("GET", f"git/trees/{sha}")
+                    if body.get("truncated"):
+                        raise ValueError(f"tree listing of {directory or '/'} is truncated")
+                    found = {e["path"]: e for e in body["tree"]}
+                listings[directory] = found
+            return listings[directory]
+
+        out = {}
+        for path in paths:
+            directory, _, name = path.rpartition("/")
+            entry = (listing(directory) or {}).get(name)
+            if entry is not None and entry["type"] != "blob":
+                raise ValueError(f"{path} is not a file")
+            out[path] = entry["sha"] if entry is not None else None
+        return out
+
+    def commit(
+        self, changes: dict[str, bytes | None], message: str, expected: dict[str, str | None]
+    ) -> dict[str, str]:
+        """Write and delete several paths in one commit via the git data API.
+
+        ``changes`` maps paths to new content, or ``None`` to delete;
+        ``expected`` holds the blob sha each path had when it was read
+        (``None`` for new files). Their current shas are read from the
+        head's tree listings of just the directories holding them, without
+        downloading any file; the new tree is built on top of the head's.
+        Returns the new blob sha per written path.
+        """
+        branch = self._branch()
+        head = self._api("GET", f"git/ref/heads/{branch}")["object"]["sha"]
+        base_tree = self._api("GET", f"git/commits/{head}")["tree"]["sha"]
+        current = self._blob_shas(base_tree, expected)
+        for path, sha in expected.items():
+            if current[path] != sha:
+                raise Conflict(path)
+
+        entries = []
+        for path, content in changes.items():
+            entry = {"path": path, "mode": "100644", "type": "blob"}
+            if content is None:
+                entry["sha"] = None
+            else:
+                entry["content"] = content.decode("utf-8")
+            entries.append(entry)
+        new_tree = self._api("POST", "git/trees", json={"base_tree": base_tree, "tree": entries})
+        new_commit = self._api(
+            "POST", "git/commits",
+            json={"message": message, "tree": new_tree["sha"], "parents": [head]},
+        )
+        r = self._request(
+            "PATCH", f"{self.api}/repos/{self.repo}/git/refs/heads/{branch}",
+            json={"sha": new_commit["sha"], "force": False},
+        )
+        if r.status_code == 422:
+            raise Conflict(branch)
+        r.raise_for_status()
+        return {p: blob_sha(c) for p, c in changes.items() if c is not None}
+
+
+class LocalContents:
+    """Directory-backed stand-in for the contents API, for offline use and tests.
+
+    ``stats`` counts requests and payload bytes the way they would go over
+    the wire (base64 encoded).
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {
+            "get": 0, "put": 0, "delete": 0, "commit": 0,
+            "bytes_sent": 0, "bytes_received": 0,
+        }
+
+    def _file(self, path: str) -> Path:
+        return self.root / path
+
+    def _sha(self, path: str) -> str | None:
+        f = self._file(path)
+        return blob_sha(f.read_bytes()) if f.exists() else None
+
+    def get(self, path: str) -> tuple[bytes, str] | None:
+        with self.lock:
+            self.stats["get"] += 1
+            f = self._file(path)
+            if not f.exists():
+                return None
+            content = f.read_bytes()
+            size = len(base64.b64encode(content))
+            self.stats["bytes_received"] += size
+            trace.count("bytes_received", size)
+            return content, blob_sha(content)
+
+    def put(self, path: str, content: bytes, message: str, sha: str | None = None) -> str:
+        with self.lock:
+            self.stats["put"] += 1
+            size = len(base64.b64encode(content))
+            self.stats["bytes_sent"] += size
+            trace.count("bytes_sent", size)
+            current = self._sha(path)
+            if current is not None and sha != current:
+                raise Conflict(path)
+            f = self._file(path)
+            f.parent.mkdir(parents=True, exist_ok=True)
+            f.write_bytes(content)
+            return blob_sha(content)
+
+    def delete(self, path: str, message: str, sha: str) -> None:
+        with self.lock:
+            self.stats["delete"] += 1
+            current = self._sha(path)
+            if current is None:
+                return
+            if sha != current:
+                raise Conflict(path)
+            self._file(path).unlink()
+
+    def commit(
+        self, changes: dict[str, bytes | None], message: str, expected: dict[str, str | None]
+    ) -> dict[str, str]:
+        with self.lock:
+            self.stats["commit"] += 1
+            for path, sha in expected.items():
+                if self._sha(path) != sha:
+                    raise Conflict(path)
+            shas = {}
+            for path, content in changes.items():
+                f = self._file(path)
+                if content is None:
+                    f.unlink(missing_ok=True)
+                    continue
+                size = len(base64.b64encode(content))
+                self.stats["bytes_sent"] += size
+                trace.count("bytes_sent", size)
+                f.parent.mkdir(parents=True, exist_ok=True)
+                f.write_bytes(content)
+                shas[path] = blob_sha(content)
+            return shas
@@ -0,0 +1,308 @@
+"""Statement history: every generated statement, kept and indexed.
+
+``showHistory`` in the browser is still a placeholder, and an owner asking
+for an old statement used to mean finding the original export and running
+it again. Each batch run (with ``--history``) now stores an immutable
+record per owner: a digest of the inputs, the computed totals including
+per-reservation figures, and the rendered output. Records are compressed,
+indexed by owner and period, and never rewritten; re-running a period with
+a re-pulled export adds a new version next to the old one, while a re-run
+whose inputs match the latest version adds nothing. A period whose inputs
+go back to an earlier state gets a new version too, so the latest version
+is always the current statement. Two versions of a period can be compared
+without recomputing either:
+
+    python -m guesty_reports.history history.db --owner NAME [--period 2026-09] [--diff]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from . import trace
+from .engine import CODE, MONEY_COLUMNS, TEXT_COLUMNS, Statement
+from .ledger import as_ledger, period_key
+
+# Per-reservation figures kept for diffs.
+RESERVATION_FIELDS = ["gross", "acc", "clean", "pmc", "website_fee", "vrbo_fee", "tax"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    sha TEXT PRIMARY KEY,
+    format TEXT NOT NULL,
+    body BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    created REAL NOT NULL,
+    inputs TEXT NOT NULL,
+    totals BLOB NOT NULL,
+    output TEXT NOT NULL REFERENCES outputs(sha)
+);
+CREATE INDEX IF NOT EXISTS statements_period ON statements (owner, year, month, id);
+CREATE TRIGGER IF NOT EXISTS statements_immutable BEFORE UPDATE ON statements
+BEGIN SELECT RAISE(ABORT, 'statement history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS statements_keep BEFORE DELETE ON statements
+BEGIN SELECT RAISE(ABORT, 'statement history is append-only'); END;
+"""
+
+
+@dataclass
+class Record:
+    """One statement ready to store; built in batch workers, stored by the parent."""
+
+    owner: str
+    year: int
+    month: int
+    inputs: str
+    totals: bytes
+    output: bytes
+    format: str
+
+
+def inputs_digest(statement: Statement, expenses=None) -> str:
+    """Digest of everything a statement is computed from.
+
+    The owner and period, the owner configuration, the export columns of
+    the reservations it covers and the expense entries that apply.
+    """
+    ledger = as_ledger(expenses)
+    period = period_key(statement.year, statement.month)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((statement.owner, statement.year, statement.month)).encode())
+    h.update(json.dumps(statement.config, sort_keys=True).encode())
+    for prop, res in statement.reservations.items():
+        h.update(prop.encode())
+        rows = res[MONEY_COLUMNS + TEXT_COLUMNS]
+        h.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+        exp = ledger.entries_for(statement.owner, prop, period)
+        h.update(json.dumps(exp, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _reservation_figures(res) -> dict[str, dict]:
+    out: dict[str, dict] = {}
+    values = res[RESERVATION_FIELDS].to_numpy().tolist()
+    for code, row in zip(res[CODE].tolist(), values):
+        key = code or "(no code)"
+        n = 1
+        while key in out:
+            n += 1
+            key = f"{code or '(no code)'}#{n}"
+        out[key] = dict(zip(RESERVATION_FIELDS, row))
+    return out
+
+
+def statement_totals(statement: Statement, expenses=None) -> dict:
+    """The JSON-able part of a record: configuration, totals and per-reservation figures."""
+    ledger = as_ledger(expenses)
+    period = period_key(statement.year, statement.month)
+    return {
+        "owner": statement.owner,
+        "year": statement.year,
+        "month": statement.month,
+        "config": statement.config,
+        "master": statement.master.as_dict(),
+        "properties": {p: t.as_dict() for p, t in statement.properties.items()},
+        "reservations": {
+            p: _reservation_figures(res) for p, res in statement.reservations.items()
+        },
+        "expenses": {
+            p: ledger.entries_for(statement.owner, p, period) for p in statement.properties
+        },
+        "tax": statement.tax_by_property,
+    }
+
+
+def make_record(statement: Statement, expenses, output: bytes, fmt: str = "html") -> Record:
+    totals = json.dumps(statement_totals(statement, expenses), separators=(",", ":"))
+    return Record(
+        owner=statement.owner,
+        year=statement.year,
+        month=statement.month,
+        inputs=inputs_digest(statement, expenses),
+        totals=zlib.compress(totals.encode("utf-8"), 6),
+        output=zlib.compress(output, 6),
+        format=fmt,
+    )
+
+
+def _diff_fields(old: dict, new: dict) -> dict[str, tuple[int, int]]:
+    return {
+        k: (old.get(k, 0), new.get(k, 0))
+        for k in sorted(set(old) | set(new))
+        if old.get(k, 0) != new.get(k, 0)
+    }
+
+
+def diff_totals(old: dict, new: dict) -> dict:
+    """What changed between two stored versions of a statement.
+
+    ``master`` and each property's ``totals`` map changed fields to
+    ``(old, new)`` cents; reservations are matched by confirmation code and
+    reported as ``added``, ``removed`` or ``changed``.
+    """
+    out = {"master": _diff_fields(old["master"], new["master"]), "properties": {}}
+    props = list(old["properties"]) + [p for p in new["properties"] if p not in old["properties"]]
+    for prop in props:
+        o_res = old["reservations"].get(prop, {})
+        n_res = new["reservations"].get(prop, {})
+        entry = {
+            "totals": _diff_fields(old["properties"].get(prop, {}), new["properties"].get(prop, {})),
+            "added": [c for c in n_res if c not in o_res],
+            "removed": [c for c in o_res if c not in n_res],
+            "changed": {},
+        }
+        for code in o_res.keys() & n_res.keys():
+            changed = _diff_fields(o_res[code], n_res[code])
+            if changed:
+                entry["changed"][code] = changed
+        if any(entry.values()):
+            out["properties"][prop] = entry
+    return out
+
+
+class HistoryStore:
+    """Append-only sqlite store of statement records."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def put(self, record: Record) -> int:
+        """Store a record as the period's newest version.
+
+        Nothing is added when the latest version has the same inputs and
+        output; its id is returned instead.
+        """
+        sha = hashlib.sha256(record.output).hexdigest()
+        with trace.span("persist", store="history"), self.lock, self.db:
+            latest = self.db.execute(
+                "SELECT id, inputs, output FROM statements "
+                "WHERE owner = ? AND year = ? AND month = ? ORDER BY id DESC LIMIT 1",
+                (record.owner, record.year, record.month),
+            ).fetchone()
+            if latest is not None and latest[1:] == (record.inputs, sha):
+                return latest[0]
+            self.db.execute(
+                "INSERT OR IGNORE INTO outputs VALUES (?, ?, ?)", (sha, record.format, record.output)
+            )
+            cur = self.db.execute(
+                "INSERT INTO statements "
+                "(owner, year, month, created, inputs, totals, output) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (record.owner, record.year, record.month, time.time(),
+                 record.inputs, record.totals, sha),
+            )
+        return cur.lastrowid
+
+    def record(self, statement: Statement, expenses, output: bytes, fmt: str = "html") -> int:
+        return self.put(make_record(statement, expenses, output, fmt))
+
+    def periods(self, owner: str) -> list[tuple[int, int, int]]:
+        """``(year, month, versions)`` for every period stored for ``owner``, newest first."""
+        with self.lock:
+            return self.db.execute(
+                "SELECT year, month, COUNT(*) FROM statements WHERE owner = ? "
+                "GROUP BY year, month ORDER BY year DESC, month DESC",
+                (owner,),
+            ).fetchall()
+
+    def versions(self, owner: str, year: int, month: int) -> list[dict]:
+        """Stored versions of one period, oldest first."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, created, inputs FROM statements "
+                "WHERE owner = ? AND year = ? AND month = ? ORDER BY id",
+                (owner, year, month),
+            ).fetchall()
+        return [{"id": i, "created": c, "inputs": d} for i, c, d in rows]
+
+    def latest(self, owner: str, year: int, month: int) -> int | None:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT MAX(id) FROM statements WHERE owner = ? AND year = ? AND month = ?",
+                (owner, year, month),
+            ).fetchone()
+        return row[0]
+
+    def totals(self, record_id: int) -> dict:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT totals FROM statements WHERE id = ?", (record_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(record_id)
+        return json.loads(zlib.decompress(row[0]))
+
+    def output(self, record_id: int) -> tuple[bytes, str]:
+        """Rendered statement and its format (``html`` or ``pdf``)."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT o.body, o.format FROM statements s JOIN outputs o ON o.sha = s.output "
+                "WHERE s.id = ?",
+                (record_id,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(record_id)
+        return zlib.decompress(row[0]), row[1]
+
+    def diff(self, old_id: int, new_id: int) -> dict:
+        return diff_totals(self.totals(old_id), self.totals(new_id))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Stored statement history")
+    parser.add_argument("db", help="history database written by the batch run")
+    parser.add_argument("--owner", required=True)
+    parser.add_argument("--period", help="YYYY-MM; lists periods when omitted")
+    parser.add_argument("--diff", action="store_true", help="compare the last two versions")
+    parser.add_argument("--out", help="write the latest version's output here")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.db)
+    try:
+        if not args.period:
+            for year, month, n in store.periods(args.owner):
+                print(f"{period_key(year, month)}  {n} version(s)")
+            return 0
+        year, month = map(int, args.period.split("-"))
+        versions = store.versions(args.owner, year, month)
+        if not versions:
+            print(f"no statements for {args.owner} {args.period}", file=sys.stderr)
+            return 1
+        for v in versions:
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(v["created"]))
+            print(f"#{v['id']}  {created}  {v['inputs']}")
+        if args.out:
+            body, _ = store.output(versions[-1]["id"])
+            Path(args.out).write_bytes(body)
+        if args.diff and len(versions) > 1:
+            print(json.dumps(store.diff(versions[-2]["id"], versions[-1]["id"]), indent=2))
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
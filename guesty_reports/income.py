@@ -0,0 +1,322 @@
+"""Income and GRI (gross rental income) reports over any date range.
+
+``runIncomeReport`` in the browser can only report on the statement on
+screen: one owner, one month, one export. ``IncomeCube`` keeps monthly
+aggregates by property and platform, filled from each export as it is
+processed, so a report for any range and any set of properties is a
+grouped query over a few rows per property-month. Reservation-level rows
+are kept alongside and read only for the GRI detail listing and for the
+partial months at either end of a range that does not start or end on a
+month boundary.
+
+    python -m guesty_reports.income income.db --ingest export.csv
+    python -m guesty_reports.income income.db --from 2024-01 --to 2026-12 \\
+        [--property NAME ...] [--by platform] [--detail]
+"""
+
+from __future__ import annotations
+
+import argparse
+import calendar
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import trace
+from .engine import (
+    BASE_COLUMNS, CHECK_IN, CHECK_OUT, CODE, LISTING, PLATFORM, TAX_COLUMNS, base_columns,
+)
+from .ledger import period_key
+from .money import format_cents
+
+MEASURES = ["reservations", "gross", "acc", "clean", "tax"]
+GROUPS = ("property", "platform", "month")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cube (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    property TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    reservations INTEGER NOT NULL,
+    gross INTEGER NOT NULL,
+    acc INTEGER NOT NULL,
+    clean INTEGER NOT NULL,
+    tax INTEGER NOT NULL,
+    PRIMARY KEY (year, month, property, platform)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reservations (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    property TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    code TEXT NOT NULL,
+    check_in TEXT NOT NULL,
+    check_out TEXT NOT NULL,
+    gross INTEGER NOT NULL,
+    acc INTEGER NOT NULL,
+    clean INTEGER NOT NULL,
+    tax INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reservations_period ON reservations (year, month, property);
+"""
+
+
+@dataclass(frozen=True)
+class DateRange:
+    """Inclusive check-in date range."""
+
+    start: date
+    end: date
+
+    @classmethod
+    def parse(cls, start: str, end: str) -> "DateRange":
+        """``YYYY-MM`` or ``YYYY-MM-DD`` bounds; a bare month covers the whole month."""
+        def bound(text: str, last: bool) -> date:
+            parts = [int(p) for p in text.split("-")]
+            if len(parts) == 2:
+                y, m = parts
+                return date(y, m, calendar.monthrange(y, m)[1] if last else 1)
+            return date(*parts)
+
+        rng = cls(bound(start, False), bound(end, True))
+        if rng.end < rng.start:
+            raise ValueError(f"empty range {start} to {end}")
+        return rng
+
+    def months(self) -> list[tuple[int, int]]:
+        y, m = self.start.year, self.start.month
+        out = []
+        while (y, m) <= (self.end.year, self.end.month):
+            out.append((y, m))
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        return out
+
+    def split(self) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        """Months wholly inside the range, and the partial months at its ends."""
+        full, partial = [], []
+        for y, m in self.months():
+            first, last = date(y, m, 1), date(y, m, calendar.monthrange(y, m)[1])
+            (full if self.start <= first and last <= self.end else partial).append((y, m))
+        return full, partial
+
+
+def cube_rows(
+    frame: pd.DataFrame,
+    base: dict | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Monthly (property, platform) aggregates and reservation rows of a
+    prepared export.
+
+    Stay dates are kept as ``YYYY-MM-DD``; a time suffix on the export's
+    dates is dropped so range filters compare whole days. ``base`` is the
+    export's derived ``BASE_COLUMNS`` (see ``derived``), read instead of
+    recomputed when given.
+    """
+    keep = (frame[CHECK_IN] != "").to_numpy() & (frame["year"].to_numpy() > 0)
+    rows = frame[keep]
+    if base is not None:
+        amounts = {c: np.asarray(base[c])[keep] for c in BASE_COLUMNS}
+    else:
+        amounts = base_columns(rows)
+    detail = pd.DataFrame({
+        "year": rows["year"].astype("int64"),
+        "month": rows["month"].astype("int64"),
+        "property": rows[LISTING].replace("", "Unknown"),
+        "platform": rows[PLATFORM].str.lower().str.strip(),
+        "code": rows[CODE],
+        "check_in": rows[CHECK_IN].str[:10],
+        "check_out": rows[CHECK_OUT].str[:10],
+        **amounts,
+        "tax": rows[TAX_COLUMNS].to_numpy().sum(axis=1),
+    })
+    keys = ["year", "month", "property", "platform"]
+    cube = detail.groupby(keys, sort=False).agg(
+        reservations=("code", "size"),
+        gross=("gross", "sum"),
+        acc=("acc", "sum"),
+        clean=("clean", "sum"),
+        tax=("tax", "sum"),
+    ).reset_index()
+    return cube, detail
+
+
+class IncomeCube:
+    """sqlite file of monthly income aggregates by property and platform.
+
+    ``path`` may be ``":memory:"`` for a cube that lives only as long as
+    the object (the service keeps one per export).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def ingest(self, frame: pd.DataFrame, base: dict | None = None) -> list[tuple[int, int]]:
+        """Load a prepared export, replacing each (property, month) it contains.
+
+        Properties the export has no rows for keep what they had, so an
+        export of some owners, or a batch run limited to one, does not
+        wipe the rest of the month. Returns the months written.
+        """
+        cube, detail = cube_rows(frame, base)
+        periods = sorted({(int(y), int(m)) for y, m in zip(cube["year"], cube["month"])})
+        keys = sorted({
+            (int(y), int(m), p) for y, m, p in zip(cube["year"], cube["month"], cube["property"])
+        })
+        with trace.span("persist", store="income"), self.lock, self.db:
+            for table in ("cube", "reservations"):
+                self.db.executemany(
+                    f"DELETE FROM {table} WHERE year = ? AND month = ? AND property = ?", keys
+                )
+            self.db.executemany(
+                "INSERT INTO cube VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                cube.itertuples(index=False, name=None),
+            )
+            self.db.executemany(
+                "INSERT INTO reservations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                detail.itertuples(index=False, name=None),
+            )
+        return periods
+
+    def months(self) -> list[str]:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT DISTINCT year, month FROM cube ORDER BY year, month"
+            ).fetchall()
+        return [period_key(y, m) for y, m in rows]
+
+    def properties(self) -> list[str]:
+        with self.lock:
+            return [p for (p,) in self.db.execute(
+                "SELECT DISTINCT property FROM cube ORDER BY property"
+            )]
+
+    @staticmethod
+    def _where(months, properties) -> tuple[str, list]:
+        sql = f"(year, month) IN (VALUES {', '.join(['(?, ?)'] * len(months))})"
+        args: list = [v for ym in months for v in ym]
+        if properties is not None:
+            props = list(properties)
+            sql += f" AND property IN ({', '.join('?' * len(props))})"
+            args += props
+        return sql, args
+
+    def totals(
+        self, start: str, end: str, properties=None, by: tuple[str, ...] = ("property",)
+    ) -> pd.DataFrame:
+        """Income measures (in cents) for the range, grouped by any of
+        ``property``, ``platform`` and ``month``.
+
+        Whole months come from the cube; partial months at the ends of the
+        range are summed from reservation rows by check-in date.
+        """
+        unknown = set(by) - set(GROUPS)
+        if unknown:
+            raise ValueError(f"cannot group by {sorted(unknown)}")
+        rng = DateRange.parse(start, end)
+        full, partial = rng.split()
+        keys = ["printf('%04d-%02d', year, month)" if g == "month" else g for g in by]
+        select = "".join(f"{k}, " for k in keys)
+        group = f" GROUP BY {', '.join(keys)}" if keys else ""
+
+        queries, args = [], []
+        if full:
+            where, a = self._where(full, properties)
+            queries.append(
+                f"SELECT {select}SUM(reservations), SUM(gross), SUM(acc), SUM(clean), SUM(tax) "
+                f"FROM cube WHERE {where}{group}"
+            )
+            args += a
+        if partial:
+            where, a = self._where(partial, properties)
+            queries.append(
+                f"SELECT {select}COUNT(*), SUM(gross), SUM(acc), SUM(clean), SUM(tax) "
+                f"FROM reservations WHERE {where} AND date(check_in) BETWEEN ? AND ?{group}"
+            )
+            args += a + [rng.start.isoformat(), rng.end.isoformat()]
+        with self.lock:
+            rows = self.db.execute(" UNION ALL ".join(queries), args).fetchall()
+
+        out = pd.DataFrame(rows, columns=list(by) + MEASURES).fillna(0)
+        if by:
+            out = out.groupby(list(by), sort=True)[MEASURES].sum().reset_index()
+        else:
+            out = out[MEASURES].sum().to_frame().T
+        out[MEASURES] = out[MEASURES].astype("int64")
+        return out
+
+    def gri(self, start: str, end: str, properties=None) -> int:
+        """Gross rental income (accommodation) for the range, in cents."""
+        return int(self.totals(start, end, properties, by=())["acc"].iloc[0])
+
+    def gri_detail(self, start: str, end: str, properties=None) -> pd.DataFrame:
+        """Reservation-level GRI listing: property, stay and accommodation."""
+        rng = DateRange.parse(start, end)
+        where, args = self._where(rng.months(), properties)
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT property, check_in, check_out, platform, code, acc FROM reservations "
+                f"WHERE {where} AND date(check_in) BETWEEN ? AND ? ORDER BY property, check_in",
+                args + [rng.start.isoformat(), rng.end.isoformat()],
+            ).fetchall()
+        return pd.DataFrame(
+            rows, columns=["property", "check_in", "check_out", "platform", "code", "acc"]
+        )
+
+    def report(
+        self, start: str, end: str, properties=None, by: str | tuple[str, ...] = "property",
+        detail: bool = False,
+    ) -> pd.DataFrame:
+        """The income report for the range: ``gri_detail`` with ``detail``,
+        otherwise ``totals`` grouped by ``by``."""
+        if detail:
+            return self.gri_detail(start, end, properties)
+        return self.totals(start, end, properties, (by,) if isinstance(by, str) else tuple(by))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Income and GRI reports over a date range")
+    parser.add_argument("db", help="income cube database")
+    parser.add_argument("--ingest", action="append", help="add an export (repeatable)")
+    parser.add_argument("--from", dest="start", help="YYYY-MM or YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="YYYY-MM or YYYY-MM-DD")
+    parser.add_argument("--property", action="append", help="limit to this property")
+    parser.add_argument("--by", action="append", choices=GROUPS, help="group by (repeatable)")
+    parser.add_argument("--detail", action="store_true", help="list reservations (GRI detail)")
+    args = parser.parse_args(argv)
+
+    cube = IncomeCube(args.db)
+    if args.ingest:
+        from .ingest import read_export
+
+        for path in args.ingest:
+            written = cube.ingest(read_export(path))
+            print(f"{path}: {len(written)} month(s)")
+    if args.start and args.end:
+        report = cube.report(
+            args.start, args.end, args.property, tuple(args.by or ["property"]), args.detail
+        )
+        for col in ("gross", "acc", "clean", "tax"):
+            if col in report:
+                report[col] = format_cents(report[col])
+        print(report.to_string(index=False))
+    cube.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
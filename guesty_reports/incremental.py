@@ -0,0 +1,159 @@
+"""Incremental updates to a computed statement.
+
+Deleting an expense or overriding one reservation's accommodation or
+cleaning figure in the browser re-runs ``processData`` and
+``displayStatement`` over every property. ``StatementModel`` instead
+adjusts the one affected property's totals and tax entry, applies the
+same delta to the master totals, and marks only that property's section
+for re-rendering.
+
+The model works on its own copy of the statement (totals and one
+reservation frame per property), so statements shared through a cache
+are never changed. The Streamlit statement view and the service's
+``override`` parameter apply reservation overrides through it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+
+from .engine import CODE, FEES, Statement, Totals
+from .ledger import ExpenseLedger, as_ledger, period_key
+from .money import apply_rate, to_cents
+from .render import FOOT, render_head, render_property, render_summary_cards
+
+
+def own_copy(statement: Statement) -> Statement:
+    """``statement`` with its own totals and reservation frames."""
+    return replace(
+        statement,
+        properties={p: replace(t) for p, t in statement.properties.items()},
+        master=replace(statement.master),
+        # Explicit copies: the engine's frames are slices of the export.
+        reservations={p: r.copy() for p, r in statement.reservations.items()},
+        tax_by_property={p: dict(t) for p, t in statement.tax_by_property.items()},
+    )
+
+
+class StatementModel:
+    def __init__(self, statement: Statement, expenses=None):
+        self.statement = own_copy(statement)
+        self.ledger: ExpenseLedger = as_ledger(expenses)
+        self.period = period_key(statement.year, statement.month)
+        self.percent = statement.config.get("percent") or 0
+        # (property, confirmation code) -> original (acc, clean) in cents
+        self.originals: dict[tuple[str, str], tuple[int, int]] = {}
+        # Every section still has to be rendered once.
+        self.dirty: set[str] = set(self.statement.properties)
+        self.sections: dict[str, str] = {}
+
+    def _applies(self, entry: dict) -> bool:
+        return (
+            entry.get("owner") == self.statement.owner
+            and entry.get("property") in self.statement.properties
+            and entry.get("period") in (None, "", self.period)
+        )
+
+    def _update_property(self, prop: str, **deltas) -> None:
+        old = self.statement.properties[prop]
+        new = replace(old)
+        for name, delta in deltas.items():
+            setattr(new, name, getattr(new, name) + delta)
+        new.settle(deduct_fees=self.statement.config.get("type") == "payout")
+        self.statement.master.add(new)
+        self.statement.master.add(old, sign=-1)
+        self.statement.properties[prop] = new
+        tax = self.statement.tax_by_property.get(prop)
+        if tax is not None:
+            # As the engine computes it: the property's owner net less its tax.
+            tax["netReportable"] = new.owner - new.tax
+        self.dirty.add(prop)
+
+    def add_expense(self, entry: dict) -> set[str]:
+        """Record a new expense (or replace one with the same id)."""
+        self.remove_expense(entry.get("id"))
+        self.ledger.add(entry)
+        if self._applies(entry):
+            self._update_property(entry["property"], expenses=to_cents(entry.get("amount")))
+        return self.dirty
+
+    def remove_expense(self, expense_id) -> set[str]:
+        entry = self.ledger.remove(expense_id)
+        if entry is not None and self._applies(entry):
+            self._update_property(entry["property"], expenses=-to_cents(entry.get("amount")))
+        return self.dirty
+
+    def update_expense(self, expense_id, **changes) -> set[str]:
+        entry = dict(self.ledger.remove(expense_id) or {"id": expense_id})
+        if self._applies(entry):
+            self._update_property(entry["property"], expenses=-to_cents(entry.get("amount")))
+        entry.update(changes)
+        return self.add_expense(entry)
+
+    def set_override(
+        self, prop: str, code: str, acc: float | None = None, clean: float | None = None
+    ) -> set[str]:
+        """Override one reservation's accommodation and/or cleaning figure.
+
+        Figures are in dollars, as typed. PMC and the platform fees follow
+        the new accommodation; passing ``None`` for a field restores the
+        exported value.
+        """
+        res = self.statement.reservations[prop]
+        hits = (res[CODE] == code).to_numpy()
+        if not hits.any():
+            raise KeyError(f"{code} not in {prop}")
+        label = res.index[hits][0]
+        row = res.loc[label]
+        self.originals.setdefault((prop, code), (int(row["acc"]), int(row["clean"])))
+        base_acc, base_clean = self.originals[(prop, code)]
+
+        new_acc = base_acc if acc is None else to_cents(acc)
+        new_clean = base_clean if clean is None else to_cents(clean)
+        one = res.loc[[label]].copy()
+        one["acc"] = new_acc
+        fees = {k: int(v[0]) for k, v in FEES.evaluate(one, self.statement.config.get("type")).items()}
+        new_pmc = apply_rate(new_acc, self.percent)
+
+        deltas = {
+            "acc": new_acc - int(row["acc"]),
+            "clean": new_clean - int(row["clean"]),
+            "pmc": new_pmc - int(row["pmc"]),
+            **{k: v - int(row[k]) for k, v in fees.items()},
+        }
+        if not any(deltas.values()):
+            return self.dirty
+        res.loc[label, ["acc", "clean", "pmc", *fees]] = [new_acc, new_clean, new_pmc, *fees.values()]
+        self._update_property(prop, **deltas)
+        return self.dirty
+
+    def clear_override(self, prop: str, code: str) -> set[str]:
+        return self.set_override(prop, code)
+
+    def property_of(self, code: str) -> str:
+        """Property of the reservation with confirmation code ``code``."""
+        for prop, res in self.statement.reservations.items():
+            if (res[CODE] == code).any():
+                return prop
+        raise KeyError(code)
+
+    @property
+    def master(self) -> Totals:
+        return self.statement.master
+
+    def render_dirty(self) -> tuple[str, dict[str, str]]:
+        """Summary grid plus the sections of properties changed since last call."""
+        sections = {
+            prop: render_property(self.statement, prop, self.ledger)
+            for prop in self.statement.properties
+            if prop in self.dirty
+        }
+        self.dirty.clear()
+        return render_summary_cards(self.statement), sections
+
+    def render(self) -> str:
+        """The whole statement; only sections changed since the last call are rebuilt."""
+        summary, sections = self.render_dirty()
+        self.sections.update(sections)
+        body = "".join(self.sections[p] for p in self.statement.properties)
+        return render_head(self.statement) + summary + body + FOOT
@@ -0,0 +1,99 @@
+"""Period and listing partition index over a prepared export.
+
+Row ids are sorted once by (check-in period, listing) so every
+``(year, month)`` and every listing within it is a contiguous slice of
+``order``. Pulling one month, or a few properties of one month, is then
+a couple of dictionary lookups plus a ``take`` of just those rows.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .engine import LISTING
+
+
+def listing_names(frame: pd.DataFrame) -> pd.Series:
+    """Property name as statements show it: blank nicknames become ``Unknown``."""
+    return frame[LISTING].where(frame[LISTING] != "", "Unknown")
+
+
+class PartitionIndex:
+    def __init__(self, order: np.ndarray, listings: list[str], slices: dict):
+        self.order = order
+        self.listings_ = listings
+        # period -> (start, stop, {listing: (start, stop)})
+        self.slices = slices
+
+    @classmethod
+    def build(cls, frame: pd.DataFrame) -> "PartitionIndex":
+        period = frame["year"].to_numpy().astype(np.int64) * 100 + frame["month"].to_numpy()
+        codes, listings = pd.factorize(listing_names(frame), sort=False)
+        order = np.lexsort((codes, period)).astype(np.int64)
+        period_sorted = period[order]
+        codes_sorted = codes[order]
+
+        slices: dict[int, tuple] = {}
+        if len(order):
+            key = period_sorted * (len(listings) + 1) + codes_sorted
+            starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+            stops = np.r_[starts[1:], len(order)]
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                p = int(period_sorted[start])
+                if p <= 0:
+                    continue
+                name = str(listings[codes_sorted[start]])
+                entry = slices.setdefault(p, [start, stop, {}])
+                entry[1] = stop
+                entry[2][name] = (start, stop)
+        slices = {p: (s, e, groups) for p, (s, e, groups) in slices.items()}
+        return cls(order, [str(x) for x in listings], slices)
+
+    def periods(self) -> list[tuple[int, int]]:
+        return [divmod(p, 100) for p in sorted(self.slices)]
+
+    def listings(self, year: int, month: int) -> list[str]:
+        entry = self.slices.get(year * 100 + month)
+        return list(entry[2]) if entry else []
+
+    def rows(self, year: int, month: int, listings=None) -> np.ndarray:
+        """Row ids for the period, in export order, optionally for some listings."""
+        entry = self.slices.get(year * 100 + month)
+        if entry is None:
+            return np.empty(0, dtype=np.int64)
+        start, stop, groups = entry
+        if listings is None:
+            ids = self.order[start:stop]
+        else:
+            parts = [self.order[slice(*groups[name])] for name in listings if name in groups]
+            ids = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        return np.sort(ids)
+
+    def take(self, frame: pd.DataFrame, year: int, month: int, listings=None) -> pd.DataFrame:
+        return frame.iloc[self.rows(year, month, listings)]
+
+    def save(self, directory) -> None:
+        directory = Path(directory)
+        np.save(directory / "index-order.npy", self.order, allow_pickle=False)
+        slices = {
+            str(p): [s, e, {k: list(v) for k, v in g.items()}]
+            for p, (s, e, g) in self.slices.items()
+        }
+        (directory / "index.json").write_text(
+            json.dumps({"listings": self.listings_, "slices": slices})
+        )
+
+    @classmethod
+    def load(cls, directory) -> "PartitionIndex":
+        directory = Path(directory)
+        meta = json.loads((directory / "index.json").read_text())
+        order = np.load(directory / "index-order.npy", mmap_mode="r")
+        slices = {
+            int(p): (s, e, {k: tuple(v) for k, v in g.items()})
+            for p, (s, e, g) in meta["slices"].items()
+        }
+        return cls(order, meta["listings"], slices)
@@ -0,0 +1,121 @@
+"""Indexed expense ledger.
+
+Expenses are kept in data.json as a flat list that only grows. The ledger
+indexes them by (owner, property, period) and keeps a running total per
+key (in cents), so a statement's expense figures are dictionary lookups
+rather than scans of the whole history.
+
+New entries carry ``period`` (``"YYYY-MM"``, the statement month they were
+entered against). Older entries written before periods existed have none;
+they stay in an undated bucket that applies to every period, which is how
+the browser has always treated them.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from . import trace
+from .money import to_cents
+
+UNDATED = None
+
+
+def period_key(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}"
+
+
+class ExpenseLedger:
+    def __init__(self, entries: Iterable[dict] = ()):
+        self._by_id: dict = {}
+        self._by_key: dict[tuple, dict] = {}
+        self._totals: dict[tuple, int] = {}
+        # (owner, period) -> {property: entry count}
+        self._props: dict[tuple, dict[str, int]] = {}
+        for e in entries:
+            self.add(e)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def entries(self) -> list[dict]:
+        """All entries in insertion order, ready to be written back to data.json."""
+        return list(self._by_id.values())
+
+    @staticmethod
+    def _key(e: dict) -> tuple:
+        return (e.get("owner"), e.get("property"), e.get("period") or UNDATED)
+
+    def add(self, entry: dict) -> dict:
+        if entry.get("id") in self._by_id:
+            self.remove(entry["id"])
+        key = self._key(entry)
+        self._by_id[entry.get("id")] = entry
+        self._by_key.setdefault(key, {})[entry.get("id")] = entry
+        self._totals[key] = self._totals.get(key, 0) + to_cents(entry.get("amount"))
+        props = self._props.setdefault((key[0], key[2]), {})
+        props[key[1]] = props.get(key[1], 0) + 1
+        return entry
+
+    def remove(self, expense_id) -> dict | None:
+        entry = self._by_id.pop(expense_id, None)
+        if entry is None:
+            return None
+        key = self._key(entry)
+        bucket = self._by_key[key]
+        del bucket[expense_id]
+        self._totals[key] -= to_cents(entry.get("amount"))
+        props = self._props[(key[0], key[2])]
+        props[key[1]] -= 1
+        if not bucket:
+            del self._by_key[key], self._totals[key]
+        if not props[key[1]]:
+            del props[key[1]]
+        return entry
+
+    def update(self, expense_id, **changes) -> dict:
+        entry = dict(self._by_id[expense_id])
+        entry.update(changes)
+        return self.add(entry)
+
+    def _periods(self, period) -> tuple:
+        return (UNDATED,) if period is UNDATED else (period, UNDATED)
+
+    def total(self, owner: str, prop: str, period: str | None) -> int:
+        return sum(self._totals.get((owner, prop, p), 0) for p in self._periods(period))
+
+    def entries_for(self, owner: str, prop: str, period: str | None) -> list[dict]:
+        out = []
+        for p in self._periods(period):
+            out.extend(self._by_key.get((owner, prop, p), {}).values())
+        return out
+
+    def totals_for(self, owner: str, period: str | None) -> dict[str, int]:
+        """Expense total in cents per property for one owner and period."""
+        props: set = set()
+        for p in self._periods(period):
+            counts = self._props.get((owner, p), {})
+            props.update(counts)
+            trace.count("expenses_scanned", sum(counts.values()))
+        return {prop: self.total(owner, prop, period) for prop in props}
+
+
+def owner_expenses(expenses: Iterable[dict], owner: str, year: int, month: int) -> list[dict]:
+    """Entries of ``expenses`` that can apply to ``owner``'s statement for the period.
+
+    Dated entries apply to their own period only, undated ones to every period.
+    """
+    period = period_key(year, month)
+    return [
+        e for e in expenses
+        if e.get("owner") == owner and e.get("period") in (UNDATED, "", period)
+    ]
+
+
+def as_ledger(expenses) -> ExpenseLedger:
+    if isinstance(expenses, ExpenseLedger):
+        return expenses
+    return ExpenseLedger(expenses or [])
@@ -0,0 +1,163 @@
+"""Local stand-in for the Guesty Open API reservations endpoint.
+
+Serves ``GET /v1/reservations`` with the parameters ``sync`` uses
+(``limit``, ``skip``, ``sort=lastUpdatedAt`` and a ``lastUpdatedAt $gte``
+filter) from an in-memory list, checks the bearer token, and counts
+requests, so the sync client can be exercised without network access:
+
+    with MockGuesty(sample_reservations(500)) as guesty:
+        sync(GuestyClient(guesty.token, guesty.api), store)
+        guesty.touch(some_id, status="cancelled")
+        guesty.fault(guesty.requests + 2, 429)
+
+``fault`` makes a given request fail, to test retries and resuming.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MAX_LIMIT = 100
+
+
+def now_iso() -> str:
+    t = datetime.now(timezone.utc)
+    return t.strftime("%Y-%m-%dT%H:%M:%S.") + f"{t.microsecond // 1000:03d}Z"
+
+
+def sample_reservations(n: int, seed: int = 0, start: date = date(2026, 1, 1)) -> list[dict]:
+    """``n`` reservations shaped like the API's, checking in over the year
+    from ``start`` and last updated during the year before it."""
+    rng = random.Random(seed)
+    listings = [f"Unit {i}" for i in range(1, 21)]
+    platforms = ["airbnb2", "homeaway", "bookingCom", "manual", "website"]
+    out = []
+    for i in range(n):
+        check_in = start + timedelta(days=rng.randrange(365))
+        fare = round(rng.uniform(150, 2500), 2)
+        cleaning = rng.choice([75.0, 100.0, 150.0])
+        taxes = round(fare * 0.11, 2)
+        out.append({
+            "_id": f"res{i:06d}",
+            "confirmationCode": f"GY-{i:06d}",
+            "checkInDateLocalized": check_in.isoformat(),
+            "checkOutDateLocalized": (check_in + timedelta(days=rng.randint(2, 9))).isoformat(),
+            "status": rng.choice(["confirmed"] * 9 + ["cancelled"]),
+            "source": "manual",
+            "integration": {"platform": rng.choice(platforms)},
+            "listing": {"nickname": rng.choice(listings)},
+            "money": {
+                "hostPayout": round(fare + cleaning + taxes, 2),
+                "fareAccommodation": fare,
+                "fareCleaning": cleaning,
+                "invoiceItems": [
+                    {"title": "City tax", "amount": round(taxes * 0.4, 2)},
+                    {"title": "State tax", "amount": round(taxes * 0.6, 2)},
+                ],
+            },
+            "lastUpdatedAt": f"{start - timedelta(days=rng.randint(1, 365))}T"
+                             f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00.000Z",
+        })
+    return out
+
+
+class MockGuesty:
+    def __init__(self, reservations: list[dict], token: str = "test-token"):
+        self.token = token
+        self.lock = threading.Lock()
+        self.reservations = {r["_id"]: dict(r) for r in reservations}
+        self.requests = 0
+        # request number -> status to answer it with instead
+        self.faults: dict[int, int] = {}
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                mock._handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.api = f"http://127.0.0.1:{self.server.server_port}/v1"
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "MockGuesty":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "MockGuesty":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def touch(self, reservation_id: str, **changes) -> None:
+        """Change a reservation (or add one) and bump its ``lastUpdatedAt``."""
+        with self.lock:
+            r = self.reservations.setdefault(reservation_id, {"_id": reservation_id})
+            r.update(changes)
+            r["lastUpdatedAt"] = now_iso()
+
+    def fault(self, request: int, status: int) -> None:
+        """Answer the ``request``-th request (counting from 1) with ``status``.
+
+        A 429 comes with ``Retry-After: 0``.
+        """
+        with self.lock:
+            self.faults[request] = status
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        with self.lock:
+            self.requests += 1
+            fault = self.faults.pop(self.requests, None)
+        if fault is not None:
+            headers = {"Retry-After": "0"} if fault == 429 else {}
+            return self._send(handler, fault, {"message": "injected fault"}, headers)
+        url = urlparse(handler.path)
+        if url.path != "/v1/reservations":
+            return self._send(handler, 404, {"message": "not found"})
+        if handler.headers.get("Authorization") != f"Bearer {self.token}":
+            return self._send(handler, 401, {"message": "unauthorized"})
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        limit = min(int(query.get("limit", 25)), MAX_LIMIT)
+        skip = int(query.get("skip", 0))
+        since = None
+        for f in json.loads(query.get("filters", "[]")):
+            if f.get("field") == "lastUpdatedAt" and f.get("operator") == "$gte":
+                since = f["value"]
+        with self.lock:
+            matches = [
+                dict(r) for r in self.reservations.values()
+                if since is None or r.get("lastUpdatedAt", "") >= since
+            ]
+        matches.sort(key=lambda r: (r.get("lastUpdatedAt", ""), r["_id"]))
+        self._send(handler, 200, {
+            "results": matches[skip:skip + limit],
+            "count": len(matches),
+            "limit": limit,
+            "skip": skip,
+        })
+
+    @staticmethod
+    def _send(
+        handler: BaseHTTPRequestHandler, status: int, body: dict, headers: dict | None = None
+    ) -> None:
+        data = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
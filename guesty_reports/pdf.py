@@ -0,0 +1,267 @@
+"""Native PDF statements drawn with reportlab.
+
+The browser produces PDFs through ``window.print()`` one owner at a time.
+Here the same statement layout (header, financial summary, one section
+per property with its reservation and expense tables) is laid out with
+reportlab platypus. Paragraph styles and table styles are built once per
+process and shared by every document; table cells are plain strings so
+large reservation tables do not pay for paragraph layout.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from html import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from . import trace
+from .engine import CHECK_IN, CHECK_OUT, CODE, PLATFORM, Statement
+from .ledger import as_ledger, period_key
+from .money import money, to_cents
+from .render import header_dates, money_column
+
+FONT = "Helvetica"
+BOLD = "Helvetica-Bold"
+GREY = colors.HexColor("#666666")
+LINE = colors.HexColor("#e0e0e0")
+CARD_BG = colors.HexColor("#f9f5f9")
+HEAD_BG = colors.HexColor("#f5f5f5")
+ZEBRA = colors.HexColor("#fafafa")
+
+
+@lru_cache(maxsize=None)
+def styles() -> dict:
+    """Paragraph styles shared by every document in the process."""
+    return {
+        "company": ParagraphStyle("company", fontName=BOLD, fontSize=16, leading=20),
+        "info": ParagraphStyle("info", fontName=FONT, fontSize=8, leading=12),
+        "right": ParagraphStyle(
+            "right", fontName=FONT, fontSize=8, leading=12, alignment=TA_RIGHT
+        ),
+        "title": ParagraphStyle(
+            "title", fontName=BOLD, fontSize=22, leading=28, alignment=TA_CENTER, spaceBefore=18
+        ),
+        "owner": ParagraphStyle(
+            "owner", fontName=BOLD, fontSize=18, leading=24, alignment=TA_CENTER
+        ),
+        "details": ParagraphStyle(
+            "details", fontName=FONT, fontSize=9, leading=12, alignment=TA_CENTER,
+            textColor=GREY, spaceAfter=12,
+        ),
+        "section": ParagraphStyle(
+            "section", fontName=BOLD, fontSize=9, leading=12, spaceBefore=10, spaceAfter=4
+        ),
+        "property": ParagraphStyle(
+            "property", fontName=BOLD, fontSize=11, leading=14, spaceBefore=16, spaceAfter=6
+        ),
+        "summary": ParagraphStyle(
+            "summary", fontName=BOLD, fontSize=9, leading=12, alignment=TA_CENTER, spaceBefore=8
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def table_style(kind: str) -> TableStyle:
+    """Table styles, built once: ``header``, ``cards``, ``due`` and ``grid``."""
+    if kind == "header":
+        return TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("LINEBELOW", (0, 0), (-1, 0), 1.5, colors.black),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+        ])
+    if kind == "cards":
+        return TableStyle([
+            ("FONT", (0, 0), (-1, 0), BOLD, 6.5),
+            ("TEXTCOLOR", (0, 0), (-1, 0), GREY),
+            ("FONT", (0, 1), (-1, 1), BOLD, 10),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("BACKGROUND", (0, 0), (-1, -1), CARD_BG),
+            ("BOX", (0, 0), (-1, -1), 0.5, LINE),
+            ("INNERGRID", (0, 0), (-1, -1), 0.5, LINE),
+            ("TOPPADDING", (0, 0), (-1, -1), 5),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
+        ])
+    if kind == "due":
+        return TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), colors.black),
+            ("TEXTCOLOR", (0, 0), (-1, -1), colors.white),
+            ("FONT", (0, 0), (-1, 0), BOLD, 8),
+            ("FONT", (0, 1), (-1, 1), BOLD, 18),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+        ])
+    return TableStyle([
+        ("FONT", (0, 0), (-1, -1), FONT, 7),
+        ("FONT", (0, 0), (-1, 0), BOLD, 7),
+        ("BACKGROUND", (0, 0), (-1, 0), HEAD_BG),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, ZEBRA]),
+        ("GRID", (0, 0), (-1, -1), 0.5, LINE),
+        ("TOPPADDING", (0, 0), (-1, -1), 3),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+    ])
+
+
+def _cards(cards: list[tuple[str, int]]) -> Table:
+    return Table(
+        [[label for label, _ in cards], [money(v) for _, v in cards]],
+        style=table_style("cards"),
+        hAlign="CENTER",
+    )
+
+
+def _due(label: str, value: int) -> Table:
+    return Table([[label], [money(value)]], colWidths=[3 * inch], style=table_style("due"))
+
+
+def _stay(values) -> list[str]:
+    return ["/".join(v.split("-")[1:]) if v else "" for v in values]
+
+
+def _reservation_table(res, draft: bool) -> LongTable | None:
+    if draft:
+        res = res[res["gross"].to_numpy() != 0]
+        header = [
+            "CODE", "STAY", "PLATFORM", "ACCOMMODATION", "PMC", "CLEANING", "WEBSITE", "AMOUNT DUE",
+        ]
+    else:
+        header = ["CODE", "STAY", "PLATFORM", "ACCOMMODATION", "PMC", "EXPENSES", "OWNER PAYOUT"]
+    if res.empty:
+        return None
+    stay = [f"{a}-{b}" for a, b in zip(_stay(res[CHECK_IN]), _stay(res[CHECK_OUT]))]
+    cols = [res[CODE].str.slice(0, 8).str.upper().tolist(), stay]
+    if draft:
+        due = res["pmc"].to_numpy() + res["clean"].to_numpy() + res["website_fee"].to_numpy()
+        cols += [
+            res[PLATFORM].tolist(),
+            money_column(res["acc"]).tolist(),
+            money_column(res["pmc"]).tolist(),
+            money_column(res["clean"]).tolist(),
+            money_column(res["website_fee"]).tolist(),
+            money_column(due).tolist(),
+        ]
+    else:
+        payout = (
+            res["acc"].to_numpy() - res["pmc"].to_numpy()
+            - res["website_fee"].to_numpy() - res["vrbo_fee"].to_numpy()
+        )
+        cols += [
+            res[PLATFORM].str.lower().str.strip().tolist(),
+            money_column(res["acc"]).tolist(),
+            money_column(res["pmc"]).tolist(),
+            ["$0.00"] * len(res),
+            money_column(payout).tolist(),
+        ]
+    rows = [header] + [list(r) for r in zip(*cols)]
+    return LongTable(rows, repeatRows=1, style=table_style("grid"), hAlign="LEFT")
+
+
+def statement_flowables(statement: Statement, expenses=None) -> list:
+    st = styles()
+    ledger = as_ledger(expenses)
+    cfg = statement.config
+    draft = cfg.get("type") == "draft"
+    pct = f"{float(cfg.get('percent') or 0) * 100:.2f}"
+    statement_date, period = header_dates(statement.year, statement.month)
+
+    header = Table(
+        [[
+            [
+                Paragraph("OCEAN VACATIONS", st["company"]),
+                Paragraph(
+                    "www.oceanvacationsmb.com<br/>oceanvacationsmb@gmail.com<br/>843-222-6516",
+                    st["info"],
+                ),
+            ],
+            Paragraph(
+                f"STATEMENT DATE:<br/><b>{statement_date}</b><br/>PERIOD: {period}", st["right"]
+            ),
+        ]],
+        colWidths=["60%", "40%"],
+        style=table_style("header"),
+    )
+    m = statement.master
+    if draft:
+        summary = [
+            ("GROSS PAYOUT", m.gross), ("ACCOMMODATION", m.acc), ("CLEANING FEE", m.clean),
+            ("WEBSITE (1%)", m.website_fee), ("EXPENSES", m.expenses), (f"PMC ({pct}%)", m.pmc),
+        ]
+        total = ("AMOUNT DUE", m.draft)
+    else:
+        summary = [
+            ("ACCOMMODATION", m.acc), ("WEBSITE/VRBO FEE", m.website_fee + m.vrbo_fee),
+            ("PMC", m.pmc), ("EXPENSES", m.expenses),
+        ]
+        total = ("OWNER PAYOUT", m.owner)
+
+    flow = [
+        header,
+        Paragraph("RESERVATION REPORT", st["title"]),
+        Paragraph(escape(statement.owner.upper()), st["owner"]),
+        Paragraph(
+            f"TYPE: {escape(str(cfg.get('type', '')).upper())} &nbsp;&nbsp; COMMISSION: {pct}%",
+            st["details"],
+        ),
+        Paragraph("FINANCIAL SUMMARY", st["summary"]),
+        Spacer(1, 4),
+        _cards(summary),
+        Spacer(1, 8),
+        _due(*total),
+    ]
+
+    period_id = period_key(statement.year, statement.month)
+    for prop, t in statement.properties.items():
+        if draft:
+            cards = [
+                ("ACCOMMODATION", t.acc), ("CLEANING FEE", t.clean), ("WEBSITE (1%)", t.website_fee),
+                ("EXPENSES", t.expenses), (f"PMC ({pct}%)", t.pmc),
+            ]
+            due = ("AMOUNT DUE", t.draft)
+        else:
+            cards = [
+                ("ACCOMMODATION", t.acc), ("WEBSITE/VRBO FEE", t.website_fee + t.vrbo_fee),
+                ("PMC", t.pmc), ("EXPENSES", t.expenses),
+            ]
+            due = ("OWNER PAYOUT", t.owner)
+        flow += [Paragraph(escape(prop.upper()), st["property"]), _cards(cards), Spacer(1, 6), _due(*due)]
+        res = statement.reservations.get(prop)
+        table = _reservation_table(res, draft) if res is not None else None
+        if table is not None:
+            flow += [Paragraph("RESERVATIONS", st["section"]), table]
+        exp = ledger.entries_for(statement.owner, prop, period_id)
+        if exp:
+            rows = [["TYPE", "VENDOR", "AMOUNT"]] + [
+                [str(e.get("type", "")), str(e.get("vendor", "")), money(to_cents(e.get("amount")))]
+                for e in exp
+            ]
+            flow += [
+                Paragraph("EXPENSES", st["section"]),
+                Table(rows, repeatRows=1, style=table_style("grid"), hAlign="LEFT"),
+            ]
+    return flow
+
+
+def write_statement_pdf(path, statement: Statement, expenses=None) -> None:
+    """Lay out one statement and write it to ``path``."""
+    doc = SimpleDocTemplate(
+        str(path),
+        pagesize=letter,
+        leftMargin=0.5 * inch,
+        rightMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.5 * inch,
+        title=f"{statement.owner} - {header_dates(statement.year, statement.month)[1]}",
+        author="Ocean Vacations",
+        pageCompression=1,
+        # No creation date or random document id: the same statement gives
+        # the same bytes, so history recognises an unchanged re-run.
+        invariant=1,
+    )
+    with trace.span("render", owner=statement.owner, format="pdf"):
+        doc.build(statement_flowables(statement, expenses))
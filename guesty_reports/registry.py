@@ -0,0 +1,370 @@
+"""Listing ownership registry and single-pass export splitting.
+
+``processData`` credits every listing in the uploaded export to the owner
+on screen, so exports have been split by hand, one per owner. The
+registry records which owner each listing belongs to, and since when, in
+the owner configurations of data.json (the browser keeps unknown keys of
+an owner object when it saves):
+
+    "owners": {
+      "Jane Doe": {"percent": 0.2, ...,
+                   "listings": [{"listing": "12 Ocean Unit", "from": "2025-03-01"},
+                                {"listing": "4 Pier House", "to": "2026-07-01"}]}
+    }
+
+``from`` is inclusive, ``to`` exclusive, either may be left out, and a
+reservation belongs to whoever owned the listing on its check-in date.
+An owner's own entries for a listing may repeat or overlap; they count
+as one stretch of ownership.
+Owners whose entries overlap another owner's are left out of the registry
+and listed in ``conflicts`` (the month-close batch fails just them); rows
+their entries cover are ``WITHHELD`` from everyone, never unassigned.
+One portfolio-wide export is then split for every owner in one scan:
+``owner_rows`` returns per-owner row ids of a prepared frame, which
+``owner_statement`` (used by the batch run, the service and the Streamlit
+app alike) turns into each owner's statement, and ``split_export``
+streams a CSV into per-owner CSV partitions.
+
+    python -m guesty_reports.registry export.csv --data data.json --out parts/ \\
+        [--year 2026 --month 9]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .derived import take
+from .engine import CHECK_IN, LISTING, Statement, process_data
+from .store import load_data, owner_key
+
+EPOCH = np.datetime64("1900-01-01", "D")
+# Day numbers stay below this, so (listing, day) packs into one int64.
+DAY_SPAN = 1 << 20
+FOREVER = DAY_SPAN - 1
+# Key of rows nobody owned; ``None`` so no owner name can collide with it.
+UNASSIGNED = None
+UNASSIGNED_FILE = "_unassigned.csv"
+# Key of rows on listings claimed by conflicting owners; not a string either.
+WITHHELD = ("withheld",)
+WITHHELD_FILE = "_withheld.csv"
+# ``assign`` codes of the two.
+UNASSIGNED_CODE = -1
+WITHHELD_CODE = -2
+
+
+@dataclass(frozen=True)
+class Ownership:
+    listing: str
+    owner: str
+    start: date | None = None
+    end: date | None = None
+
+    def covers(self, day: date) -> bool:
+        return (self.start is None or self.start <= day) and (self.end is None or day < self.end)
+
+
+def _day(value: date | None, default: int) -> int:
+    if value is None:
+        return default
+    return int((np.datetime64(value, "D") - EPOCH).astype(np.int64))
+
+
+def check_in_days(frame: pd.DataFrame) -> np.ndarray:
+    """Check-in dates as day numbers; ``-1`` where missing or unparseable.
+
+    Dates are parsed once per distinct value rather than once per row.
+    """
+    codes, uniques = pd.factorize(frame[CHECK_IN].astype(str), sort=False)
+    parsed = pd.to_datetime(pd.Series(uniques).str[:10], format="%Y-%m-%d", errors="coerce")
+    days = (parsed.to_numpy().astype("datetime64[D]") - EPOCH).astype(np.int64)
+    days[parsed.isna().to_numpy()] = -1
+    return days[codes] if len(codes) else np.empty(0, dtype=np.int64)
+
+
+def overlaps(entries: Iterable[Ownership]) -> dict[str, list[str]]:
+    """``{owner: [problem, ...]}`` for owners holding a listing at the same time as another."""
+    out: dict[str, list[str]] = {}
+    held: dict[str, tuple[int, str]] = {}  # listing -> (latest end so far, its owner)
+    for e in sorted(entries, key=lambda e: (e.listing, _day(e.start, 0))):
+        prev = held.get(e.listing)
+        end = _day(e.end, FOREVER)
+        if prev is not None and _day(e.start, 0) < prev[0] and prev[1] != e.owner:
+            out.setdefault(e.owner, []).append(f"{e.listing!r} overlaps {prev[1]!r}")
+            out.setdefault(prev[1], []).append(f"{e.listing!r} overlaps {e.owner!r}")
+        if prev is None or end > prev[0]:
+            held[e.listing] = (end, e.owner)
+    return out
+
+
+def merged(entries: Iterable[Ownership]) -> list[Ownership]:
+    """One entry per stretch of time an owner holds a listing.
+
+    Duplicate, overlapping or back-to-back entries of the same owner and
+    listing are joined, so no two entries of a listing overlap once
+    ``overlaps`` found no conflict between owners.
+    """
+    out: list[Ownership] = []
+    for e in sorted(entries, key=lambda e: (e.listing, e.owner, _day(e.start, 0))):
+        last = out[-1] if out else None
+        if (
+            last is not None and (last.listing, last.owner) == (e.listing, e.owner)
+            and _day(e.start, 0) <= _day(last.end, FOREVER)
+        ):
+            if _day(e.end, FOREVER) > _day(last.end, FOREVER):
+                out[-1] = Ownership(last.listing, last.owner, last.start, e.end)
+            continue
+        out.append(e)
+    return out
+
+
+class OwnershipRegistry:
+    def __init__(self, entries: Iterable[Ownership] = ()):
+        entries = list(entries)
+        self.conflicts = overlaps(entries)
+        # Entries of conflicted owners: their rows are nobody's until resolved.
+        self.withheld = [e for e in entries if e.owner in self.conflicts]
+        entries = merged(e for e in entries if e.owner not in self.conflicts)
+        self.entries = sorted(entries, key=lambda e: (e.listing, _day(e.start, 0)))
+        self.owners = sorted({e.owner for e in self.entries})
+        owner_code = {o: i for i, o in enumerate(self.owners)}
+        self.listing_code: dict[str, int] = {}
+        for e in self.entries:
+            self.listing_code.setdefault(e.listing, len(self.listing_code))
+
+        # Entries as parallel arrays sorted by packed (listing, start) key.
+        self._listing = np.array([self.listing_code[e.listing] for e in self.entries], np.int64)
+        self._start = np.array([_day(e.start, 0) for e in self.entries], np.int64)
+        self._end = np.array([_day(e.end, FOREVER) for e in self.entries], np.int64)
+        self._owner = np.array([owner_code[e.owner] for e in self.entries], np.int32)
+        self._keys = self._listing * DAY_SPAN + self._start
+
+    @classmethod
+    def from_owners(cls, owners: dict) -> "OwnershipRegistry":
+        """Registry from the ``listings`` entries of data.json owner configs."""
+        entries = []
+        for owner, config in owners.items():
+            for item in (config or {}).get("listings") or []:
+                if isinstance(item, str):
+                    item = {"listing": item}
+                entries.append(Ownership(
+                    item["listing"], owner,
+                    date.fromisoformat(item["from"]) if item.get("from") else None,
+                    date.fromisoformat(item["to"]) if item.get("to") else None,
+                ))
+        return cls(entries)
+
+    def __len__(self) -> int:
+        """Entries, withheld ones included: zero only when nobody lists a listing."""
+        return len(self.entries) + len(self.withheld)
+
+    def __contains__(self, owner: str) -> bool:
+        return owner in self.owners
+
+    def owner_of(self, listing: str, day: date) -> str | None:
+        for e in self.entries:
+            if e.listing == listing and e.covers(day):
+                return e.owner
+        return None
+
+    def listings(self, owner: str, on: date | None = None) -> list[str]:
+        """Listings ``owner`` holds on ``on`` (ever held, when ``None``)."""
+        return sorted({
+            e.listing for e in self.entries
+            if e.owner == owner and (on is None or e.covers(on))
+        })
+
+    def assign(self, listings, days: np.ndarray) -> np.ndarray:
+        """Owner code per row (index into ``owners``), ``UNASSIGNED_CODE``
+        where unowned and ``WITHHELD_CODE`` where a conflicted owner's entry
+        covers the row.
+
+        ``listings`` are the rows' property names, ``days`` their check-in
+        day numbers (see ``check_in_days``).
+        """
+        n = len(days)
+        out = np.full(n, UNASSIGNED_CODE, dtype=np.int32)
+        if not len(self) or not n:
+            return out
+        codes, uniques = pd.factorize(pd.Series(listings, dtype=object), sort=False)
+        if self.entries:
+            known = np.array([self.listing_code.get(u, -1) for u in uniques], dtype=np.int64)
+            row_listing = known[codes]
+            keys = row_listing * DAY_SPAN + np.clip(days, -1, FOREVER - 1)
+            at = np.searchsorted(self._keys, keys, side="right") - 1
+            found = np.clip(at, 0, None)
+            ok = (
+                (at >= 0) & (row_listing >= 0) & (days >= 0)
+                & (self._listing[found] == row_listing) & (days < self._end[found])
+            )
+            out[ok] = self._owner[found[ok]]
+        position = {u: i for i, u in enumerate(uniques)}
+        for e in self.withheld:
+            if e.listing in position:
+                hit = (
+                    (codes == position[e.listing])
+                    & (days >= max(_day(e.start, 0), 0)) & (days < _day(e.end, FOREVER))
+                )
+                out[hit & (out == UNASSIGNED_CODE)] = WITHHELD_CODE
+        return out
+
+    def assign_frame(self, frame: pd.DataFrame) -> np.ndarray:
+        names = frame[LISTING].where(frame[LISTING] != "", "Unknown")
+        return self.assign(names.to_numpy(), check_in_days(frame))
+
+
+def listings_key(owners: dict) -> str:
+    """Every owner's ``listings``, as JSON: what a registry is built from."""
+    return json.dumps({o: (c or {}).get("listings") for o, c in owners.items()}, sort_keys=True)
+
+
+def owner_rows(frame: pd.DataFrame, registry: OwnershipRegistry) -> dict[str, np.ndarray]:
+    """Row positions of ``frame`` per owner, in export order, from one pass.
+
+    Every registered owner has an entry, empty if none of the rows are
+    theirs; rows on listings nobody owned at check-in are under
+    ``UNASSIGNED``, and rows claimed by conflicting owners under
+    ``WITHHELD``.
+    """
+    codes = registry.assign_frame(frame)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(WITHHELD_CODE, len(registry.owners) + 1))
+    out = {}
+    for code, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]), start=WITHHELD_CODE):
+        if code >= 0:
+            out[registry.owners[code]] = order[start:stop]
+        elif stop > start:
+            out[bucket(code)] = order[start:stop]
+    return out
+
+
+def bucket(code: int):
+    """Key of an ``assign`` code: an owner name, ``UNASSIGNED`` or ``WITHHELD``."""
+    return {UNASSIGNED_CODE: UNASSIGNED, WITHHELD_CODE: WITHHELD}[code]
+
+
+def owner_statement(
+    frame: pd.DataFrame,
+    owner: str,
+    config: dict,
+    year: int,
+    month: int,
+    expenses=None,
+    split: dict | None = None,
+    index=None,
+    derived: dict | None = None,
+) -> Statement:
+    """``process_data`` over the rows of ``frame`` that are ``owner``'s.
+
+    ``split`` is ``owner_rows`` of ``frame``: registered owners get their
+    rows from it, anyone else only the ``UNASSIGNED`` rows, so listings
+    the registry credits to someone, or withholds while owners conflict,
+    are never counted for anyone else. Without a
+    split (an empty registry) every owner gets the whole frame. ``index``
+    and ``derived`` describe the whole frame.
+    """
+    if not split:
+        return process_data(frame, owner, config, year, month, expenses, index=index, derived=derived)
+    ids = split.get(owner)
+    if ids is None:
+        ids = split.get(UNASSIGNED, np.empty(0, dtype=np.intp))
+    if derived is not None:
+        derived = take(derived, ids)
+    return process_data(frame.iloc[ids], owner, config, year, month, expenses, derived=derived)
+
+
+def owner_file(owner) -> str:
+    """Partition file name; distinct for distinct owners (see ``store.owner_key``)."""
+    if owner is UNASSIGNED:
+        return UNASSIGNED_FILE
+    if owner is WITHHELD:
+        return WITHHELD_FILE
+    return f"{owner_key(owner)}.csv"
+
+
+def split_export(
+    path,
+    registry: OwnershipRegistry,
+    out_dir,
+    periods: Iterable[tuple[int, int]] | None = None,
+    chunksize: int = 50_000,
+) -> dict[str, int]:
+    """Stream ``path`` once into ``out_dir/<owner>.csv`` partitions.
+
+    Rows keep every column and their original text, so each partition is
+    an ordinary export for that owner. Files are named by ``owner_file``.
+    ``periods`` restricts the split to those check-in ``(year, month)``
+    pairs. Returns rows written per owner (``UNASSIGNED`` and ``WITHHELD``
+    for the rest).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    keys = None if periods is None else {y * 100 + m for y, m in periods}
+    counts: dict[str, int] = {}
+    handles: dict[str, object] = {}
+    reader = pd.read_csv(
+        path, dtype=str, keep_default_na=False, skip_blank_lines=True, chunksize=chunksize
+    )
+    try:
+        with reader:
+            for chunk in reader:
+                days = check_in_days(chunk)
+                if keys is not None:
+                    when = EPOCH + np.clip(days, 0, None).astype("timedelta64[D]")
+                    ym = pd.DatetimeIndex(when)
+                    period = (ym.year * 100 + ym.month).to_numpy()
+                    keep = (days >= 0) & np.isin(period, list(keys))
+                    chunk, days = chunk[keep], days[keep]
+                names = chunk[LISTING].where(chunk[LISTING] != "", "Unknown")
+                codes = registry.assign(names.to_numpy(), days)
+                # One stable sort groups the chunk; each owner's rows are a slice.
+                order = np.argsort(codes, kind="stable")
+                found, starts = np.unique(codes[order], return_index=True)
+                stops = np.append(starts[1:], len(order))
+                for code, start, stop in zip(found, starts, stops):
+                    owner = registry.owners[code] if code >= 0 else bucket(code)
+                    part = chunk.iloc[order[start:stop]]
+                    if owner not in handles:
+                        handles[owner] = open(
+                            out_dir / owner_file(owner), "w", encoding="utf-8", newline=""
+                        )
+                        part.to_csv(handles[owner], index=False)
+                    else:
+                        part.to_csv(handles[owner], index=False, header=False)
+                    counts[owner] = counts.get(owner, 0) + len(part)
+    finally:
+        for fh in handles.values():
+            fh.close()
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Split a portfolio export per owner")
+    parser.add_argument("export", help="portfolio-wide Guesty CSV export")
+    parser.add_argument("--data", required=True, help="local copy of data.json")
+    parser.add_argument("--out", required=True, help="directory for per-owner CSVs")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--month", type=int)
+    args = parser.parse_args(argv)
+
+    registry = OwnershipRegistry.from_owners(load_data(args.data)["owners"])
+    for owner, problems in sorted(registry.conflicts.items()):
+        print(f"{owner}: not split, {'; '.join(problems)}", file=sys.stderr)
+    periods = [(args.year, args.month)] if args.year and args.month else None
+    counts = split_export(args.export, registry, args.out, periods)
+    labels = {UNASSIGNED: "(unassigned)", WITHHELD: "(withheld)"}
+    for owner, n in sorted(counts.items(), key=lambda kv: (kv[0] in labels, owner_file(kv[0]))):
+        print(f"{n:8d}  {owner_file(owner)}  {labels.get(owner, owner)}")
+    return 1 if registry.conflicts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
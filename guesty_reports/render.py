@@ -0,0 +1,338 @@
+"""HTML statement output, the server-side counterpart of ``displayStatement``.
+
+Markup lives in ``string.Template`` objects compiled once at import.
+Reservation rows are formatted a column at a time rather than row by row,
+and each property section is cached under a fingerprint of its totals,
+reservation figures and expenses, so re-rendering a statement after an
+edit only rebuilds the sections whose numbers changed. Large reservation
+tables can be paginated, and ``iter_statement`` yields the document
+section by section for writing straight to a file or response.
+"""
+
+from __future__ import annotations
+
+import calendar
+import hashlib
+from html import escape
+from string import Template
+
+import pandas as pd
+
+from . import trace
+from .cache import LRU
+from .engine import CHECK_IN, CHECK_OUT, CODE, PLATFORM, Statement
+from .ledger import as_ledger, period_key
+from .money import format_cents, money, to_cents
+
+MONTHS = [
+    "JANUARY", "FEBRUARY", "MARCH", "APRIL", "MAY", "JUNE",
+    "JULY", "AUGUST", "SEPTEMBER", "OCTOBER", "NOVEMBER", "DECEMBER",
+]
+
+STYLE = """
+*{margin:0;padding:0;box-sizing:border-box}
+body{font-family:Arial;background:#fff;color:#000}
+.page{background:#fff;padding:40px}
+.invoice-header{display:flex;justify-content:space-between;margin-bottom:40px;border-bottom:2px solid #000;padding-bottom:30px}
+.company-info{font-size:11px;line-height:1.8}
+.company-name{font-size:20px;font-weight:bold;margin-bottom:5px}
+.right-header{text-align:right;font-size:11px;line-height:1.8}
+.report-title{text-align:center;font-size:32px;font-weight:bold;margin:40px 0 10px 0;letter-spacing:2px}
+.owner-name{text-align:center;font-size:28px;margin-bottom:10px;font-weight:bold;color:#000}
+.owner-details{text-align:center;font-size:13px;color:#666;margin-bottom:40px}
+.owner-detail-item{display:inline-block;margin:0 15px}
+table{width:100%;border-collapse:collapse;margin:20px 0;font-size:11px}
+th,td{border:1px solid #e0e0e0;padding:12px;text-align:left}
+th{background:#f5f5f5;color:#000;font-weight:bold;text-transform:uppercase}
+tr:nth-child(even){background:#fafafa}
+.property-section{margin:40px 0;padding:20px;border:1px solid #ddd;border-radius:5px;background:#fff}
+.property-title{font-size:14px;font-weight:bold;margin-bottom:15px;display:flex;align-items:center;text-transform:uppercase}
+.property-icon{font-size:18px;margin-right:10px}
+.summary-title{font-size:12px;font-weight:bold;text-transform:uppercase;text-align:center;margin:20px 0}
+.summary-grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(140px,1fr));gap:12px;margin:20px 0}
+.summary-card{background:#f9f5f9;border:1px solid #ddd;padding:12px;text-align:center;border-radius:5px}
+.summary-label{font-size:10px;color:#666;font-weight:bold;text-transform:uppercase}
+.summary-value{font-size:14px;font-weight:bold;color:#000;margin-top:6px}
+.section-title{font-size:12px;font-weight:bold;text-transform:uppercase;margin-top:20px;margin-bottom:10px;color:#000}
+.amount-due-container{text-align:center;margin:30px 0}
+.amount-due-box{background:#000;color:#fff;border:none;border-radius:5px;padding:20px;display:inline-block;min-width:300px}
+.amount-due-label{font-size:12px;font-weight:bold;text-transform:uppercase;margin-bottom:10px}
+.amount-due-value{font-size:32px;font-weight:bold}
+"""
+
+CARD = Template(
+    "<div class='summary-card'><div class='summary-label'>$label</div>"
+    "<div class='summary-value'>$value</div></div>"
+)
+DARK_CARD = Template(
+    "<div class='summary-card' style='background:#000;color:#fff;border-color:#000'>"
+    "<div class='summary-label' style='color:#fff'>$label</div>"
+    "<div class='summary-value' style='color:#fff'>$value</div></div>"
+)
+SUMMARY = Template(
+    "<div class='summary-title'>FINANCIAL SUMMARY</div><div class='summary-grid'>$cards</div>"
+)
+PROPERTY = Template(
+    "<div class='property-section'><div class='property-title'>"
+    "<span class='property-icon'>&#127968;</span>$name</div>"
+    "<div class='summary-grid'>$cards</div>"
+    "<div class='amount-due-container'><div class='amount-due-box'>"
+    "<div class='amount-due-label'>$due_label</div>"
+    "<div class='amount-due-value'>$due</div></div></div>"
+    "<div style='margin-top:15px'><div class='section-title'>RESERVATIONS</div>"
+    "$pager<table style='margin-top:10px'>$header$rows</table></div>$expenses</div>"
+)
+DRAFT_HEADER = (
+    "<tr><th>CODE</th><th>STAY</th><th>PLATFORM</th><th>ACCOMMODATION</th>"
+    "<th>PMC</th><th>CLEANING</th><th>WEBSITE</th><th>AMOUNT DUE</th></tr>"
+)
+PAYOUT_HEADER = (
+    "<tr><th>CODE</th><th>STAY</th><th>PLATFORM</th><th>ACCOMMODATION</th>"
+    "<th>PMC</th><th>EXPENSES</th><th>OWNER PAYOUT</th></tr>"
+)
+PAGER = Template("<div class='pager'>RESERVATIONS $first-$last OF $total</div>")
+EXPENSES = Template(
+    "<div style='margin-top:15px'><div class='section-title'>EXPENSES</div>"
+    "<table style='margin-top:10px'><tr><th>TYPE</th><th>VENDOR</th><th>AMOUNT</th></tr>"
+    "$rows</table></div>"
+)
+EXPENSE_ROW = Template("<tr><td>$type</td><td>$vendor</td><td>$amount</td></tr>")
+HEAD = Template(
+    "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+    "<title>$owner - $period</title><style>$style</style></head><body>"
+    "<div class='page'><div class='invoice-header'><div class='company-info'>"
+    "<div class='company-name'>OCEAN VACATIONS</div><div>www.oceanvacationsmb.com</div>"
+    "<div>oceanvacationsmb@gmail.com</div><div>843-222-6516</div></div>"
+    "<div class='right-header'><div>STATEMENT DATE:<br><strong>$statement_date</strong></div>"
+    "<div>PERIOD: $period</div></div></div>"
+    "<div class='report-title'>RESERVATION REPORT</div>"
+    "<div class='owner-name'>$owner_upper</div><div class='owner-details'>"
+    "<div class='owner-detail-item'>TYPE: $type</div>"
+    "<div class='owner-detail-item'>COMMISSION: $pct%</div></div>"
+)
+FOOT = "</div></body></html>"
+
+FRAGMENTS = LRU(maxsize=4096)
+ROW_COLUMNS = ["gross", "acc", "clean", "pmc", "website_fee", "vrbo_fee"]
+
+
+def money_column(values) -> pd.Series:
+    """``money()`` over a whole column of cents."""
+    return pd.Series(format_cents(values), dtype=object)
+
+
+def header_dates(year: int, month: int) -> tuple[str, str]:
+    """Statement date and period strings from ``updateHeaderDates``."""
+    last = calendar.monthrange(year, month)[1]
+    next_month, next_year = (1, year + 1) if month == 12 else (month + 1, year)
+    statement_date = f"{MONTHS[next_month - 1]} 1ST {next_year}"
+    period = f"{MONTHS[month - 1]} 1ST - {last}TH {year}"
+    return statement_date, period
+
+
+def _card(label: str, value, dark: bool = False) -> str:
+    return (DARK_CARD if dark else CARD).substitute(label=label, value=money(value))
+
+
+def _pct(statement: Statement) -> str:
+    return f"{float(statement.config.get('percent') or 0) * 100:.2f}"
+
+
+def _text(series: pd.Series) -> pd.Series:
+    return series.astype(object).map(escape)
+
+
+def _stay(res: pd.DataFrame) -> pd.Series:
+    def md(col):
+        return res[col].str.split("-", n=1).str[1].fillna("").str.replace("-", "/")
+    return _text(md(CHECK_IN) + "-" + md(CHECK_OUT))
+
+
+def _reservation_rows(res: pd.DataFrame, draft: bool) -> str:
+    """Table rows for ``res``, formatted column-wise."""
+    if draft:
+        res = res[res["gross"].to_numpy() != 0]
+    if res.empty:
+        return ""
+    code = _text(res[CODE].str.slice(0, 8).str.upper()).to_numpy()
+    stay = _stay(res).to_numpy()
+    acc = money_column(res["acc"]).to_numpy()
+    pmc = money_column(res["pmc"]).to_numpy()
+    if draft:
+        platform = _text(res[PLATFORM]).to_numpy()
+        due = res["pmc"].to_numpy() + res["clean"].to_numpy() + res["website_fee"].to_numpy()
+        cells = [
+            code, stay, platform, acc, pmc,
+            money_column(res["clean"]).to_numpy(),
+            money_column(res["website_fee"]).to_numpy(),
+            money_column(due).to_numpy(),
+        ]
+    else:
+        platform = _text(res[PLATFORM].str.lower().str.strip()).to_numpy()
+        payout = (
+            res["acc"].to_numpy() - res["pmc"].to_numpy()
+            - res["website_fee"].to_numpy() - res["vrbo_fee"].to_numpy()
+        )
+        cells = [code, stay, platform, acc, pmc, "$0.00", money_column(payout).to_numpy()]
+    row = "<tr><td>" + cells[0]
+    for col in cells[1:]:
+        row = row + "</td><td>" + col
+    return "".join(row + "</td></tr>")
+
+
+def fingerprint(statement: Statement, prop: str, expenses: list[dict], page=None) -> str:
+    """Key for a property section: everything the rendered markup depends on."""
+    h = hashlib.blake2b(digest_size=16)
+    cfg = statement.config
+    h.update(repr((prop, cfg.get("type"), cfg.get("percent"), page)).encode())
+    h.update(repr(statement.properties[prop].as_dict()).encode())
+    res = statement.reservations.get(prop)
+    if res is not None and len(res):
+        cols = [CODE, CHECK_IN, CHECK_OUT, PLATFORM] + ROW_COLUMNS
+        h.update(pd.util.hash_pandas_object(res[cols], index=False).to_numpy().tobytes())
+    h.update(repr([(e.get("type"), e.get("vendor"), e.get("amount")) for e in expenses]).encode())
+    return h.hexdigest()
+
+
+def render_property(
+    statement: Statement,
+    prop: str,
+    expenses=None,
+    page: int | None = None,
+    page_size: int | None = None,
+) -> str:
+    """One ``property-section`` block: totals, reservations and expenses.
+
+    With ``page_size`` only that page of the reservation table is rendered
+    (``page`` counts from 0). Sections are served from the fragment cache
+    when nothing they show has changed.
+    """
+    exp = as_ledger(expenses).entries_for(
+        statement.owner, prop, period_key(statement.year, statement.month)
+    )
+    paging = (page or 0, page_size) if page_size else None
+    key = fingerprint(statement, prop, exp, paging)
+    cached = FRAGMENTS.get(key)
+    if cached is not None:
+        return cached
+
+    t = statement.properties[prop]
+    draft = statement.config.get("type") == "draft"
+    if draft:
+        cards = [
+            _card("ACCOMMODATION", t.acc),
+            _card("CLEANING FEE", t.clean),
+            _card("WEBSITE (1%)", t.website_fee),
+            _card("EXPENSES", t.expenses),
+            _card(f"PMC ({_pct(statement)}%)", t.pmc),
+        ]
+        due_label, due = "AMOUNT DUE", t.draft
+    else:
+        cards = [
+            _card("ACCOMMODATION", t.acc),
+            _card("WEBSITE/VRBO FEE", t.website_fee + t.vrbo_fee),
+            _card("PMC", t.pmc),
+            _card("EXPENSES", t.expenses),
+        ]
+        due_label, due = "OWNER PAYOUT", t.owner
+
+    res = statement.reservations.get(prop)
+    if res is None:
+        res = pd.DataFrame(columns=[CODE, CHECK_IN, CHECK_OUT, PLATFORM] + ROW_COLUMNS)
+    pager = ""
+    if paging:
+        start = paging[0] * page_size
+        total = len(res)
+        res = res.iloc[start:start + page_size]
+        pager = PAGER.substitute(
+            first=min(start + 1, total), last=min(start + page_size, total), total=total
+        )
+
+    expense_html = ""
+    if exp:
+        expense_html = EXPENSES.substitute(rows="".join(
+            EXPENSE_ROW.substitute(
+                type=escape(str(e.get("type", ""))),
+                vendor=escape(str(e.get("vendor", ""))),
+                amount=money(to_cents(e.get("amount"))),
+            )
+            for e in exp
+        ))
+
+    html = PROPERTY.substitute(
+        name=escape(prop.upper()),
+        cards="".join(cards),
+        due_label=due_label,
+        due=money(due),
+        pager=pager,
+        header=DRAFT_HEADER if draft else PAYOUT_HEADER,
+        rows=_reservation_rows(res, draft),
+        expenses=expense_html,
+    )
+    FRAGMENTS.put(key, html)
+    return html
+
+
+def render_summary_cards(statement: Statement) -> str:
+    """The ``FINANCIAL SUMMARY`` grid at the top of a statement."""
+    m = statement.master
+    if statement.config.get("type") == "draft":
+        cards = [
+            _card("GROSS PAYOUT", m.gross),
+            _card("ACCOMMODATION", m.acc),
+            _card("CLEANING FEE", m.clean),
+            _card("WEBSITE (1%)", m.website_fee),
+            _card("EXPENSES", m.expenses),
+            _card(f"PMC ({_pct(statement)}%)", m.pmc),
+            _card("AMOUNT DUE", m.draft, dark=True),
+        ]
+    else:
+        cards = [
+            _card("ACCOMMODATION", m.acc),
+            _card("WEBSITE/VRBO FEE", m.website_fee + m.vrbo_fee),
+            _card("PMC", m.pmc),
+            _card("EXPENSES", m.expenses),
+            _card("OWNER PAYOUT", m.owner, dark=True),
+        ]
+    return SUMMARY.substitute(cards="".join(cards))
+
+
+def render_head(statement: Statement) -> str:
+    """Document head, letterhead and owner block of a standalone statement."""
+    statement_date, period = header_dates(statement.year, statement.month)
+    return HEAD.substitute(
+        owner=escape(statement.owner),
+        owner_upper=escape(statement.owner.upper()),
+        period=period,
+        statement_date=statement_date,
+        style=STYLE,
+        type=escape(str(statement.config.get("type", "")).upper()),
+        pct=_pct(statement),
+    )
+
+
+def iter_statement(statement: Statement, expenses=None, page_size: int | None = None):
+    """Yield a standalone HTML statement piece by piece.
+
+    With ``page_size`` each property shows its first page of reservations.
+    """
+    expenses = as_ledger(expenses)
+    yield render_head(statement)
+    yield render_summary_cards(statement)
+    for prop in statement.properties:
+        yield render_property(statement, prop, expenses, 0 if page_size else None, page_size)
+    yield FOOT
+
+
+def render_statement(statement: Statement, expenses=None, page_size: int | None = None) -> str:
+    """Full standalone HTML document for one owner's monthly statement."""
+    with trace.span("render", owner=statement.owner, format="html"):
+        return "".join(iter_statement(statement, expenses, page_size))
+
+
+def write_statement(path, statement: Statement, expenses=None) -> None:
+    """Stream a statement to ``path`` without building the whole string."""
+    with trace.span("render", owner=statement.owner, format="html"):
+        with open(path, "w", encoding="utf-8") as fh:
+            for chunk in iter_statement(statement, expenses):
+                fh.write(chunk)
@@ -0,0 +1,120 @@
+"""Platform fees as a declarative rules table, evaluated column-wise.
+
+The browser decides fees in three places that disagree: ``processData``
+charges draft owners 1% on website *or* manual bookings without an ``HA``
+code, the draft table in ``displayStatement`` only checks ``website``,
+and the payout table deducts 1% (website) or 5% (homeaway/vrbo) per row
+that never reaches ``masterTotals``. Here each fee is one ``FeeRule``:
+
+    FeeRule("vrbo_fee", 0.05, owner_type="payout", platforms=("homeaway", "vrbo"), exact=True)
+
+and ``RuleSet.evaluate`` turns the table into the fee columns for a whole
+frame at once. Platform, status and code-prefix tests run once per
+distinct value (there are a handful) and are broadcast back to the rows
+by their factorized codes, so no string is lowercased per row per rule.
+``derive`` calls it once per statement; every view reads the resulting
+``website_fee``/``vrbo_fee`` columns and their totals.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .money import apply_rate
+
+FEE_COLUMNS = ("website_fee", "vrbo_fee")
+
+
+@dataclass(frozen=True)
+class FeeRule:
+    """``rate`` of column ``base`` added to column ``fee`` where every test holds.
+
+    ``platforms``/``statuses`` match when the lowercased value contains one
+    of them (equals, with ``exact``); empty means any. Codes starting with
+    one of ``skip_code_prefixes`` (case-insensitive) are exempt. With
+    ``positive`` the rule applies only where that column is above zero.
+    """
+
+    fee: str
+    rate: float
+    base: str = "gross"
+    owner_type: str | None = None
+    platforms: tuple[str, ...] = ()
+    exact: bool = False
+    statuses: tuple[str, ...] = ()
+    skip_code_prefixes: tuple[str, ...] = ()
+    positive: str | None = None
+
+
+FEE_RULES = (
+    # processData: draft owners pay 1% of the payout on direct bookings.
+    FeeRule("website_fee", 0.01, owner_type="draft", platforms=("website", "manual"),
+            skip_code_prefixes=("HA",), positive="acc"),
+    # The payout table: 1% on website bookings, 5% on homeaway/vrbo.
+    FeeRule("website_fee", 0.01, owner_type="payout", platforms=("website",), exact=True),
+    FeeRule("vrbo_fee", 0.05, owner_type="payout", platforms=("homeaway", "vrbo"), exact=True),
+)
+
+
+class _Facts:
+    """Per-frame memo of the factorized text columns the rules test."""
+
+    def __init__(self, rows: pd.DataFrame, columns: dict[str, str]):
+        self.rows = rows
+        self.columns = columns
+        self._factors: dict = {}
+
+    def _factor(self, key, values) -> tuple[np.ndarray, np.ndarray]:
+        if key not in self._factors:
+            codes, uniques = pd.factorize(values, sort=False)
+            self._factors[key] = codes, np.asarray(uniques, dtype=object)
+        return self._factors[key]
+
+    def matches(self, name: str, needles: tuple[str, ...], exact: bool) -> np.ndarray:
+        codes, uniques = self._factor(name, self.rows[self.columns[name]])
+        lowered = [str(u).lower().strip() for u in uniques]
+        if exact:
+            hit = [u in needles for u in lowered]
+        else:
+            hit = [any(n in u for n in needles) for u in lowered]
+        return np.append(np.array(hit, dtype=bool), False)[codes]
+
+    def code_prefix(self, prefix: str) -> np.ndarray:
+        n = len(prefix)
+        codes, uniques = self._factor(("code", n), self.rows[self.columns["code"]].str[:n])
+        hit = np.array([str(u).upper() == prefix.upper() for u in uniques], dtype=bool)
+        return np.append(hit, False)[codes]
+
+
+class RuleSet:
+    """``rules`` compiled against a frame's platform, code and status columns."""
+
+    def __init__(self, rules, platform: str, code: str, status: str):
+        self.rules = tuple(rules)
+        self.columns = {"platform": platform, "code": code, "status": status}
+        self.fees = tuple(dict.fromkeys(FEE_COLUMNS + tuple(r.fee for r in self.rules)))
+
+    def evaluate(self, rows: pd.DataFrame, owner_type: str | None) -> dict[str, np.ndarray]:
+        """Fee columns in cents for ``rows`` of an owner of ``owner_type``."""
+        n = len(rows)
+        out = {fee: np.zeros(n, dtype="int64") for fee in self.fees}
+        active = [r for r in self.rules if r.owner_type in (None, owner_type)]
+        if not n or not active:
+            return out
+        facts = _Facts(rows, self.columns)
+        for rule in active:
+            mask = np.ones(n, dtype=bool)
+            if rule.platforms:
+                mask &= facts.matches("platform", rule.platforms, rule.exact)
+            if rule.statuses:
+                mask &= facts.matches("status", rule.statuses, rule.exact)
+            for prefix in rule.skip_code_prefixes:
+                mask &= ~facts.code_prefix(prefix)
+            if rule.positive:
+                mask &= rows[rule.positive].to_numpy() > 0
+            if mask.any():
+                out[rule.fee] += np.where(mask, apply_rate(rows[rule.base].to_numpy(), rule.rate), 0)
+        return out
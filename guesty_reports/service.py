@@ -0,0 +1,526 @@
+"""Statement service: one process serving every staff member's views.
+
+Each browser tab downloads data.json, parses the export and aggregates on
+its own, with a GitHub token kept in ``localStorage``. The service does it
+once for everybody: the data document is read through ``DataSource`` from
+the repository backend it was started with, exports are parsed into the
+``ExportCache`` with their derived columns (see ``derived``), and parsed
+exports, statements, rendered pages and income cubes sit in
+``SingleFlight`` caches, one per kind (``CACHE_SIZES``), shared by all
+request threads. Ten people opening
+the same month cost one computation; the ones who ask while it runs wait
+for it rather than starting their own.
+
+    python -m guesty_reports.service --repo reports/ --exports exports/ \\
+        [--cache cache/] [--snapshots snapshots.db] [--history history.db] [--port 8080]
+
+``--repo`` is a local checkout standing in for the reports repository
+(``github.LocalContents``). Exports are the CSV files in ``--exports``,
+named by file name. Endpoints (GET; amounts in JSON are cents):
+
+    /exports                                      export files
+    /statement?export=&owner=&period=2026-09      statement HTML (&format=json: totals)
+        [&override=CODE:ACC:CLEAN ...]            with reservation figures overridden (dollars)
+    /summary?export=&owner=&period=               summary cards and totals
+    /income?export=&from=2026-01&to=2026-09       income by property (&by=platform, &property=, &detail=1)
+    /1099?year=2026[&owner=][&through=9]          year-to-date 1099 figures (needs --snapshots)
+    /history?owner=[&period=][&id=][&diff=1,2]    stored statements (needs --history)
+    /stats                                        cache counters
+
+and ``POST /edit`` with a ``writequeue`` operation, or ``{"ops": [...],
+"message": ...}``, changes the data document. Edits are journaled in the
+cache directory and committed to the repository in coalesced batches by a
+``WriteQueue``; views see them at once. With ``--edit-token`` (default
+``$GITHUB_TOKEN``, the token the browser saves with) an edit must carry
+``Authorization: token <it>``; without one, edits are only accepted from
+this machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import sys
+import threading
+import time
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from . import trace
+from .cache import ExportCache, SingleFlight
+from .datasource import DataSource
+from .derived import DerivedColumns
+from .github import LocalContents
+from .history import HistoryStore
+from .incremental import StatementModel
+from .income import IncomeCube
+from .ledger import owner_expenses, period_key
+from .registry import OwnershipRegistry, listings_key, owner_rows, owner_statement
+from .render import render_statement, render_summary_cards
+from .snapshots import SnapshotStore
+from .store import ShardedStore
+from .writequeue import WriteQueue, apply_op
+
+# Seconds between checks of the data document for changes.
+DATA_TTL = 30.0
+INCOME_GROUPS = ("property", "platform")
+# Entries kept per kind of result; statements and pages get ``maxsize``.
+# Parsed exports and income cubes are large, so few of them are kept,
+# and they cannot push the cheap pages out.
+CACHE_SIZES = {"export": 8, "income": 8, "registry": 16, "split": 32, "1099": 64}
+
+
+class RequestError(Exception):
+    """A request the service cannot answer; ``status`` is the HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_period(text: str | None) -> tuple[int, int]:
+    try:
+        year, month = (int(p) for p in (text or "").split("-"))
+    except ValueError:
+        raise RequestError(400, f"period must be YYYY-MM, not {text!r}") from None
+    if not 1 <= month <= 12:
+        raise RequestError(400, f"no month {month}")
+    return year, month
+
+
+def parse_override(text: str) -> tuple[str, float | None, float | None]:
+    """``CODE:ACC:CLEAN`` in dollars; an empty figure keeps the exported one."""
+    try:
+        code, acc, clean = text.rsplit(":", 2)
+        return code, float(acc) if acc else None, float(clean) if clean else None
+    except ValueError:
+        raise RequestError(400, f"override must be CODE:ACC:CLEAN, not {text!r}") from None
+
+
+class StatementService:
+    """The views of the browser report, computed once and shared."""
+
+    def __init__(
+        self,
+        source: DataSource,
+        exports,
+        cache: ExportCache,
+        snapshots=None,
+        history=None,
+        maxsize: int = 256,
+        edits: WriteQueue | None = None,
+        edit_token: str | None = None,
+    ):
+        self.source = source
+        self.exports = Path(exports)
+        self.cache = cache
+        self.layers = DerivedColumns(cache)
+        self.results = {
+            kind: SingleFlight(maxsize=CACHE_SIZES.get(kind, maxsize))
+            for kind in ("export", "registry", "split", "statement", "html", "income", "1099")
+        }
+        self.snapshots = SnapshotStore(snapshots) if snapshots else None
+        self.history = HistoryStore(history) if history else None
+        self.edits = edits
+        self.edit_token = edit_token
+        self.lock = threading.Lock()
+        self._checked = 0.0
+
+    def close(self) -> None:
+        if self.edits is not None:
+            self.edits.close()
+        for store in (self.snapshots, self.history):
+            if store is not None:
+                store.close()
+
+    def data(self) -> dict:
+        """The data document, revalidated in the background every ``DATA_TTL``.
+
+        Edits not committed yet are applied on top; that document is the
+        queue's snapshot, shared by every request until the next edit or
+        flush, and must not be changed.
+        """
+        if self.edits is not None and self.edits.pending:
+            return self.edits.data
+        with self.lock:
+            stale = time.monotonic() - self._checked > DATA_TTL
+            if stale:
+                self._checked = time.monotonic()
+        if stale or self.source.data is None:
+            return self.source.load()
+        return self.source.data
+
+    def edit(self, ops: list[dict], message: str = "data") -> dict:
+        """Queue edits to the data document (see ``writequeue.apply_op``)."""
+        if self.edits is None:
+            raise RequestError(404, "edits are not enabled")
+        trial = deepcopy(self.edits.data)
+        for op in ops:
+            try:
+                apply_op(trial, op)
+            except (AttributeError, KeyError, TypeError, ValueError) as exc:
+                raise RequestError(400, f"bad edit {op!r}: {exc}") from None
+        for op in ops:
+            self.edits.submit(op, message)
+        return {"pending": len(self.edits.pending)}
+
+    def authorize(self, header: str | None, client: str) -> None:
+        """Check a ``POST /edit``: ``Authorization: token <edit token>``
+        when the service has one, otherwise only from this machine."""
+        if self.edit_token is None:
+            try:
+                local = ipaddress.ip_address(client).is_loopback
+            except ValueError:
+                local = False
+            if not local:
+                raise RequestError(403, "edits are only accepted from localhost")
+            return
+        scheme, _, token = (header or "").partition(" ")
+        if scheme.lower() != "token" or not hmac.compare_digest(
+            token.strip().encode("utf-8"), self.edit_token.encode("utf-8")
+        ):
+            raise RequestError(401, "a valid edit token is required")
+
+    def _committed(self, data: dict) -> None:
+        """``WriteQueue.on_commit``: read the new document before the edits stop counting."""
+        with self.lock:
+            self._checked = time.monotonic()
+        self.source.refresh()
+
+    def _export(self, name: str | None) -> Path:
+        path = self.exports / (name or "")
+        if not name or path.parent != self.exports or not path.is_file():
+            raise RequestError(404, f"no export {name!r}")
+        return path
+
+    def _config(self, data: dict, owner: str | None) -> dict:
+        if owner not in data["owners"]:
+            raise RequestError(404, f"no owner {owner!r}")
+        return data["owners"][owner]
+
+    def parsed(self, name: str):
+        """``(digest, frame, index)`` of an export, parsed once per content."""
+        path = self._export(name)
+        digest = self.cache.digest(path)
+        frame, index = self.results["export"].get(digest, lambda: self.cache.load_indexed(path))
+        return digest, frame, index
+
+    def registry(self, data: dict) -> OwnershipRegistry:
+        """Ownership registry, built once per version of the owners' listings."""
+        return self.results["registry"].get(
+            listings_key(data["owners"]),
+            lambda: OwnershipRegistry.from_owners(data["owners"]),
+        )
+
+    def owner_rows(self, digest: str, frame, data: dict) -> dict:
+        """Export rows per registered owner (see ``registry.owner_rows``).
+
+        Split once per export and registry.
+        """
+        registry = self.registry(data)
+        if not len(registry):
+            return {}
+        return self.results["split"].get(
+            (digest, listings_key(data["owners"])), lambda: owner_rows(frame, registry)
+        )
+
+    def statement(self, name: str, owner: str, year: int, month: int, overrides=()):
+        """``(statement, expenses, cache key)`` for one owner and period of an export.
+
+        ``overrides`` are ``(code, acc, clean)`` triples in dollars (``None``
+        keeps the exported figure), applied through a ``StatementModel`` on
+        top of the shared statement, so only the properties they touch are
+        re-totalled and re-rendered.
+        """
+        digest, frame, index = self.parsed(name)
+        data = self.data()
+        config = self._config(data, owner)
+        expenses = owner_expenses(data["expenses"], owner, year, month)
+        key = (
+            "statement", digest, owner, json.dumps(config, sort_keys=True), year, month,
+            json.dumps(expenses, sort_keys=True),
+        )
+
+        conflicts = self.registry(data).conflicts
+        if owner in conflicts:
+            raise RequestError(409, "overlapping ownership: " + "; ".join(conflicts[owner]))
+
+        def compute():
+            return owner_statement(
+                frame, owner, config, year, month, expenses,
+                self.owner_rows(digest, frame, data), index, self.layers.get(digest, frame, config),
+            )
+        statement = self.results["statement"].get(key, compute)
+        if not overrides:
+            return statement, expenses, key
+
+        def adjust():
+            model = StatementModel(statement, expenses)
+            for code, acc, clean in overrides:
+                try:
+                    model.set_override(model.property_of(code), code, acc, clean)
+                except KeyError:
+                    raise RequestError(404, f"no reservation {code!r}") from None
+            return model.statement
+        key += (tuple(sorted(overrides, key=repr)),)
+        return self.results["statement"].get(key, adjust), expenses, key
+
+    def statement_html(self, name: str, owner: str, year: int, month: int, overrides=()) -> str:
+        statement, expenses, key = self.statement(name, owner, year, month, overrides)
+        return self.results["html"].get(key[1:], lambda: render_statement(statement, expenses))
+
+    def summary(self, name: str, owner: str, year: int, month: int, overrides=()) -> dict:
+        statement, _, _ = self.statement(name, owner, year, month, overrides)
+        return {
+            "owner": owner,
+            "period": period_key(year, month),
+            "master": statement.master.as_dict(),
+            "properties": {p: t.as_dict() for p, t in statement.properties.items()},
+            "cards": render_summary_cards(statement),
+        }
+
+    def income(self, name: str, start: str, end: str, properties=None, by: str = "property",
+               detail: bool = False) -> list[dict]:
+        """Income over a check-in range, grouped by ``by`` or listed per reservation.
+
+        Each export's rows are loaded once into an in-memory ``IncomeCube``,
+        which answers every range from its monthly aggregates.
+        """
+        if by not in INCOME_GROUPS:
+            raise RequestError(400, f"cannot group by {by!r}")
+        digest, frame, _ = self.parsed(name)
+
+        def build():
+            cube = IncomeCube(":memory:")
+            cube.ingest(frame, self.layers.base(digest, frame))
+            return cube
+
+        cube = self.results["income"].get(digest, build)
+        try:
+            table = cube.report(start, end, properties, by, detail)
+        except (TypeError, ValueError) as exc:
+            raise RequestError(400, f"bad range: {exc}") from None
+        return json.loads(table.to_json(orient="records"))
+
+    def report_1099(self, year: int, owner: str | None, through: int) -> dict:
+        if self.snapshots is None:
+            raise RequestError(404, "no snapshot database")
+        # Writes land in the WAL first; either file changing means new months.
+        wal = self.snapshots.path.with_name(self.snapshots.path.name + "-wal")
+        files = [p for p in (self.snapshots.path, wal) if p.exists()]
+        if not files:
+            raise RequestError(404, f"no snapshot for {year}: {self.snapshots.path} is missing")
+        mtime = max(p.stat().st_mtime_ns for p in files)
+        return self.results["1099"].get(
+            (year, owner, through, mtime),
+            lambda: self.snapshots.report_1099(year, owner, through),
+        )
+
+    def statement_history(self, owner: str | None, period: str | None = None,
+                          record: int | None = None, diff: tuple[int, int] | None = None):
+        """Periods, versions, a stored output or a diff; ``(body, content type)``."""
+        if self.history is None:
+            raise RequestError(404, "no history database")
+        try:
+            if diff is not None:
+                return self.history.diff(*diff), None
+            if record is not None:
+                body, fmt = self.history.output(record)
+                return body, "application/pdf" if fmt == "pdf" else "text/html; charset=utf-8"
+        except KeyError as exc:
+            raise RequestError(404, f"no statement {exc}") from None
+        if not owner:
+            raise RequestError(400, "owner is required")
+        if period:
+            return self.history.versions(owner, *parse_period(period)), None
+        periods = self.history.periods(owner)
+        return [{"period": period_key(y, m), "versions": n} for y, m, n in periods], None
+
+    def stats(self) -> dict:
+        return {
+            "results": {kind: cache.stats() for kind, cache in self.results.items()},
+            "layers": self.layers.memory.stats(),
+        }
+
+
+def _handle(service: StatementService, path: str, query: dict):
+    """Response for one request: ``(body, content type or None for JSON)``."""
+    def one(name: str) -> str | None:
+        return (query.get(name) or [None])[0]
+
+    def number(name: str, default=None) -> int | None:
+        value = one(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise RequestError(400, f"{name} must be a number") from None
+
+    if path == "/exports":
+        return sorted(p.name for p in service.exports.glob("*.csv")), None
+    if path == "/stats":
+        return service.stats(), None
+    if path in ("/statement", "/summary"):
+        year, month = parse_period(one("period"))
+        overrides = tuple(parse_override(o) for o in query.get("override", []))
+        if path == "/summary":
+            return service.summary(one("export"), one("owner"), year, month, overrides), None
+        if one("format") == "json":
+            summary = service.summary(one("export"), one("owner"), year, month, overrides)
+            summary.pop("cards")
+            return summary, None
+        html = service.statement_html(one("export"), one("owner"), year, month, overrides)
+        return html, "text/html; charset=utf-8"
+    if path == "/income":
+        return service.income(
+            one("export"), one("from"), one("to"), query.get("property"),
+            one("by") or "property", one("detail") in ("1", "true"),
+        ), None
+    if path == "/1099":
+        year = number("year")
+        if year is None:
+            raise RequestError(400, "year is required")
+        return service.report_1099(year, one("owner"), number("through", 12)), None
+    if path == "/history":
+        diff = None
+        if one("diff"):
+            try:
+                old, new = (int(i) for i in one("diff").split(","))
+            except ValueError:
+                raise RequestError(400, "diff must be OLD,NEW record ids") from None
+            diff = (old, new)
+        return service.statement_history(one("owner"), one("period"), number("id"), diff)
+    raise RequestError(404, f"no endpoint {path}")
+
+
+def _submit(service: StatementService, path: str, body: bytes):
+    """Response for one POST: ``(body, None)``, always JSON."""
+    if path != "/edit":
+        raise RequestError(404, f"no endpoint {path}")
+    try:
+        edit = json.loads(body or b"null")
+    except ValueError:
+        raise RequestError(400, "body must be JSON") from None
+    if isinstance(edit, dict) and "ops" in edit:
+        ops, message = edit["ops"], edit.get("message") or "data"
+    else:
+        ops, message = [edit], "data"
+    if not isinstance(ops, list) or not all(isinstance(op, dict) for op in ops):
+        raise RequestError(400, "expected an operation or a list of operations")
+    return service.edit(ops, message), None
+
+
+class StatementServer:
+    """``StatementService`` over HTTP, one thread per request."""
+
+    def __init__(self, service: StatementService, host: str = "127.0.0.1", port: int = 8080):
+        self.service = service
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self)
+
+            def do_POST(self):
+                server._handle(self)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}"
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "StatementServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StatementServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        with trace.span("request", path=url.path):
+            try:
+                if handler.command == "POST":
+                    self.service.authorize(
+                        handler.headers.get("Authorization"), handler.client_address[0]
+                    )
+                    length = int(handler.headers.get("Content-Length") or 0)
+                    body, content_type = _submit(self.service, url.path, handler.rfile.read(length))
+                else:
+                    body, content_type = _handle(self.service, url.path, parse_qs(url.query))
+                status = 200
+            except RequestError as exc:
+                body, content_type, status = {"message": str(exc)}, None, exc.status
+            except Exception as exc:  # noqa: BLE001 - reported to the client
+                body, content_type, status = {"message": f"{type(exc).__name__}: {exc}"}, None, 500
+        if content_type is None:
+            data, content_type = json.dumps(body).encode("utf-8"), "application/json"
+        else:
+            data = body if isinstance(body, bytes) else body.encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve owner statements to the whole team")
+    parser.add_argument("--repo", required=True, help="local reports repository (data shards)")
+    parser.add_argument("--exports", required=True, help="directory of Guesty CSV exports")
+    parser.add_argument("--cache", default="cache", help="export cache directory")
+    parser.add_argument("--snapshots", help="snapshot database for /1099")
+    parser.add_argument("--history", help="statement history database for /history")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--edit-token",
+        default=os.environ.get("GITHUB_TOKEN"),
+        help="token POST /edit must present (default: $GITHUB_TOKEN); "
+             "without one, edits are accepted from localhost only",
+    )
+    args = parser.parse_args(argv)
+
+    cache = ExportCache(args.cache)
+    source = DataSource(
+        ShardedStore(LocalContents(args.repo)), Path(args.cache) / "data.json"
+    )
+    service = StatementService(
+        source, args.exports, cache, args.snapshots, args.history, edit_token=args.edit_token
+    )
+    # Its own store: the queue's shard state must not be reset by revalidation.
+    service.edits = WriteQueue(
+        ShardedStore(LocalContents(args.repo)), Path(args.cache) / "edits.jsonl",
+        on_commit=service._committed,
+    ).start()
+    server = StatementServer(service, args.host, args.port)
+    print(f"serving on {server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
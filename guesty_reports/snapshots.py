@@ -0,0 +1,161 @@
+"""Monthly statement snapshots and the year-to-date 1099 rollup.
+
+``show1099`` in the browser can only show the month currently on screen;
+a year's figures would mean processing twelve exports again. Every
+finished statement run instead records one row per (owner, property,
+month) with that month's totals, and a 1099 is a sum over the stored rows:
+
+    python -m guesty_reports.snapshots snapshots.db --year 2026 [--owner NAME]
+
+Re-running a month replaces its rows, so the snapshots always reflect the
+latest run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+from . import trace
+from .engine import Statement, Totals
+from .money import money
+
+FIELDS = [
+    "gross", "acc", "clean", "pmc", "website_fee", "vrbo_fee",
+    "expenses", "draft", "owner", "tax",
+]
+# ``owner`` is both a key and a Totals field; the net is stored as ``net``.
+COLUMNS = [f if f != "owner" else "net" for f in FIELDS]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS monthly (
+    year INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    property TEXT NOT NULL,
+    month INTEGER NOT NULL,
+    reservations INTEGER NOT NULL,
+    {", ".join(f"{c} INTEGER NOT NULL" for c in COLUMNS)},
+    PRIMARY KEY (year, owner, property, month)
+) WITHOUT ROWID;
+"""
+
+
+def snapshot_rows(statement: Statement) -> list[tuple]:
+    """One row per property of a finished statement."""
+    return [
+        (
+            statement.year, statement.owner, prop, statement.month,
+            len(statement.reservations.get(prop, ())),
+            *(getattr(t, f) for f in FIELDS),
+        )
+        for prop, t in statement.properties.items()
+    ]
+
+
+class SnapshotStore:
+    """sqlite file holding the monthly per-owner, per-property aggregates."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def record(self, owner: str, year: int, month: int, rows: list[tuple]) -> None:
+        """Replace one owner's snapshot for ``year``/``month`` with ``rows``."""
+        marks = ", ".join("?" * (5 + len(COLUMNS)))
+        with trace.span("persist", store="snapshots"), self.lock, self.db:
+            self.db.execute(
+                "DELETE FROM monthly WHERE year = ? AND owner = ? AND month = ?",
+                (year, owner, month),
+            )
+            self.db.executemany(f"INSERT INTO monthly VALUES ({marks})", rows)
+
+    def record_statement(self, statement: Statement) -> None:
+        self.record(statement.owner, statement.year, statement.month, snapshot_rows(statement))
+
+    def months(self, year: int, owner: str | None = None) -> list[int]:
+        """Months of ``year`` with at least one snapshot."""
+        sql = "SELECT DISTINCT month FROM monthly WHERE year = ?"
+        args: tuple = (year,)
+        if owner is not None:
+            sql += " AND owner = ?"
+            args += (owner,)
+        with self.lock:
+            return [m for (m,) in self.db.execute(sql + " ORDER BY month", args)]
+
+    def rollup(
+        self, year: int, owner: str | None = None, through_month: int = 12
+    ) -> dict[str, dict[str, Totals]]:
+        """Year-to-date totals as ``{owner: {property: Totals}}``.
+
+        Sums the stored months from January through ``through_month``.
+        """
+        sums = ", ".join(f"SUM({c})" for c in COLUMNS)
+        sql = (
+            f"SELECT owner, property, {sums} FROM monthly "
+            "WHERE year = ? AND month <= ?"
+        )
+        args: tuple = (year, through_month)
+        if owner is not None:
+            sql += " AND owner = ?"
+            args += (owner,)
+        sql += " GROUP BY owner, property ORDER BY owner, MIN(month), property"
+        out: dict[str, dict[str, Totals]] = {}
+        with self.lock:
+            for name, prop, *values in self.db.execute(sql, args):
+                out.setdefault(name, {})[prop] = Totals(**dict(zip(FIELDS, values)))
+        return out
+
+    def report_1099(
+        self, year: int, owner: str | None = None, through_month: int = 12
+    ) -> dict[str, dict]:
+        """Per-owner 1099 figures in cents, the year-long version of ``show1099``."""
+        report = {}
+        for name, props in self.rollup(year, owner, through_month).items():
+            master = Totals()
+            for t in props.values():
+                master.add(t)
+            report[name] = {
+                "accommodation": master.acc,
+                "pmc": master.pmc,
+                "expenses": master.expenses,
+                "net": master.owner,
+                "tax": master.tax,
+                "netReportable": master.owner - master.tax,
+                "properties": {p: t.as_dict() for p, t in props.items()},
+            }
+        return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Year-to-date 1099 rollup from snapshots")
+    parser.add_argument("db", help="snapshot database written by the batch run")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--owner", help="limit to this owner")
+    parser.add_argument("--through", type=int, default=12, help="last month to include")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.db)
+    report = store.report_1099(args.year, args.owner, args.through)
+    months = store.months(args.year, args.owner)
+    print(f"{args.year}: months {', '.join(map(str, months)) or 'none'}")
+    for name, r in report.items():
+        print(
+            f"{name}: accommodation {money(r['accommodation'])}  pmc {money(r['pmc'])}  "
+            f"expenses {money(r['expenses'])}  net {money(r['net'])}"
+        )
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""The owners/vendors/properties/expenses document and its sharded store.
+
+``data.json`` used to be rewritten in full for every edit. ``ShardedStore``
+splits the same document into small files in the reports repository:
+
+    data/manifest.json                      list of shard paths
+    data/settings.json                      vendors and property settings
+    data/owners/<owner>.json                one owner's configuration
+    data/expenses/<owner>/<YYYY-MM>.json    one owner's expenses for a period
+    data/expenses/<owner>/undated.json      entries written before periods
+
+A save compares each shard with the version last read or written and
+commits only the ones that differ, together, as a single commit; the
+manifest is rewritten only when shards are added or removed. Callers that
+know which shards an edit touched (``WriteQueue`` does) pass them as
+``dirty`` and only those are serialized and compared, so the cost of a
+save tracks the size of the edit rather than of the whole history.
+
+The browser still reads and writes the monolithic ``data.json``, so by
+default (``mirror_legacy=True``) a store also writes ``data.json`` in the
+same commit as the shards, and ``load`` prefers ``data.json`` when it no
+longer matches them, i.e. when the browser saved since. The mirror is a
+full-document write again; turn it off once app.py reads the shards.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from . import trace
+
+SECTIONS = ("owners", "vendors", "properties", "expenses")
+FETCH_WORKERS = 8
+
+
+def empty_data() -> dict:
+    return {"owners": {}, "vendors": [], "properties": {}, "expenses": []}
+
+
+def normalize(data: dict) -> dict:
+    """Fill missing sections the way ``loadData`` falls back to ``{}``/``[]``."""
+    out = empty_data()
+    for key in SECTIONS:
+        if data.get(key) is not None:
+            out[key] = data[key]
+    return out
+
+
+def load_data(path) -> dict:
+    """Load a local copy of data.json."""
+    with open(path, encoding="utf-8") as fh:
+        return normalize(json.load(fh))
+
+
+def dump_data(data: dict) -> bytes:
+    """Serialize like ``saveToGitHub``: pretty-printed with two-space indent."""
+    return json.dumps(normalize(data), indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def slugify(name: str) -> str:
+    """File-system safe name for an owner or property."""
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    return slug or "unnamed"
+
+
+def write_data(path, data: dict) -> None:
+    Path(path).write_bytes(dump_data(data))
+
+
+def owner_key(name: str) -> str:
+    """File name stem for an owner's shards and statements."""
+    # The slug alone is lossy ("Bob Smith" vs "bob-smith"), so add a short hash.
+    return f"{slugify(name)}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:6]}"
+
+
+def _encode(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def shard(data: dict, prefix: str = "data") -> dict[str, bytes]:
+    """Split a data document into ``{path: bytes}`` shards (manifest excluded)."""
+    data = normalize(data)
+    shards = {
+        settings_path(prefix): _encode(
+            {"vendors": data["vendors"], "properties": data["properties"]}
+        )
+    }
+    for name, config in data["owners"].items():
+        shards[owner_path(name, prefix)] = _encode({"name": name, "config": config})
+    groups: dict[str, list] = {}
+    for e in data["expenses"]:
+        groups.setdefault(expense_path(e, prefix), []).append(e)
+    for path, entries in groups.items():
+        shards[path] = _encode(entries)
+    return shards
+
+
+def shard_paths(data: dict, paths: Iterable[str], prefix: str = "data") -> dict[str, bytes]:
+    """The shards of ``data`` at ``paths`` only; paths with nothing in them are left out.
+
+    Equal to the matching part of ``shard(data)``, without serializing the rest.
+    """
+    data = normalize(data)
+    paths = set(paths)
+    out = {}
+    if settings_path(prefix) in paths:
+        out[settings_path(prefix)] = _encode(
+            {"vendors": data["vendors"], "properties": data["properties"]}
+        )
+    owner_dir = f"{prefix}/owners/"
+    if any(p.startswith(owner_dir) for p in paths):
+        for name, config in data["owners"].items():
+            path = owner_path(name, prefix)
+            if path in paths:
+                out[path] = _encode({"name": name, "config": config})
+    expense_dir = f"{prefix}/expenses/"
+    periods = {p.rsplit("/", 1)[1][:-len(".json")] for p in paths if p.startswith(expense_dir)}
+    if periods:
+        groups: dict[str, list] = {}
+        for e in data["expenses"]:
+            if (e.get("period") or "undated") in periods:
+                path = expense_path(e, prefix)
+                if path in paths:
+                    groups.setdefault(path, []).append(e)
+        out.update((path, _encode(entries)) for path, entries in groups.items())
+    return out
+
+
+def settings_path(prefix: str = "data") -> str:
+    return f"{prefix}/settings.json"
+
+
+def owner_path(name: str, prefix: str = "data") -> str:
+    return f"{prefix}/owners/{owner_key(name)}.json"
+
+
+def expense_path(expense: dict, prefix: str = "data") -> str:
+    """Shard holding ``expense``: its owner's file for its period."""
+    period = expense.get("period") or "undated"
+    return f"{prefix}/expenses/{owner_key(str(expense.get('owner', '')))}/{period}.json"
+
+
+def unshard(shards: dict[str, bytes], prefix: str = "data") -> dict:
+    """Rebuild a data document from its shards."""
+    data = empty_data()
+    for path in sorted(shards):
+        obj = json.loads(shards[path])
+        rel = path[len(prefix) + 1:]
+        if rel == "settings.json":
+            data["vendors"] = obj.get("vendors") or []
+            data["properties"] = obj.get("properties") or {}
+        elif rel.startswith("owners/"):
+            data["owners"][obj["name"]] = obj["config"]
+        elif rel.startswith("expenses/"):
+            data["expenses"].extend(obj)
+    return data
+
+
+class ShardedStore:
+    """Reads and writes a data document as shards through a contents backend.
+
+    ``backend`` is a ``GitHubContents`` or a ``LocalContents`` stand-in.
+    With ``mirror_legacy`` (the default while the browser reads only
+    ``data.json``) the whole document is also kept in ``legacy_path``.
+    Every writer of a repository has to agree on it: a mirrored store
+    takes a ``data.json`` left behind by an unmirrored save for a browser
+    edit.
+    """
+
+    def __init__(
+        self,
+        backend,
+        prefix: str = "data",
+        legacy_path: str = "data.json",
+        mirror_legacy: bool = True,
+    ):
+        self.backend = backend
+        self.prefix = prefix
+        self.legacy_path = legacy_path
+        self.mirror_legacy = mirror_legacy
+        self.legacy_sha: str | None = None
+        # Set when the shards were not read or are behind data.json; the
+        # next save then compares every shard.
+        self.stale = True
+        self.manifest_path = f"{prefix}/manifest.json"
+        # path -> (sha256 of content, remote blob sha) as last read or written
+        self.known: dict[str, tuple[str, str]] = {}
+        self.manifest_sha: str | None = None
+        self.manifest_paths: set[str] = set()
+
+    def _fetch(self, path: str) -> bytes | None:
+        got = self.backend.get(path)
+        if got is None:
+            return None
+        content, sha = got
+        self.known[path] = (hashlib.sha256(content).hexdigest(), sha)
+        return content
+
+    def load(self) -> dict:
+        """Read every shard listed in the manifest.
+
+        A repository that only has the legacy ``data.json`` is read from it,
+        as is one whose ``data.json`` was changed by the browser after the
+        shards were last written; the next ``save`` brings the shards up to
+        date.
+        """
+        with trace.span("persist", op="load"):
+            return self._load()
+
+    def _load(self) -> dict:
+        self.known.clear()
+        self.manifest_paths = set()
+        self.stale = True
+        got = self.backend.get(self.manifest_path)
+        legacy = None
+        if got is None or self.mirror_legacy:
+            legacy = self.backend.get(self.legacy_path)
+        self.legacy_sha = legacy[1] if legacy else None
+        legacy_data = normalize(json.loads(legacy[0])) if legacy else None
+        if got is None:
+            self.manifest_sha = None
+            return legacy_data or empty_data()
+        content, self.manifest_sha = got
+        self.manifest_paths = set(json.loads(content)["shards"])
+        paths = sorted(self.manifest_paths)
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            bodies = list(pool.map(self._fetch, paths))
+        shards = {p: b for p, b in zip(paths, bodies) if b is not None}
+        # Compared as shards: unsharding regroups the expense list.
+        if self.mirror_legacy and legacy_data is not None and shard(legacy_data, self.prefix) != shards:
+            return legacy_data
+        self.stale = False
+        return unshard(shards, self.prefix)
+
+    def save(self, data: dict, message: str = "Update data", dirty: Iterable[str] | None = None) -> list[str]:
+        """Commit the shards that changed since the last load/save.
+
+        ``dirty`` lists the shard paths the edit may have changed (see
+        ``owner_path``, ``expense_path``, ``settings_path``); only those are
+        serialized and compared. Without it, or when the shards are stale,
+        every shard is. All changed shards (the manifest, when the shard set
+        changed, and the ``data.json`` mirror) go out as one commit. Returns
+        the paths written or deleted; the backend raises ``github.Conflict``
+        when any of them changed remotely in the meantime, in which case
+        nothing is written.
+        """
+        with trace.span("persist", op="save"):
+            return self._save(data, message, None if self.stale else dirty)
+
+    def _save(self, data: dict, message: str, dirty: Iterable[str] | None) -> list[str]:
+        if dirty is None:
+            shards = shard(data, self.prefix)
+            candidates = set(shards) | set(self.known)
+            paths = set(shards)
+        else:
+            candidates = set(dirty)
+            shards = shard_paths(data, candidates, self.prefix)
+            paths = (self.manifest_paths - candidates) | set(shards)
+        changes: dict[str, bytes | None] = {}
+        expected: dict[str, str | None] = {}
+        for path in candidates:
+            known = self.known.get(path)
+            content = shards.get(path)
+            if content is None:
+                if known:
+                    changes[path] = None
+                    expected[path] = known[1]
+                continue
+            if known and known[0] == hashlib.sha256(content).hexdigest():
+                continue
+            changes[path] = content
+            expected[path] = known[1] if known else None
+        if self.manifest_sha is None or paths != self.manifest_paths:
+            changes[self.manifest_path] = _encode({"version": 1, "shards": sorted(paths)})
+            expected[self.manifest_path] = self.manifest_sha
+        if not changes:
+            return []
+        if self.mirror_legacy:
+            changes[self.legacy_path] = dump_data(data)
+            expected[self.legacy_path] = self.legacy_sha
+
+        shas = self.backend.commit(changes, message, expected)
+        for path, content in changes.items():
+            if path == self.manifest_path:
+                self.manifest_sha = shas[path]
+                self.manifest_paths = paths
+            elif path == self.legacy_path:
+                self.legacy_sha = shas[path]
+            elif content is None:
+                self.known.pop(path, None)
+            else:
+                self.known[path] = (hashlib.sha256(content).hexdigest(), shas[path])
+        self.stale = False
+        return list(changes)
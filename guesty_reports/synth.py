@@ -0,0 +1,234 @@
+"""Synthetic Guesty exports for benchmarks and load tests.
+
+    python -m guesty_reports.synth export.csv --rows 1000000 --owners 60 \\
+        --listings 5 [--months 12] [--data data.json]
+
+Rows look like a real reservations export: the columns the statement
+reads plus a few it ignores, ``$1,234.56``-style money text, negative
+stay discounts, ``HM``/``HA-`` confirmation codes by platform, a share
+of cancellations, and city/state/county/occupancy taxes. Files are
+written in chunks, so millions of rows take bounded memory. ``--data``
+writes a matching data.json (owners with their listings, property tax
+flags and some expenses).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .engine import CHECK_IN, CHECK_OUT, CODE, LISTING, PLATFORM, STATUS
+from .ledger import period_key
+from .store import empty_data, write_data
+from .tax import MUNICIPALITIES
+
+PLATFORMS = ["airbnb", "homeaway", "vrbo", "website", "manual"]
+PLATFORM_WEIGHTS = [0.45, 0.2, 0.1, 0.15, 0.1]
+STREETS = ["Ocean", "Dunes", "Palmetto", "Seabreeze", "Harbor", "Marsh", "Pier", "Kings"]
+GUESTS = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis"]
+VENDORS = [
+    ("Coastal Cleaning", "Cleaning"), ("Grand Strand HVAC", "Repair"),
+    ("Palmetto Pools", "Maintenance"), ("Beach Linen Co", "Supplies"),
+]
+CHUNK_ROWS = 200_000
+
+
+def owner_names(n: int) -> list[str]:
+    return [f"{GUESTS[i % len(GUESTS)]} Holdings {i + 1}" for i in range(n)]
+
+
+def listing_map(owners: list[str], per_owner: int, seed: int = 0) -> dict[str, list[str]]:
+    """``{owner: [listing nickname, ...]}`` with unique nicknames."""
+    rng = np.random.default_rng(seed)
+    out, n = {}, 0
+    for owner in owners:
+        count = max(1, int(rng.integers(1, 2 * per_owner)))
+        names = []
+        for _ in range(count):
+            n += 1
+            names.append(f"{n} {STREETS[n % len(STREETS)]} {'Unit' if n % 3 else 'House'}")
+        out[owner] = names
+    return out
+
+
+# Lookup tables for money text; amounts stay below $1,000,000.
+_DIGITS = np.array([str(i) for i in range(1000)], dtype=object)
+_PADDED = np.array([f",{i:03d}" for i in range(1000)], dtype=object)
+_CENTS = np.array([f".{i:02d}" for i in range(100)], dtype=object)
+
+
+def _money_text(values: np.ndarray) -> np.ndarray:
+    """Dollar amounts as export text: ``$1,234.56``, ``-$20.00``."""
+    cents = np.rint(np.abs(values) * 100).astype("int64")
+    whole = cents // 100
+    thousands = whole // 1000
+    head = np.where(
+        thousands > 0, _DIGITS[thousands] + _PADDED[whole % 1000], _DIGITS[whole % 1000]
+    )
+    sign = np.where(values < 0, "-$", "$").astype(object)
+    return sign + head + _CENTS[cents % 100]
+
+
+def generate_chunk(
+    rng: np.random.Generator,
+    n: int,
+    listings: list[str],
+    start: date,
+    months: int,
+    offset: int = 0,
+    cancel_rate: float = 0.08,
+) -> pd.DataFrame:
+    """``n`` export rows as text, checking in over ``months`` from ``start``."""
+    first = np.datetime64(start, "D")
+    last = np.datetime64(pd.Timestamp(start) + pd.DateOffset(months=months), "D")
+    check_in = first + rng.integers(0, int((last - first).astype(int)), n)
+    nights = rng.integers(2, 15, n)
+    platform = np.array(PLATFORMS)[rng.choice(len(PLATFORMS), n, p=PLATFORM_WEIGHTS)]
+    cancelled = rng.random(n) < cancel_rate
+
+    nightly = rng.uniform(90, 650, n)
+    fare = np.round(nightly * nights, 2)
+    markup = np.where(rng.random(n) < 0.1, np.round(fare * 0.05, 2), 0.0)
+    discount = np.where(nights >= 7, -np.round(fare * 0.1, 2), 0.0)
+    community = np.where(rng.random(n) < 0.3, rng.choice([25.0, 50.0, 75.0], n), 0.0)
+    cleaning = rng.choice([95.0, 125.0, 175.0, 250.0], n)
+    taxable = fare - markup + discount + cleaning
+    taxes = {
+        "CITY TAX": np.round(taxable * 0.01, 2),
+        "STATE TAX": np.round(taxable * 0.07, 2),
+        "COUNTY TAX": np.round(taxable * 0.015, 2),
+        "OCCUPANCY TAX": np.where(rng.random(n) < 0.7, np.round(taxable * 0.02, 2), 0.0),
+    }
+    payout = taxable + community + sum(taxes.values())
+
+    ids = np.arange(offset, offset + n)
+    code = np.where(
+        platform == "airbnb", np.char.add("HM", np.char.zfill(ids.astype(str), 8)),
+        np.where(
+            np.isin(platform, ["homeaway", "vrbo"]),
+            np.char.add("HA-", np.char.zfill(ids.astype(str), 7)),
+            np.char.add("GY", np.char.zfill(ids.astype(str), 8)),
+        ),
+    )
+    frame = {
+        CODE: code,
+        LISTING: np.array(listings, dtype=object)[rng.integers(0, len(listings), n)],
+        CHECK_IN: check_in.astype(str),
+        CHECK_OUT: (check_in + nights).astype(str),
+        PLATFORM: platform,
+        STATUS: np.where(cancelled, "cancelled", "confirmed"),
+        "TOTAL PAYOUT": _money_text(payout),
+        "ACCOMMODATION FARE": _money_text(fare),
+        "MARKUP": _money_text(markup),
+        "LENGTH OF STAY DISCOUNT": _money_text(discount),
+        "COMMUNITY FEE": _money_text(community),
+        "CLEANING FARE": _money_text(cleaning),
+        **{k: _money_text(v) for k, v in taxes.items()},
+        # Ignored by the statement; present so parsing pays for a realistic width.
+        "GUEST'S NAME": np.array(GUESTS)[rng.integers(0, len(GUESTS), n)],
+        "NUMBER OF NIGHTS": nights,
+        "NUMBER OF GUESTS": rng.integers(1, 11, n),
+        "CURRENCY": "USD",
+        "SOURCE": platform,
+    }
+    return pd.DataFrame(frame)
+
+
+def write_export(
+    path,
+    rows: int,
+    listings: list[str],
+    seed: int = 0,
+    start: date = date(2026, 1, 1),
+    months: int = 12,
+    chunk_rows: int = CHUNK_ROWS,
+    cancel_rate: float = 0.08,
+) -> Path:
+    """Write a ``rows``-row export to ``path`` a chunk at a time."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        for offset in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - offset)
+            chunk = generate_chunk(rng, n, listings, start, months, offset, cancel_rate)
+            chunk.to_csv(fh, index=False, header=offset == 0)
+    return path
+
+
+def make_data(
+    owners: dict[str, list[str]],
+    seed: int = 0,
+    start: date = date(2026, 1, 1),
+    months: int = 12,
+    expenses_per_owner: int = 6,
+) -> dict:
+    """A data document for ``owners``: configurations, tax flags, expenses."""
+    rng = np.random.default_rng(seed + 1)
+    data = empty_data()
+    data["vendors"] = [
+        {"id": i + 1, "name": name, "phone": ""} for i, (name, _) in enumerate(VENDORS)
+    ]
+    n = 0
+    for owner, listings in owners.items():
+        data["owners"][owner] = {
+            "email": f"{owner.lower().replace(' ', '.')}@example.com",
+            "percent": float(rng.choice([0.15, 0.18, 0.2, 0.25])),
+            "salesFeePercent": 0,
+            "type": str(rng.choice(["draft", "payout"])),
+            "guestyReportUrl": "",
+            "listings": [{"listing": listing} for listing in listings],
+        }
+        for listing in listings:
+            flags = rng.random(len(MUNICIPALITIES)) < 0.3
+            data["properties"][listing] = {
+                m: True for m, flag in zip(MUNICIPALITIES, flags) if flag
+            }
+        for _ in range(expenses_per_owner):
+            n += 1
+            vendor, kind = VENDORS[int(rng.integers(0, len(VENDORS)))]
+            y, m = divmod(start.year * 12 + start.month - 1 + int(rng.integers(0, months)), 12)
+            data["expenses"].append({
+                "id": n,
+                "owner": owner,
+                "property": listings[int(rng.integers(0, len(listings)))],
+                "vendor": vendor,
+                "type": kind,
+                "amount": round(float(rng.uniform(40, 900)), 2),
+                "period": period_key(y, m + 1),
+            })
+    return data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic Guesty export")
+    parser.add_argument("out", help="CSV to write")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--owners", type=int, default=40)
+    parser.add_argument("--listings", type=int, default=4, help="average listings per owner")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--start", default="2026-01", help="first check-in month, YYYY-MM")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cancel-rate", type=float, default=0.08)
+    parser.add_argument("--data", help="also write a matching data.json here")
+    args = parser.parse_args(argv)
+
+    y, m = map(int, args.start.split("-"))
+    start = date(y, m, 1)
+    owners = listing_map(owner_names(args.owners), args.listings, args.seed)
+    listings = [name for names in owners.values() for name in names]
+    write_export(args.out, args.rows, listings, args.seed, start, args.months,
+                 cancel_rate=args.cancel_rate)
+    if args.data:
+        write_data(args.data, make_data(owners, args.seed, start, args.months))
+    print(f"{args.rows} rows, {len(owners)} owners, {len(listings)} listings -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
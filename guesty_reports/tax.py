@@ -0,0 +1,194 @@
+"""Municipality tax remittance for the whole portfolio.
+
+``openTax`` in the browser records, per property, which municipalities it
+files with (``SC``, ``MB``, ``NMB``, ``SSB``, ``HC``) in the ``properties``
+section of data.json, but nothing reads the flags, and ``taxByProperty``
+only keeps the first taxed reservation of payout owners. Monthly filing
+meant running every owner's statement to collect tax figures.
+
+``remittance`` sums city, state, county and occupancy tax by property and
+check-in month in one grouped pass over an export (or the synced
+reservation store), for every owner at once, and hands each tax to the
+jurisdiction that collects it: state tax to ``SC``, county tax to ``HC``,
+city and occupancy tax to the property's city (``MB``, ``NMB`` or
+``SSB``). A tax whose jurisdiction the property is not flagged for, or
+city tax of a property flagged for no city or several, is listed under
+``UNFLAGGED``. Every cent collected appears exactly once, so the
+municipality rows add up to the tax in the export.
+
+    python -m guesty_reports.tax export.csv --data data.json --from 2026-07 --to 2026-09 \\
+        [--municipality MB ...] [--detail] [--csv remittance.csv]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from . import trace
+from .engine import CHECK_IN, LISTING, TAX_COLUMNS
+from .money import format_cents
+from .store import load_data
+
+# The ``municipalities`` list of app.py; change both together.
+MUNICIPALITIES = ["SC", "MB", "NMB", "SSB", "HC"]
+STATE = "SC"
+COUNTY = "HC"
+CITIES = ("MB", "NMB", "SSB")
+UNFLAGGED = "none"
+TAXES = {
+    "CITY TAX": "city",
+    "STATE TAX": "state",
+    "COUNTY TAX": "county",
+    "OCCUPANCY TAX": "occupancy",
+}
+MEASURES = ["reservations", *TAXES.values(), "total"]
+# Taxes each level of government collects.
+LEVELS = {"state": ["state"], "county": ["county"], "city": ["city", "occupancy"]}
+
+
+def municipality_table(properties: dict) -> pd.DataFrame:
+    """Jurisdiction per property and level (``state``, ``county``, ``city``).
+
+    From the data.json property flags; ``UNFLAGGED`` where the property is
+    not flagged for that level's municipality, or for more than one city.
+    """
+    rows = []
+    for prop, flags in (properties or {}).items():
+        flags = flags or {}
+        cities = [c for c in CITIES if flags.get(c)]
+        rows.append((
+            prop,
+            STATE if flags.get(STATE) else UNFLAGGED,
+            COUNTY if flags.get(COUNTY) else UNFLAGGED,
+            cities[0] if len(cities) == 1 else UNFLAGGED,
+        ))
+    return pd.DataFrame(rows, columns=["property", *LEVELS])
+
+
+def property_taxes(
+    frame: pd.DataFrame,
+    periods: Iterable[tuple[int, int]] | None = None,
+) -> pd.DataFrame:
+    """Tax sums (cents) per property and check-in month of a prepared frame.
+
+    Only reservations carrying tax are counted in ``reservations``; in
+    ``remittance`` it is the property's count, whichever taxes apply.
+    """
+    keep = (frame[CHECK_IN] != "").to_numpy() & (frame["year"].to_numpy() > 0)
+    period = frame["year"].to_numpy().astype("int64") * 100 + frame["month"].to_numpy()
+    if periods is not None:
+        keep &= np.isin(period, [y * 100 + m for y, m in periods])
+    amounts = frame[TAX_COLUMNS].to_numpy()[keep]
+    total = amounts.sum(axis=1)
+    rows = pd.DataFrame({
+        "property": frame[LISTING].to_numpy()[keep],
+        "period": period[keep],
+        **{name: amounts[:, i] for i, name in enumerate(TAXES[c] for c in TAX_COLUMNS)},
+        "total": total,
+        "reservations": (total != 0).astype("int64"),
+    })
+    rows["property"] = rows["property"].replace("", "Unknown")
+    sums = rows.groupby(["property", "period"], sort=True)[MEASURES].sum().reset_index()
+    sums = sums[sums["reservations"] > 0]
+    sums.insert(1, "month", [f"{p // 100:04d}-{p % 100:02d}" for p in sums.pop("period")])
+    return sums
+
+
+def remittance(
+    frame: pd.DataFrame,
+    properties: dict,
+    periods: Iterable[tuple[int, int]] | None = None,
+    municipalities: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """Tax to remit per municipality, property and month, in cents.
+
+    ``properties`` is the data.json ``properties`` section; ``periods``
+    limits the report to those ``(year, month)`` check-in months and
+    ``municipalities`` to those codes.
+    """
+    with trace.span("aggregate", report="tax", rows=len(frame)):
+        sums = property_taxes(frame, periods)
+        table = sums[["property"]].merge(municipality_table(properties), on="property", how="left")
+        parts = []
+        for level, taxes in LEVELS.items():
+            part = sums.copy()
+            part["municipality"] = table[level].fillna(UNFLAGGED).to_numpy()
+            for tax in TAXES.values():
+                if tax not in taxes:
+                    part[tax] = 0
+            part["total"] = part[taxes].sum(axis=1)
+            parts.append(part[part["total"] != 0])
+        out = pd.concat(parts, ignore_index=True)
+        # A property unflagged at several levels gets one ``UNFLAGGED`` row.
+        out = out.groupby(["municipality", "month", "property"], sort=False).agg(
+            reservations=("reservations", "first"),
+            **{m: (m, "sum") for m in MEASURES[1:]},
+        ).reset_index()
+        if municipalities is not None:
+            out = out[out["municipality"].isin(list(municipalities))]
+        order = {m: i for i, m in enumerate(MUNICIPALITIES + [UNFLAGGED])}
+        out = out.sort_values(
+            ["municipality", "month", "property"],
+            key=lambda col: col.map(order) if col.name == "municipality" else col,
+        )
+        return out[["municipality", "month", "property", *MEASURES]].reset_index(drop=True)
+
+
+def summarize(report: pd.DataFrame) -> pd.DataFrame:
+    """``remittance`` rolled up to one row per municipality and month."""
+    groups = report.groupby(["municipality", "month"], sort=False)
+    out = groups[MEASURES].sum().reset_index()
+    out.insert(2, "properties", groups.size().to_numpy())
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Municipality tax remittance report")
+    parser.add_argument("export", help="Guesty CSV export, or a synced reservations .db")
+    parser.add_argument("--data", required=True, help="local copy of data.json")
+    parser.add_argument("--from", dest="start", help="first check-in month, YYYY-MM")
+    parser.add_argument("--to", dest="end", help="last check-in month, YYYY-MM")
+    parser.add_argument("--municipality", action="append", choices=MUNICIPALITIES + [UNFLAGGED])
+    parser.add_argument("--detail", action="store_true", help="one line per property")
+    parser.add_argument("--csv", help="write the per-property report (cents) to this file")
+    args = parser.parse_args(argv)
+    if not Path(args.export).is_file():
+        parser.error(f"no such export: {args.export}")
+
+    periods = None
+    if args.start or args.end:
+        from .income import DateRange
+
+        periods = DateRange.parse(args.start or args.end, args.end or args.start).months()
+    if str(args.export).endswith(".db"):
+        from .sync import ReservationStore
+
+        store = ReservationStore(args.export, readonly=True)
+        frame = store.frame(periods)
+        store.close()
+    else:
+        from .ingest import read_export
+
+        frame = read_export(args.export, periods)
+
+    report = remittance(frame, load_data(args.data)["properties"], periods, args.municipality)
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+    if not len(report):
+        print("no taxed reservations")
+        return 0
+    shown = (report if args.detail else summarize(report)).copy()
+    for col in [*TAXES.values(), "total"]:
+        shown[col] = format_cents(shown[col])
+    print(shown.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
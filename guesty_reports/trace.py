@@ -0,0 +1,224 @@
+"""Spans and counters for the statement pipeline, exported as Chrome traces.
+
+Stages are wrapped in spans and notable quantities are counted:
+
+    with trace.span("parse", path=str(path)):
+        ...
+        trace.count("rows_read", len(chunk))
+
+Nothing is recorded unless tracing is on. ``span`` then returns a shared
+no-op object and ``count`` returns at once, so instrumented code costs a
+global lookup per call. Turn it on around a run and write the result:
+
+    with trace.tracing("trace.json") as tracer:
+        run_batch(...)
+    print(tracer.summary())
+
+The file is Chrome trace-event JSON, readable by ``chrome://tracing`` and
+https://ui.perfetto.dev. Spans are complete (``X``) events on the thread
+that ran them; counters are ``C`` events carrying the running total.
+Worker processes record into their own tracer and hand ``drain()`` back
+to the parent, which ``merge``s it; timestamps are wall-clock based so
+processes line up.
+
+Span names used: ``parse``, ``filter``, ``aggregate``, ``render``,
+``persist`` (local stores and the data document), ``publish``
+(requests to GitHub or Guesty) and ``request`` (served by ``service``).
+Counters: ``rows_read``, ``rows_skipped``, ``expenses_scanned``,
+``bytes_sent`` and ``bytes_received``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+_tracer: "Tracer | None" = None
+
+
+class Tracer:
+    def __init__(self, name: str = "guesty_reports"):
+        self.name = name
+        self.pid = os.getpid()
+        self.events: list[dict] = []
+        self.counters: dict[str, int] = {}
+        # Counter totals already handed out by ``drain``.
+        self.drained: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self._perf0 = time.perf_counter_ns()
+        self._epoch0 = time.time_ns()
+        # Other processes merged into this trace: pid -> name.
+        self.processes: dict[int, str] = {self.pid: name}
+
+    def now(self) -> float:
+        """Microseconds since the epoch, on the monotonic clock."""
+        return (self._epoch0 + time.perf_counter_ns() - self._perf0) / 1000
+
+    def add_span(self, name: str, start: float, end: float, args: dict) -> None:
+        event = {
+            "name": name, "ph": "X", "ts": start, "dur": end - start,
+            "pid": self.pid, "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.events.append(event)
+
+    def count(self, name: str, n: int = 1) -> None:
+        ts = self.now()
+        with self.lock:
+            value = self.counters[name] = self.counters.get(name, 0) + n
+            self.events.append(
+                {"name": name, "ph": "C", "ts": ts, "pid": self.pid, "args": {name: value}}
+            )
+
+    def export(self) -> dict:
+        """Picklable snapshot for ``merge`` in another process."""
+        with self.lock:
+            return {
+                "name": self.name, "pid": self.pid,
+                "events": list(self.events), "counters": dict(self.counters),
+            }
+
+    def drain(self) -> dict:
+        """Hand over the events and counter increments since the last drain.
+
+        Counters keep running, so later ``C`` events continue the total.
+        """
+        with self.lock:
+            data = {
+                "name": self.name, "pid": self.pid, "events": self.events,
+                "counters": {
+                    name: n - self.drained.get(name, 0)
+                    for name, n in self.counters.items()
+                    if n != self.drained.get(name, 0)
+                },
+            }
+            self.events, self.drained = [], dict(self.counters)
+        return data
+
+    def merge(self, data: dict) -> None:
+        with self.lock:
+            self.events.extend(data["events"])
+            for name, n in data["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            self.processes.setdefault(data["pid"], data["name"])
+
+    def summary(self) -> dict:
+        """``{"spans": {name: {"count", "seconds"}}, "counters": {...}}``."""
+        spans: dict[str, dict] = {}
+        with self.lock:
+            for e in self.events:
+                if e["ph"] == "X":
+                    s = spans.setdefault(e["name"], {"count": 0, "seconds": 0.0})
+                    s["count"] += 1
+                    s["seconds"] += e["dur"] / 1e6
+            return {"spans": spans, "counters": dict(self.counters)}
+
+    def to_json(self) -> dict:
+        meta = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+            for pid, name in self.processes.items()
+        ]
+        with self.lock:
+            events = meta + sorted(self.events, key=lambda e: e["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path) -> None:
+        Path(path).write_text(json.dumps(self.to_json()))
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start", "kept")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.kept = True
+
+    def set(self, **args) -> None:
+        self.args.update(args)
+
+    def discard(self) -> None:
+        """Record nothing for this span, e.g. a read that hit end of input."""
+        self.kept = False
+
+    def __enter__(self) -> "Span":
+        self.start = self.tracer.now()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.kept:
+            self.tracer.add_span(self.name, self.start, self.tracer.now(), self.args)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **args) -> None:
+        pass
+
+    def discard(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL = _NullSpan()
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def current() -> Tracer | None:
+    return _tracer
+
+
+def enable(tracer: Tracer | None = None) -> Tracer:
+    global _tracer
+    _tracer = tracer or Tracer()
+    return _tracer
+
+
+def disable() -> Tracer | None:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def span(name: str, **args):
+    """Context manager timing one stage; a no-op while tracing is off."""
+    if _tracer is None:
+        return _NULL
+    return Span(_tracer, name, args)
+
+
+def count(name: str, n: int = 1) -> None:
+    if _tracer is not None and n:
+        _tracer.count(name, int(n))
+
+
+@contextmanager
+def tracing(path=None, name: str = "guesty_reports"):
+    """Trace the block; write the trace to ``path`` (if given) at the end."""
+    previous = _tracer
+    tracer = enable(Tracer(name))
+    try:
+        yield tracer
+    finally:
+        if previous is not None:
+            enable(previous)
+        else:
+            disable()
+        if path is not None:
+            tracer.write(path)
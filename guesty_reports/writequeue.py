@@ -0,0 +1,247 @@
+"""Write-behind queue that batches data edits into commits.
+
+Edits are recorded as small operations (add an expense, change an owner,
+...) and appended to a local journal before anything touches the network,
+so a crash or a failed request never loses them. A background thread
+waits until edits stop arriving for ``window`` seconds (or ``max_delay``
+has passed since the oldest one) and commits everything pending as one
+save. Failed saves are retried with exponential backoff and full jitter;
+on a conflict the remote state is reloaded and the pending operations are
+replayed on top of it instead of overwriting the other writer's change.
+
+The statement service takes edits through one (``POST /edit``); app.py's
+``saveToGitHub`` queues the same operations in the browser.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from copy import deepcopy
+from pathlib import Path
+
+from .github import Conflict
+from .store import expense_path, normalize, owner_path, settings_path
+
+# Most recent failures kept in ``WriteQueue.errors``.
+ERRORS_KEPT = 50
+
+
+def apply_op(data: dict, op: dict) -> None:
+    """Apply one edit to a data document in place."""
+    kind = op["op"]
+    if kind == "set_owner":
+        data["owners"][op["name"]] = op["config"]
+    elif kind == "delete_owner":
+        data["owners"].pop(op["name"], None)
+    elif kind == "set_property":
+        data["properties"][op["name"]] = op["settings"]
+    elif kind == "add_vendor":
+        data["vendors"] = [v for v in data["vendors"] if v.get("id") != op["vendor"].get("id")]
+        data["vendors"].append(op["vendor"])
+    elif kind == "delete_vendor":
+        data["vendors"] = [v for v in data["vendors"] if v.get("id") != op["id"]]
+    elif kind == "add_expense":
+        data["expenses"] = [e for e in data["expenses"] if e.get("id") != op["expense"].get("id")]
+        data["expenses"].append(op["expense"])
+    elif kind == "delete_expense":
+        data["expenses"] = [e for e in data["expenses"] if e.get("id") != op["id"]]
+    else:
+        raise ValueError(f"unknown operation {kind!r}")
+
+
+def touched_paths(data: dict, op: dict, prefix: str = "data") -> set[str]:
+    """Shards of ``data`` that applying ``op`` to it can change."""
+    kind = op["op"]
+    if kind in ("set_owner", "delete_owner"):
+        return {owner_path(op["name"], prefix)}
+    if kind in ("set_property", "add_vendor", "delete_vendor"):
+        return {settings_path(prefix)}
+    if kind in ("add_expense", "delete_expense"):
+        target = op["expense"].get("id") if kind == "add_expense" else op["id"]
+        paths = {expense_path(e, prefix) for e in data["expenses"] if e.get("id") == target}
+        if kind == "add_expense":
+            paths.add(expense_path(op["expense"], prefix))
+        return paths
+    raise ValueError(f"unknown operation {kind!r}")
+
+
+def backoff_delays(attempts: int, base: float = 0.5, cap: float = 30.0):
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**n))."""
+    for n in range(attempts):
+        yield random.uniform(0, min(cap, base * 2 ** n))
+
+
+class WriteQueue:
+    """Journaled, coalescing writer in front of a ``ShardedStore``.
+
+    ``on_commit(data)`` is called with the saved document after each
+    successful flush, while its edits still count as pending. Failures of
+    saves, reloads and callbacks are kept in ``errors`` (the last
+    ``ERRORS_KEPT``); the writer thread survives them and retries after
+    another window.
+    """
+
+    def __init__(
+        self,
+        store,
+        journal,
+        window: float = 2.0,
+        max_delay: float = 10.0,
+        attempts: int = 6,
+        sleep=time.sleep,
+        on_commit=None,
+    ):
+        self.store = store
+        self.journal = Path(journal)
+        self.window = window
+        self.max_delay = max_delay
+        self.attempts = attempts
+        self.sleep = sleep
+        self.on_commit = on_commit
+        self.lock = threading.RLock()
+        self.wake = threading.Condition(self.lock)
+        self.flushing = threading.Lock()
+        self.pending: list[dict] = []
+        self.first_at: float | None = None
+        self.last_at: float | None = None
+        self.errors: deque[Exception] = deque(maxlen=ERRORS_KEPT)
+        self._snapshot: dict | None = None
+        self._thread: threading.Thread | None = None
+        self._closing = False
+
+        self.base = normalize(store.load())
+        if self.journal.exists():
+            with open(self.journal, encoding="utf-8") as fh:
+                self.pending = [json.loads(line) for line in fh if line.strip()]
+            if self.pending:
+                self.first_at = self.last_at = time.monotonic()
+
+    @property
+    def data(self) -> dict:
+        """The remote state with every pending edit applied.
+
+        One document shared by all readers and rebuilt only after the next
+        submit or flush; callers must not change it.
+        """
+        with self.lock:
+            if self._snapshot is None:
+                data = deepcopy(self.base)
+                for op in self.pending:
+                    apply_op(data, op)
+                self._snapshot = data
+            return self._snapshot
+
+    def submit(self, op: dict, message: str = "data") -> None:
+        """Record an edit; it is committed with its neighbours by the next flush."""
+        op = dict(op, message=message)
+        with self.lock:
+            with open(self.journal, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(op) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            self.pending.append(op)
+            self._snapshot = None
+            now = time.monotonic()
+            self.first_at = self.first_at or now
+            self.last_at = now
+            self.wake.notify()
+
+    def _due(self) -> float | None:
+        """Seconds until the pending batch should be flushed, None if idle."""
+        if not self.pending:
+            return None
+        now = time.monotonic()
+        return max(0.0, min(self.last_at + self.window, self.first_at + self.max_delay) - now)
+
+    def flush(self) -> bool:
+        """Commit every pending edit now. Returns False if retries ran out."""
+        with self.flushing:
+            return self._flush()
+
+    def _flush(self) -> bool:
+        with self.lock:
+            batch = list(self.pending)
+        if not batch:
+            return True
+        messages = sorted({op.get("message", "data") for op in batch})
+        message = "Update " + ", ".join(messages)
+
+        base = self.base
+        for delay in backoff_delays(self.attempts):
+            data = deepcopy(base)
+            dirty: set[str] = set()
+            for op in batch:
+                dirty |= touched_paths(data, op, self.store.prefix)
+                apply_op(data, op)
+            try:
+                self.store.save(data, message, dirty)
+                break
+            except Conflict:
+                try:
+                    base = normalize(self.store.load())
+                except Exception as exc:
+                    self.errors.append(exc)
+            except Exception as exc:
+                self.errors.append(exc)
+            self.sleep(delay)
+        else:
+            with self.lock:
+                # Leave the edits journaled and try again after another window.
+                self.first_at = self.last_at = time.monotonic()
+            return False
+
+        if self.on_commit is not None:
+            try:
+                self.on_commit(data)
+            except Exception as exc:
+                self.errors.append(exc)
+        with self.lock:
+            self.base = data
+            self.pending = self.pending[len(batch):]
+            self._snapshot = None
+            self._rewrite_journal()
+            self.first_at = self.last_at = time.monotonic() if self.pending else None
+        return True
+
+    def _rewrite_journal(self) -> None:
+        tmp = self.journal.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for op in self.pending:
+                fh.write(json.dumps(op) + "\n")
+        os.replace(tmp, self.journal)
+
+    def start(self) -> "WriteQueue":
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            with self.lock:
+                due = self._due()
+                while not self._closing and (due is None or due > 0):
+                    self.wake.wait(due)
+                    due = self._due()
+                if self._closing:
+                    return
+            try:
+                self.flush()
+            except Exception as exc:
+                # A bad edit or a store bug must not stop the writer.
+                self.errors.append(exc)
+                with self.lock:
+                    self.first_at = self.last_at = time.monotonic()
+
+    def close(self) -> bool:
+        """Stop the background thread and flush whatever is still pending."""
+        with self.lock:
+            self._closing = True
+            self.wake.notify()
+        if self._thread:
+            self._thread.join()
+        return self.flush()
@@ -0,0 +1,354 @@
+"""Streamlit front end for the owner statements.
+
+    streamlit run streamlit_app.py
+
+Follows the sidebar of the browser report (owner, month/year, export
+upload, then statement, summary, income or 1099) on top of the
+``guesty_reports`` package. Parsed exports are cached by content hash and
+statements by owner configuration, period and the expenses that apply, in
+caches shared by every session of the server: switching views, rerunning
+after a widget change, or a second person opening the same month reuses
+the parsed rows and the computed statement. Statements and the income
+view read the export's derived columns (see ``guesty_reports.derived``),
+worked out once per export and owner configuration. Reservation overrides
+typed into the statement view are applied per session through
+``incremental.StatementModel``, which re-renders only the property they
+touch.
+"""
+
+from __future__ import annotations
+
+import calendar
+import hashlib
+import io
+import json
+import os
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from guesty_reports.datasource import github_source
+from guesty_reports.derived import DerivedColumns
+from guesty_reports.engine import CODE, Statement
+from guesty_reports.income import cube_rows
+from guesty_reports.incremental import StatementModel
+from guesty_reports.index import PartitionIndex
+from guesty_reports.ingest import read_export
+from guesty_reports.ledger import owner_expenses, period_key
+from guesty_reports.money import dollars, money
+from guesty_reports.registry import OwnershipRegistry, listings_key, owner_rows, owner_statement
+from guesty_reports.render import STYLE, render_statement, render_summary_cards
+from guesty_reports.snapshots import SnapshotStore
+from guesty_reports.store import load_data
+
+AMOUNTS = ["gross", "acc", "clean", "tax"]
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+@st.cache_resource(show_spinner=False)
+def _github_document(token_digest: str, _token: str):
+    return github_source(_token, os.path.expanduser("~/.cache/guesty-reports"))
+
+
+def load_document() -> dict:
+    token = st.sidebar.text_input(
+        "GitHub token", value=os.environ.get("GITHUB_TOKEN", ""), type="password"
+    )
+    if token:
+        return _github_document(_digest(token.encode()), token).load()
+    path = st.sidebar.text_input("data.json", value="data.json")
+    if not os.path.exists(path):
+        st.sidebar.warning("No GitHub token and no local data.json")
+        return {"owners": {}, "vendors": [], "properties": {}, "expenses": []}
+    return _local_document(path, os.stat(path).st_mtime_ns)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _local_document(path: str, mtime_ns: int) -> dict:
+    return load_data(path)
+
+
+@st.cache_resource(show_spinner="Reading export...", max_entries=8)
+def parsed_export(digest: str, _body: bytes) -> tuple[pd.DataFrame, PartitionIndex]:
+    """Projected, prepared rows of an export and their partition index.
+
+    Shared as-is by every session (``cache_resource`` does not copy), so
+    callers must not modify the frame.
+    """
+    frame = read_export(io.BytesIO(_body))
+    return frame, PartitionIndex.build(frame)
+
+
+@st.cache_resource(show_spinner=False)
+def derived_layers() -> DerivedColumns:
+    """Derived per-reservation columns of uploaded exports, shared by every session."""
+    return DerivedColumns()
+
+
+def export_digest(upload) -> str:
+    """Content hash of an uploaded file, hashed once per upload."""
+    seen = st.session_state.setdefault("export_digests", {})
+    if upload.file_id not in seen:
+        seen[upload.file_id] = _digest(upload.getvalue())
+    return seen[upload.file_id]
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def ownership(listings: str) -> OwnershipRegistry:
+    return OwnershipRegistry.from_owners(
+        {o: {"listings": entries} for o, entries in json.loads(listings).items()}
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def owner_split(digest: str, listings: str, _body: bytes) -> dict:
+    """``owner_rows`` of an export under one version of the registry."""
+    frame, _ = parsed_export(digest, _body)
+    registry = ownership(listings)
+    return owner_rows(frame, registry) if len(registry) else {}
+
+
+@st.cache_resource(show_spinner="Computing statement...", max_entries=512)
+def shared_statement(
+    digest: str,
+    owner: str,
+    config_key: str,
+    listings: str,
+    year: int,
+    month: int,
+    expenses_key: str,
+    _expenses: list[dict],
+    _body: bytes,
+) -> Statement:
+    """One owner's statement, shared by every session.
+
+    Not to be modified; overrides go through a ``StatementModel``, which
+    works on its own copy.
+    """
+    frame, index = parsed_export(digest, _body)
+    config = json.loads(config_key)
+    # Owners in the ownership registry see only their listings, as in the batch run.
+    return owner_statement(
+        frame, owner, config, year, month, _expenses,
+        owner_split(digest, listings, _body), index, derived_layers().get(digest, frame, config),
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def statement_view(
+    digest: str,
+    owner: str,
+    config_key: str,
+    listings: str,
+    year: int,
+    month: int,
+    expenses_key: str,
+    _expenses: list[dict],
+    _body: bytes,
+) -> dict:
+    statement = shared_statement(
+        digest, owner, config_key, listings, year, month, expenses_key, _expenses, _body
+    )
+    return {
+        "html": render_statement(statement, _expenses),
+        "summary": render_summary_cards(statement),
+        "master": statement.master.as_dict(),
+        "properties": {p: t.as_dict() for p, t in statement.properties.items()},
+    }
+
+
+def reservation_table(statement: Statement) -> pd.DataFrame:
+    """Property, code and the overridable figures (dollars) of every reservation."""
+    parts = [
+        pd.DataFrame({
+            "property": prop,
+            "code": res[CODE].to_numpy(),
+            "accommodation": dollars(res["acc"].to_numpy()),
+            "cleaning": dollars(res["clean"].to_numpy()),
+        })
+        for prop, res in statement.reservations.items()
+    ]
+    if not parts:
+        return pd.DataFrame(columns=["property", "code", "accommodation", "cleaning"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def with_overrides(key: tuple, statement: Statement, expenses: list[dict], html: str) -> str:
+    """The statement with this session's reservation overrides applied.
+
+    Overrides are typed into a table of the reservations. Each change goes
+    through the session's ``StatementModel``, which re-totals and
+    re-renders only the property it belongs to.
+    """
+    state = st.session_state.get("overrides")
+    if state is None or state["key"] != key:
+        state = st.session_state["overrides"] = {"key": key, "model": None, "applied": {}}
+    exported = reservation_table(statement)
+    with st.expander("Reservation overrides"):
+        edited = st.data_editor(
+            exported,
+            disabled=["property", "code"],
+            hide_index=True,
+            use_container_width=True,
+            key="override-table-" + _digest(repr(key).encode()),
+            column_config={
+                c: st.column_config.NumberColumn(format="$%.2f")
+                for c in ["accommodation", "cleaning"]
+            },
+        )
+    changed = (edited["accommodation"] != exported["accommodation"]) | (
+        edited["cleaning"] != exported["cleaning"]
+    )
+    wanted = {
+        (r.property, r.code): (float(r.accommodation), float(r.cleaning))
+        for r in edited[changed.to_numpy()].itertuples(index=False)
+    }
+    applied = state["applied"]
+    if not wanted and not applied:
+        return html
+    if state["model"] is None:
+        state["model"] = StatementModel(statement, expenses)
+    model = state["model"]
+    for prop, code in set(wanted) | set(applied):
+        if wanted.get((prop, code)) != applied.get((prop, code)):
+            model.set_override(prop, code, *wanted.get((prop, code), (None, None)))
+    state["applied"] = wanted
+    return model.render()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def income_cube(digest: str, _body: bytes) -> tuple[pd.DataFrame, pd.DataFrame]:
+    frame, _ = parsed_export(digest, _body)
+    return cube_rows(frame, derived_layers().base(digest, frame))
+
+
+@st.cache_data(show_spinner=False, ttl=60)
+def ytd_1099(db: str, year: int, owner: str, through_month: int) -> dict:
+    store = SnapshotStore(db)
+    try:
+        return store.report_1099(year, owner, through_month).get(owner, {})
+    finally:
+        store.close()
+
+
+def show_income(digest: str, body: bytes) -> None:
+    cube, detail = income_cube(digest, body)
+    if cube.empty:
+        st.info("No reservations in this export")
+        return
+    days = detail["check_in"].str[:10]
+    first, last = date.fromisoformat(days.min()), date.fromisoformat(days.max())
+    c1, c2, c3 = st.columns(3)
+    start, end = c1.date_input("From", first), c2.date_input("To", last)
+    kind = c3.selectbox("Report type", ["FULL REPORT", "GRI REPORT"])
+    props = st.multiselect("Properties (all when empty)", sorted(cube["property"].unique()))
+
+    rows = detail[(days >= start.isoformat()) & (days <= end.isoformat())]
+    if props:
+        rows = rows[rows["property"].isin(props)]
+    st.metric("GROSS INCOME REVENUE", money(rows["acc"].sum()))
+    if kind == "GRI REPORT":
+        table = rows[["property", "check_in", "check_out", "platform", "acc"]]
+    else:
+        by = st.radio("Group by", ["property", "platform"], horizontal=True)
+        table = rows.groupby(by)[AMOUNTS].sum().reset_index()
+    show_amounts(table)
+
+
+def show_amounts(table: pd.DataFrame) -> None:
+    """A table whose cents columns are shown as dollars."""
+    table = table.copy()
+    cols = [c for c in table.columns if c in AMOUNTS + ["pmc", "expenses", "owner"]]
+    for c in cols:
+        table[c] = dollars(table[c].to_numpy())
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={c: st.column_config.NumberColumn(format="$%.2f") for c in cols},
+    )
+
+
+def main() -> None:
+    st.set_page_config(page_title="Ocean Vacations statements", layout="wide")
+    data = load_document()
+
+    owners = sorted(data["owners"])
+    owner = st.sidebar.selectbox("Owner", owners, index=None, placeholder="Select owner")
+    today = date.today()
+    month = st.sidebar.selectbox(
+        "Month", range(1, 13), index=today.month - 1, format_func=lambda m: calendar.month_name[m]
+    )
+    year = st.sidebar.selectbox("Year", range(today.year - 3, today.year + 2), index=3)
+    upload = st.sidebar.file_uploader("Guesty export", type="csv")
+    view = st.sidebar.radio("View", ["Statement", "Summary", "Income", "1099"])
+    snapshots = st.sidebar.text_input("Snapshot database (1099)", value="snapshots.db")
+
+    if upload is None:
+        st.info("Upload a Guesty CSV export to begin")
+        return
+    digest = export_digest(upload)
+    body = upload.getvalue()
+
+    if view == "Income":
+        show_income(digest, body)
+        return
+    if owner is None:
+        st.info("Select owner first")
+        return
+
+    listings = listings_key(data["owners"])
+    conflicts = ownership(listings).conflicts
+    if owner in conflicts:
+        st.error("Overlapping ownership: " + "; ".join(conflicts[owner]))
+        return
+    config = data["owners"][owner]
+    expenses = owner_expenses(data["expenses"], owner, year, month)
+    key = (
+        digest,
+        owner,
+        json.dumps(config, sort_keys=True),
+        listings,
+        year,
+        month,
+        _digest(json.dumps(expenses, sort_keys=True).encode()),
+    )
+    result = statement_view(*key, expenses, body)
+    if not result["properties"]:
+        st.warning(f"No reservations for {owner} in {calendar.month_name[month]} {year}")
+        return
+
+    if view == "Statement":
+        html = with_overrides(key, shared_statement(*key, expenses, body), expenses, result["html"])
+        components.html(html, height=1200, scrolling=True)
+        st.download_button(
+            "Download statement",
+            html,
+            file_name=f"{owner}-{period_key(year, month)}.html",
+            mime="text/html",
+        )
+    elif view == "Summary":
+        components.html(f"<style>{STYLE}</style>" + result["summary"], height=260)
+        table = pd.DataFrame(result["properties"]).T[["acc", "clean", "pmc", "expenses", "owner"]]
+        show_amounts(table.rename_axis("property").reset_index())
+    else:
+        m = result["master"]
+        ytd = ytd_1099(snapshots, year, owner, month) if os.path.exists(snapshots) else {}
+        if ytd:
+            st.subheader(f"1099 SUMMARY: {year} YEAR TO DATE")
+            figures = [ytd["accommodation"], ytd["pmc"], ytd["expenses"], ytd["net"]]
+        else:
+            st.subheader(f"1099 SUMMARY: {calendar.month_name[month].upper()} {year}")
+            figures = [m["acc"], m["pmc"], m["expenses"], m["owner"]]
+        for col, label, value in zip(
+            st.columns(4), ["ACCOMMODATION", "PMC", "EXPENSES", "NET TO OWNER"], figures
+        ):
+            col.metric(label, money(value))
+
+
+main()
@@ -0,0 +1,15 @@
+import pandas as pd
+import pytest
+
+from guesty_reports.engine import MONEY_COLUMNS, TEXT_COLUMNS, prepare
+
+
+def export_frame(rows: list[dict]) -> pd.DataFrame:
+    """A prepared export of ``rows``; columns a row leaves out are blank."""
+    frame = pd.DataFrame(rows, columns=TEXT_COLUMNS + MONEY_COLUMNS, dtype=str).fillna("")
+    return prepare(frame)
+
+
+@pytest.fixture
+def export():
+    return export_frame
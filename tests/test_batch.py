@@ -0,0 +1,104 @@
+"""Batch runs for selected owners, and the derived-column layers they share."""
+
+import json
+
+import pandas as pd
+
+from guesty_reports import derived as derived_module
+from guesty_reports.batch import main
+from guesty_reports.cache import ExportCache
+from guesty_reports.derived import DerivedColumns, config_key
+from guesty_reports.history import HistoryStore
+from guesty_reports.store import owner_key
+
+
+def stay(listing, code, acc):
+    return {
+        "CHECK-IN DATE": "2026-09-10",
+        "CHECK-OUT DATE": "2026-09-12",
+        "LISTING'S NICKNAME": listing,
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": acc,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": "$0.00",
+    }
+
+
+OWNERS = {
+    "Alice": {"type": "draft", "percent": 0.2, "listings": ["Beach House"]},
+    "Bob": {"type": "draft", "percent": 0.2, "listings": ["Pier View"]},
+    "Carol": {"type": "payout", "percent": 0.25, "listings": ["Dune Cottage"]},
+}
+
+
+def setup(tmp_path):
+    export = tmp_path / "export.csv"
+    pd.DataFrame([
+        stay("Beach House", "AB-1", "$100.00"),
+        stay("Pier View", "AB-2", "$200.00"),
+        stay("Dune Cottage", "AB-3", "$400.00"),
+    ]).to_csv(export, index=False)
+    data = tmp_path / "data.json"
+    data.write_text(json.dumps({"owners": OWNERS}))
+    return export, data
+
+
+def test_owner_option_writes_only_that_owners_statement(tmp_path, capsys):
+    export, data = setup(tmp_path)
+    out, history = tmp_path / "out", tmp_path / "history.db"
+    argv = [
+        str(export), "--data", str(data), "--year", "2026", "--month", "9",
+        "--out", str(out), "--owner", "Alice", "--workers", "1", "--history", str(history),
+    ]
+    assert main(argv) == 0
+    assert [p.name for p in out.iterdir()] == [f"{owner_key('Alice')}-2026-09.html"]
+    assert "1 ok, 0 failed" in capsys.readouterr().out
+
+    store = HistoryStore(history)
+    try:
+        totals = store.totals(store.latest("Alice", 2026, 9))
+        assert list(totals["reservations"]) == ["Beach House"]
+        assert totals["master"]["acc"] == 10000
+        assert store.periods("Bob") == []
+    finally:
+        store.close()
+
+    assert main(argv[:-4] + ["--owner", "Nobody"]) == 1
+    assert "Nobody: FAILED" in capsys.readouterr().out
+
+
+def test_owners_sharing_a_configuration_share_a_layer(tmp_path, monkeypatch):
+    export, data = setup(tmp_path)
+    assert config_key(OWNERS["Alice"]) == config_key(OWNERS["Bob"])
+    assert config_key({"type": "draft", "percent": 0.2}) == config_key(OWNERS["Alice"])
+    assert config_key(OWNERS["Carol"]) != config_key(OWNERS["Alice"])
+
+    argv = [
+        str(export), "--data", str(data), "--year", "2026", "--month", "9",
+        "--out", str(tmp_path / "out"), "--workers", "1", "--cache", str(tmp_path / "cache"),
+    ]
+    assert main(argv) == 0
+    cache = ExportCache(tmp_path / "cache")
+    digest = cache.digest(export)
+    layers = DerivedColumns(cache)
+    assert layers.keys(digest) == sorted({config_key(c) for c in OWNERS.values()})
+
+    # A fresh reader is answered from the stored layers, not recomputed.
+    def no_compute(*args):
+        raise AssertionError("computed again")
+
+    frame = cache.load(export)
+    with monkeypatch.context() as m:
+        m.setattr(derived_module, "base_columns", no_compute)
+        m.setattr(derived_module, "config_columns", no_compute)
+        alice = layers.get(digest, frame, OWNERS["Alice"])
+    assert list(alice["pmc"]) == [2000, 4000, 8000]
+    assert layers.get(digest, frame, OWNERS["Bob"])["pmc"] is alice["pmc"]
+    assert layers.memory.stats()["hits"] == 2
+
+    # Dropping Carol prunes her layer on the next run.
+    data.write_text(json.dumps({"owners": {"Alice": OWNERS["Alice"]}}))
+    assert main(argv) == 0
+    assert layers.keys(digest) == [config_key(OWNERS["Alice"])]
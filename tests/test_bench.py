@@ -0,0 +1,15 @@
+from guesty_reports.bench import previous
+
+
+def test_previous_needs_same_size_seed_and_machine():
+    base = {"rows": 1000, "owners": 5, "listings": 4, "seed": 0, "machine": "x86_64 a", "cpus": 8}
+    history = [
+        dict(base, at="1"),
+        dict(base, at="2", seed=1),
+        dict(base, at="3", cpus=2),
+        dict(base, at="4", machine="arm64 b"),
+        {k: v for k, v in dict(base, at="5").items() if k not in ("seed", "cpus")},
+    ]
+    assert previous(history, base)["at"] == "1"
+    assert previous(history, dict(base, seed=1))["at"] == "2"
+    assert previous(history, dict(base, cpus=4)) is None
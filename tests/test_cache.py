@@ -0,0 +1,55 @@
+import pandas as pd
+
+from guesty_reports import cache as cache_module
+from guesty_reports.cache import ExportCache, SingleFlight
+
+
+def stay(check_in, listing, code, acc):
+    return {
+        "CHECK-IN DATE": check_in,
+        "LISTING'S NICKNAME": listing,
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "ACCOMMODATION FARE": acc,
+    }
+
+
+ROWS = [
+    stay("2026-09-01", "Pier View", "AB-1", "$100.00"),
+    stay("2026-09-02", "Beach House", "AB-2", "$200.00"),
+    stay("2026-10-03", "Pier View", "AB-3", "$300.00"),
+]
+
+
+def test_export_cache_parses_each_content_once(tmp_path, monkeypatch):
+    first, copy = tmp_path / "a.csv", tmp_path / "b.csv"
+    pd.DataFrame(ROWS).to_csv(first, index=False)
+    pd.DataFrame(ROWS).to_csv(copy, index=False)
+    cache = ExportCache(tmp_path / "cache")
+    parsed = cache.load(first)
+
+    # Same bytes under another name: a hit, answered from the .npy columns.
+    def no_parse(*args, **kw):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(cache_module, "read_export", no_parse)
+    assert cache.digest(copy) == cache.digest(first)
+    hit = cache.load(copy)
+    assert list(hit.columns) == list(parsed.columns)
+    for column in parsed:
+        assert list(hit[column]) == list(parsed[column])
+    assert cache.rows_read(cache.digest(first)) == 3
+
+    # Different bytes: a different key, so a miss.
+    pd.DataFrame(ROWS[:2]).to_csv(copy, index=False)
+    assert cache.digest(copy) != cache.digest(first)
+    assert cache.digest(copy) not in cache
+
+
+def test_single_flight_computes_a_key_once():
+    flight = SingleFlight(maxsize=2)
+    calls = []
+    for _ in range(3):
+        assert flight.get("k", lambda: calls.append(1) or len(calls)) == 1
+    assert calls == [1]
+    assert flight.stats()["hits"] == 2
@@ -0,0 +1,113 @@
+"""``process_data`` against the browser's ``processData`` on the same rows.
+
+Expected figures were read off app.py's statement for these rows (the
+summary cards and, for the payout owner, the reservation table, which is
+where the browser charges platform fees).
+"""
+
+from guesty_reports import process_data
+
+
+def row(check_in, listing, code, platform, payout, acc, clean, **extra):
+    return {
+        "CHECK-IN DATE": check_in,
+        "CHECK-OUT DATE": check_in,
+        "LISTING'S NICKNAME": listing,
+        "CONFIRMATION CODE": code,
+        "PLATFORM": platform,
+        "STATUS": extra.pop("status", "confirmed"),
+        "TOTAL PAYOUT": payout,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": clean,
+        **extra,
+    }
+
+
+DRAFT_ROWS = [
+    row("2026-09-03", "Beach House", "WEB-1001", "website", "$1,234.00", "$1,000.00", "$150.00",
+        **{"MARKUP": "$50.00", "LENGTH OF STAY DISCOUNT": "-$25.00", "COMMUNITY FEE": "$10.00"}),
+    row("2026-09-10", "Beach House", "HA-55120", "homeaway", "$800.00", "$700.00", "$120.00"),
+    row("2026-09-18", "Beach House", "VR-88001", "vrbo", "$655.55", "$555.55", "$100.00"),
+    row("2026-09-05", "Dune Cottage", "MAN-0042", "Manual", "$300.33", "$250.33", "$80.00",
+        status="Cancelled"),
+    # Website booking with an HA code: no website fee.
+    row("2026-09-20", "Dune Cottage", "HAW-7", "website", "$410.10", "$360.10", "$50.00"),
+    row("2026-10-01", "Dune Cottage", "WEB-2000", "website", "$999.00", "$900.00", "$99.00"),
+]
+
+PAYOUT_ROWS = [
+    row("2026-09-02", "Pier View", "WEB-3001", "website", "$1,500.00", "$1,200.00", "$150.00",
+        **{"CITY TAX": "$12.00", "STATE TAX": "$84.00", "COUNTY TAX": "$18.00",
+           "OCCUPANCY TAX": "$36.00"}),
+    row("2026-09-08", "Pier View", "HA-3002", "HomeAway", "$987.65", "$850.40", "$137.15"),
+    row("2026-09-15", "Pier View", "VR-3003", "vrbo", "$720.40", "$600.20", "$120.00"),
+    row("2026-09-22", "Pier View", "AB-3004", "airbnb2", "$640.00", "$540.00", "$100.00"),
+]
+
+EXPENSES = [
+    {"id": 1, "owner": "Alice", "property": "Beach House", "amount": 75.25, "period": "2026-09"},
+    {"id": 2, "owner": "Alice", "property": "Dune Cottage", "amount": 20, "period": "2026-08"},
+    {"id": 3, "owner": "Bob", "property": "Pier View", "amount": 42.10},
+]
+
+
+def test_draft_owner_matches_browser(export):
+    config = {"type": "draft", "percent": 0.2}
+    st = process_data(export(DRAFT_ROWS), "Alice", config, 2026, 9, EXPENSES)
+
+    assert list(st.properties) == ["Beach House", "Dune Cottage"]
+    beach, dune = st.properties["Beach House"], st.properties["Dune Cottage"]
+    # Beach House: ACCOMMODATION $2170.55, CLEANING FEE $370.00, WEBSITE (1%)
+    # $12.34, EXPENSES $75.25, PMC (20.00%) $434.11, AMOUNT DUE $891.70.
+    assert (beach.acc, beach.clean, beach.website_fee, beach.expenses, beach.pmc, beach.draft) == (
+        217055, 37000, 1234, 7525, 43411, 89170,
+    )
+    # Dune Cottage: the cancelled stay keeps its website fee but not its
+    # cleaning; the HA-coded website booking pays no fee.
+    assert (dune.acc, dune.clean, dune.website_fee, dune.expenses, dune.pmc, dune.draft) == (
+        61043, 5000, 300, 0, 12209, 17509,
+    )
+    m = st.master
+    # GROSS PAYOUT $3399.98, ACCOMMODATION $2780.98, CLEANING FEE $420.00,
+    # WEBSITE (1%) $15.34, EXPENSES $75.25, PMC $556.20, AMOUNT DUE $1066.79.
+    assert (m.gross, m.acc, m.clean, m.website_fee, m.vrbo_fee, m.expenses, m.pmc, m.draft) == (
+        339998, 278098, 42000, 1534, 0, 7525, 55620, 106679,
+    )
+    assert m.owner == 214953
+    assert st.tax_by_property == {}
+
+
+def test_payout_owner_matches_browser_reservation_table(export):
+    config = {"type": "payout", "percent": 0.25}
+    st = process_data(export(PAYOUT_ROWS), "Bob", config, 2026, 9, EXPENSES)
+
+    pier = st.properties["Pier View"]
+    # ACCOMMODATION $3190.60, PMC $797.65, EXPENSES $42.10 (undated).
+    assert (pier.gross, pier.acc, pier.clean, pier.pmc, pier.expenses) == (
+        384805, 319060, 50715, 79765, 4210,
+    )
+    # Platform fees per row: website $15.00, homeaway $49.38, vrbo $36.02,
+    # airbnb none.
+    assert (pier.website_fee, pier.vrbo_fee) == (1500, 8540)
+    # The rows' OWNER PAYOUT ($885.00 + $588.42 + $414.13 + $405.00) less
+    # the expenses.
+    assert pier.owner == 88500 + 58842 + 41413 + 40500 - 4210
+    assert pier.draft == 79765 + 50715 + 4210
+    assert pier.tax == 15000
+    assert st.tax_by_property == {
+        "Pier View": {"gross": 150000, "tax": 15000, "netReportable": pier.owner - 15000},
+    }
+    assert st.master.as_dict() == pier.as_dict()
+
+
+def test_half_cent_pmc_matches_browser_total(export):
+    rows = [
+        row("2026-09-08", "Pier View", "HA-3102", "homeaway", "$987.65", "$850.50", "$137.15"),
+        row("2026-09-15", "Pier View", "VR-3103", "vrbo", "$720.40", "$600.30", "$120.00"),
+        row("2026-09-22", "Pier View", "AB-3104", "airbnb2", "$640.00", "$540.00", "$100.00"),
+    ]
+    st = process_data(export(rows), "Bob", {"type": "payout", "percent": 0.25}, 2026, 9, [])
+
+    # 25% of $850.50, $600.30 and $540.00 is $212.625 + $150.075 + $135.00,
+    # which the browser shows as PMC $497.70.
+    assert st.properties["Pier View"].pmc == 21262 + 15008 + 13500 == 49770
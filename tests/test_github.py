@@ -0,0 +1,96 @@
+"""``GitHubContents.commit`` against a fake git data API."""
+
+import json
+
+import pytest
+
+from guesty_reports.github import Conflict, GitHubContents, blob_sha
+
+API = "https://api.example"
+FILES = {
+    "data/manifest.json": b"[]",
+    "data/owners/alice.json": b'{"percent": 0.2}',
+    "data/owners/bob.json": b'{"percent": 0.25}',
+    "data/expenses/alice/2026-09.json": b"[]",
+    "data.json": b"{}" * 5000,
+}
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode()
+        self.headers = {}
+        self.request = type("Request", (), {"body": None})()
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeGit:
+    """Trees by sha for ``FILES`` and a log of the URLs requested."""
+
+    def __init__(self, files):
+        self.urls = []
+        self.trees = {}
+        self.root = self._tree("", files)
+
+    def _tree(self, prefix, files):
+        entries, subdirs = [], {}
+        for path, content in files.items():
+            rest = path[len(prefix):]
+            if "/" in rest:
+                subdirs.setdefault(rest.split("/")[0], {})[path] = content
+            else:
+                entries.append({"path": rest, "type": "blob", "sha": blob_sha(content)})
+        for name, sub in subdirs.items():
+            sha = self._tree(f"{prefix}{name}/", sub)
+            entries.append({"path": name, "type": "tree", "sha": sha})
+        sha = f"tree-{len(self.trees)}"
+        self.trees[sha] = entries
+        return sha
+
+    def request(self, method, url, headers=None, **kw):
+        self.urls.append((method, url))
+        path = url.split("/repos/o/r/", 1)[1]
+        if path == "git/ref/heads/main":
+            return Response(200, {"object": {"sha": "head"}})
+        if path == "git/commits/head":
+            return Response(200, {"tree": {"sha": self.root}})
+        if path.startswith("git/trees/"):
+            return Response(200, {"tree": self.trees[path[len("git/trees/"):]]})
+        if path in ("git/trees", "git/commits"):
+            return Response(201, {"sha": "new"})
+        if path == "git/refs/heads/main":
+            return Response(200, {})
+        return Response(404, {})
+
+
+def client(fake):
+    return GitHubContents("t", repo="o/r", branch="main", session=fake, api=API)
+
+
+def test_commit_checks_shas_from_tree_listings_only():
+    fake = FakeGit(FILES)
+    alice = "data/owners/alice.json"
+    client(fake).commit(
+        {alice: b'{"percent": 0.3}', "data/owners/carol.json": b"{}"}, "edit",
+        {alice: blob_sha(FILES[alice]), "data/owners/carol.json": None},
+    )
+    assert not [u for _, u in fake.urls if "/contents/" in u]
+    # The root and data/owners listings; data/ on the way; nothing else.
+    assert sum("git/trees/tree-" in u for _, u in fake.urls) == 3
+
+
+def test_commit_raises_conflict_on_a_changed_shard():
+    fake = FakeGit(FILES)
+    alice = "data/owners/alice.json"
+    with pytest.raises(Conflict):
+        client(fake).commit({alice: b"{}"}, "edit", {alice: blob_sha(b"stale")})
+    with pytest.raises(Conflict):
+        client(fake).commit({alice: b"{}"}, "edit", {alice: None})
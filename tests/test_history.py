@@ -0,0 +1,55 @@
+"""``HistoryStore`` versions, dedupe of unchanged re-runs and diffs."""
+
+import sqlite3
+
+import pytest
+
+from guesty_reports import process_data
+from guesty_reports.history import HistoryStore
+
+CONFIG = {"type": "payout", "percent": 0.2}
+
+
+def stay(code, acc):
+    return {
+        "CHECK-IN DATE": "2026-09-10",
+        "CHECK-OUT DATE": "2026-09-12",
+        "LISTING'S NICKNAME": "Pier View",
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": acc,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": "$0.00",
+    }
+
+
+def test_versions_dedupe_and_diff(export, tmp_path):
+    first = process_data(export([stay("AB-1", "$100.00")]), "Ann", CONFIG, 2026, 9, [])
+    second = process_data(
+        export([stay("AB-1", "$150.00"), stay("AB-2", "$50.00")]), "Ann", CONFIG, 2026, 9, []
+    )
+    store = HistoryStore(tmp_path / "history.db")
+    try:
+        a = store.record(first, [], b"<html>first</html>")
+        assert store.record(first, [], b"<html>first</html>") == a
+        b = store.record(second, [], b"<html>second</html>")
+        # Going back to the first inputs is a new, latest version.
+        c = store.record(first, [], b"<html>first</html>")
+        assert [v["id"] for v in store.versions("Ann", 2026, 9)] == [a, b, c]
+        assert store.periods("Ann") == [(2026, 9, 3)]
+        assert store.latest("Ann", 2026, 9) == c
+        assert store.output(b) == (b"<html>second</html>", "html")
+
+        diff = store.diff(a, b)
+        assert diff["master"]["acc"] == (10000, 20000)
+        pier = diff["properties"]["Pier View"]
+        assert pier["added"] == ["AB-2"]
+        assert pier["removed"] == []
+        assert pier["changed"]["AB-1"]["acc"] == (10000, 15000)
+
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            with store.db:
+                store.db.execute("DELETE FROM statements WHERE id = ?", (a,))
+    finally:
+        store.close()
@@ -0,0 +1,92 @@
+"""``IncomeCube`` range queries over exports with time-suffixed dates."""
+
+from guesty_reports.income import IncomeCube
+
+
+def stay(check_in, code, acc):
+    return {
+        "CHECK-IN DATE": check_in,
+        "CHECK-OUT DATE": check_in,
+        "LISTING'S NICKNAME": "Pier View",
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": acc,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": "$0.00",
+    }
+
+
+def test_partial_month_keeps_time_suffixed_check_ins(export, tmp_path):
+    cube = IncomeCube(tmp_path / "income.db")
+    try:
+        cube.ingest(export([
+            stay("2026-09-01 15:00", "AB-1", "$100.00"),
+            stay("2026-09-15T16:00:00", "AB-2", "$200.00"),
+            stay("2026-09-30 11:00", "AB-3", "$400.00"),
+        ]))
+        # A range ending mid-month is answered from reservation rows.
+        assert cube.gri("2026-09-01", "2026-09-15") == 30000
+        assert cube.gri("2026-09-15", "2026-09-30") == 60000
+        assert cube.gri("2026-09", "2026-09") == 70000
+        detail = cube.gri_detail("2026-09-01", "2026-09-30")
+        assert list(detail["code"]) == ["AB-1", "AB-2", "AB-3"]
+        assert list(detail["check_in"]) == ["2026-09-01", "2026-09-15", "2026-09-30"]
+    finally:
+        cube.close()
+
+
+def test_service_serves_income_from_the_cube(tmp_path):
+    import pandas as pd
+
+    from guesty_reports.cache import ExportCache
+    from guesty_reports.datasource import DataSource
+    from guesty_reports.github import LocalContents
+    from guesty_reports.service import StatementService
+    from guesty_reports.store import ShardedStore
+
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    rows = [
+        stay("2026-08-20", "AB-0", "$50.00"),
+        stay("2026-09-01 15:00", "AB-1", "$100.00"),
+        stay("2026-09-15", "AB-2", "$200.00"),
+        dict(stay("2026-09-30", "VR-3", "$400.00"), PLATFORM="vrbo"),
+    ]
+    pd.DataFrame(rows).to_csv(exports / "export.csv", index=False)
+    source = DataSource(ShardedStore(LocalContents(tmp_path / "repo")), tmp_path / "data.json")
+    service = StatementService(source, exports, ExportCache(tmp_path / "cache"))
+    try:
+        whole = service.income("export.csv", "2026-08", "2026-09")
+        assert [(r["property"], r["reservations"], r["acc"]) for r in whole] == [
+            ("Pier View", 4, 75000),
+        ]
+        partial = service.income("export.csv", "2026-09-01", "2026-09-15", by="platform")
+        assert [(r["platform"], r["reservations"], r["acc"]) for r in partial] == [
+            ("airbnb2", 2, 30000),
+        ]
+        detail = service.income("export.csv", "2026-09", "2026-09", detail=True)
+        assert [r["code"] for r in detail] == ["AB-1", "AB-2", "VR-3"]
+        caches = service.stats()["results"]
+        assert (caches["export"]["entries"], caches["income"]["entries"]) == (1, 1)
+        assert caches["income"]["hits"] == 2
+    finally:
+        service.close()
+
+
+def test_ingest_replaces_only_the_properties_it_has(export, tmp_path):
+    cube = IncomeCube(tmp_path / "income.db")
+    try:
+        cube.ingest(export([stay("2026-09-05", "AB-1", "$100.00")]))
+        other = dict(stay("2026-09-06", "AB-2", "$200.00"), **{"LISTING'S NICKNAME": "Beach House"})
+        cube.ingest(export([other]))
+        totals = cube.totals("2026-09", "2026-09")
+        assert dict(zip(totals["property"], totals["acc"])) == {
+            "Beach House": 20000, "Pier View": 10000,
+        }
+        # Re-ingesting a property replaces just its month.
+        cube.ingest(export([stay("2026-09-07", "AB-3", "$300.00")]))
+        assert cube.gri("2026-09", "2026-09") == 50000
+        assert list(cube.gri_detail("2026-09", "2026-09")["code"]) == ["AB-2", "AB-3"]
+    finally:
+        cube.close()
@@ -0,0 +1,93 @@
+from guesty_reports import process_data
+from guesty_reports.engine import Totals
+from guesty_reports.incremental import StatementModel
+
+CONFIG = {"type": "draft", "percent": 0.2}
+ROWS = [
+    {"CHECK-IN DATE": "2026-09-03", "LISTING'S NICKNAME": "Beach House",
+     "CONFIRMATION CODE": "WEB-1001", "PLATFORM": "website", "TOTAL PAYOUT": "1234.00",
+     "ACCOMMODATION FARE": "1000.00", "CLEANING FARE": "150.00"},
+    {"CHECK-IN DATE": "2026-09-10", "LISTING'S NICKNAME": "Beach House",
+     "CONFIRMATION CODE": "AB-2002", "PLATFORM": "airbnb2", "TOTAL PAYOUT": "800.00",
+     "ACCOMMODATION FARE": "700.00", "CLEANING FARE": "120.00"},
+    {"CHECK-IN DATE": "2026-09-05", "LISTING'S NICKNAME": "Dune Cottage",
+     "CONFIRMATION CODE": "MAN-0042", "PLATFORM": "manual", "TOTAL PAYOUT": "300.00",
+     "ACCOMMODATION FARE": "250.00", "CLEANING FARE": "80.00"},
+]
+EXPENSES = [{"id": 1, "owner": "Alice", "property": "Dune Cottage", "amount": 30}]
+
+
+def statement(export, rows=ROWS):
+    return process_data(export(rows), "Alice", CONFIG, 2026, 9, EXPENSES)
+
+
+def test_override_retotals_only_its_property(export):
+    original = statement(export)
+    model = StatementModel(original, EXPENSES)
+    model.render()
+    dune = model.statement.properties["Dune Cottage"]
+
+    assert model.set_override("Beach House", "WEB-1001", acc=900) == {"Beach House"}
+
+    # Same totals as recomputing with the fare changed in the export.
+    edited = [dict(ROWS[0], **{"ACCOMMODATION FARE": "900.00"})] + ROWS[1:]
+    expected = statement(export, edited)
+    assert model.statement.properties["Beach House"] == expected.properties["Beach House"]
+    assert model.statement.properties["Dune Cottage"] is dune
+    assert model.master == expected.master
+
+    summary, sections = model.render_dirty()
+    assert list(sections) == ["Beach House"]
+    assert "$900.00" in sections["Beach House"]
+    assert model.render_dirty()[1] == {}
+
+
+def test_clearing_an_override_restores_the_export(export):
+    original = statement(export)
+    before = {p: Totals(**t.as_dict()) for p, t in original.properties.items()}
+    model = StatementModel(original, EXPENSES)
+    model.set_override("Dune Cottage", "MAN-0042", acc=200, clean=0)
+    model.clear_override("Dune Cottage", "MAN-0042")
+
+    assert model.statement.properties == before
+    # The statement the model was built from is never changed.
+    assert original.properties == before
+    assert int(original.reservations["Dune Cottage"]["acc"].iloc[0]) == 25000
+
+
+def test_override_updates_the_tax_view(export):
+    payout = {"type": "payout", "percent": 0.2}
+    taxed = [dict(ROWS[0], **{"CITY TAX": "12.00", "STATE TAX": "84.00"})] + ROWS[1:]
+    edited = [dict(taxed[0], **{"ACCOMMODATION FARE": "900.00"})] + taxed[1:]
+    original = process_data(export(taxed), "Alice", payout, 2026, 9, EXPENSES)
+    model = StatementModel(original, EXPENSES)
+    model.set_override("Beach House", "WEB-1001", acc=900)
+
+    expected = process_data(export(edited), "Alice", payout, 2026, 9, EXPENSES)
+    assert model.statement.tax_by_property == expected.tax_by_property
+    assert model.statement.tax_by_property != original.tax_by_property
+
+
+def test_service_applies_overrides_to_a_copy(tmp_path):
+    import pandas as pd
+
+    from guesty_reports.cache import ExportCache
+    from guesty_reports.datasource import DataSource
+    from guesty_reports.github import LocalContents
+    from guesty_reports.service import StatementService
+    from guesty_reports.store import ShardedStore, dump_data
+
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    pd.DataFrame(ROWS).to_csv(exports / "2026-09.csv", index=False)
+    repo = LocalContents(tmp_path / "repo")
+    repo.put("data.json", dump_data({"owners": {"Alice": CONFIG}, "expenses": EXPENSES}), "seed")
+    source = DataSource(ShardedStore(repo), tmp_path / "cache" / "data.json")
+    service = StatementService(source, exports, ExportCache(tmp_path / "cache"))
+
+    plain = service.summary("2026-09.csv", "Alice", 2026, 9)
+    changed = service.summary("2026-09.csv", "Alice", 2026, 9, (("WEB-1001", 900.0, None),))
+    assert changed["properties"]["Dune Cottage"] == plain["properties"]["Dune Cottage"]
+    beach = plain["properties"]["Beach House"]
+    assert changed["properties"]["Beach House"]["acc"] == beach["acc"] - 10000
+    assert service.summary("2026-09.csv", "Alice", 2026, 9) == plain
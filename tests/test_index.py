@@ -0,0 +1,36 @@
+import numpy as np
+
+from guesty_reports.engine import select_period
+from guesty_reports.index import PartitionIndex
+
+
+def stay(check_in, listing, code):
+    return {"CHECK-IN DATE": check_in, "LISTING'S NICKNAME": listing, "CONFIRMATION CODE": code}
+
+
+ROWS = [
+    stay("2026-09-03", "Pier View", "A"),
+    stay("2026-10-01", "Pier View", "B"),
+    stay("2026-09-01", "Beach House", "C"),
+    stay("", "Pier View", "D"),
+    stay("2026-09-20", "", "E"),
+    stay("2026-09-09", "Pier View", "F"),
+]
+
+
+def test_index_rows_match_the_period_mask(export, tmp_path):
+    frame = export(ROWS)
+    index = PartitionIndex.build(frame)
+
+    assert index.periods() == [(2026, 9), (2026, 10)]
+    assert sorted(index.listings(2026, 9)) == ["Beach House", "Pier View", "Unknown"]
+    # Export order, as the mask keeps it.
+    assert list(index.take(frame, 2026, 9)["CONFIRMATION CODE"]) == list(
+        select_period(frame, 2026, 9)["CONFIRMATION CODE"]
+    ) == ["A", "C", "E", "F"]
+    assert list(index.rows(2026, 9, ["Pier View", "Nowhere"])) == [0, 5]
+    assert len(index.rows(2025, 1)) == 0
+
+    index.save(tmp_path)
+    loaded = PartitionIndex.load(tmp_path)
+    assert np.array_equal(loaded.rows(2026, 9, ["Unknown"]), index.rows(2026, 9, ["Unknown"]))
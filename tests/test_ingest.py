@@ -0,0 +1,47 @@
+import pandas as pd
+
+from guesty_reports.ingest import PROJECTED, iter_chunks, read_export
+
+
+def stay(check_in, code, acc):
+    return {
+        "CHECK-IN DATE": check_in,
+        "LISTING'S NICKNAME": "Pier View",
+        "CONFIRMATION CODE": code,
+        "ACCOMMODATION FARE": acc,
+        "GUEST NOTES": "not a statement column",
+    }
+
+
+ROWS = [
+    stay("2026-08-30", "AB-1", "$1,000.00"),
+    stay("2026-09-01", "AB-2", "$200.50"),
+    stay("", "AB-3", "$5.00"),
+    stay("2026-09-30 16:00", "AB-4", "$300.00"),
+    stay("2026-10-01", "AB-5", "$400.00"),
+]
+
+
+def test_read_export_projects_filters_and_parses_across_chunks(tmp_path):
+    path = tmp_path / "export.csv"
+    pd.DataFrame(ROWS).to_csv(path, index=False)
+    counts = {}
+    frame = read_export(path, [(2026, 9)], chunksize=2, counts=counts)
+
+    assert list(frame["CONFIRMATION CODE"]) == ["AB-2", "AB-4"]
+    assert "GUEST NOTES" not in frame
+    assert set(frame.columns) <= set(PROJECTED) | {"year", "month"}
+    assert list(frame["ACCOMMODATION FARE"]) == [20050, 30000]
+    assert counts == {"rows_read": 5, "rows_skipped": 3}
+
+
+def test_chunks_match_one_read_of_every_dated_row(tmp_path, export):
+    path = tmp_path / "export.csv"
+    pd.DataFrame(ROWS).to_csv(path, index=False)
+    chunks = list(iter_chunks(path, chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1, 1]
+    whole = pd.concat(chunks, ignore_index=True)
+    expected = export([{k: v for k, v in r.items() if k != "GUEST NOTES"} for r in ROWS])
+    expected = expected[expected["year"] > 0].reset_index(drop=True)
+    for column in ("CONFIRMATION CODE", "ACCOMMODATION FARE", "year", "month"):
+        assert list(whole[column]) == list(expected[column])
@@ -0,0 +1,54 @@
+import random
+
+from guesty_reports.ledger import ExpenseLedger, owner_expenses
+from guesty_reports.money import to_cents
+
+
+def scan(entries, owner, period):
+    """The browser's ``expenses.filter``: own period plus undated entries."""
+    out = {}
+    for e in entries:
+        if e["owner"] == owner and e.get("period") in (None, "", period):
+            out[e["property"]] = out.get(e["property"], 0) + to_cents(e["amount"])
+    return out
+
+
+def entries(n=300, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "owner": rng.choice(["Alice", "Bob"]),
+            "property": rng.choice(["Beach House", "Pier View", "Dune Cottage"]),
+            "amount": round(rng.uniform(1, 500), 2),
+            **({"period": rng.choice(["2026-08", "2026-09"])} if rng.random() < 0.8 else {}),
+        }
+        for i in range(n)
+    ]
+
+
+def test_ledger_totals_match_a_scan_through_edits():
+    items = entries()
+    ledger = ExpenseLedger(items)
+    for owner in ("Alice", "Bob"):
+        for period in ("2026-08", "2026-09", "2026-10"):
+            assert ledger.totals_for(owner, period) == scan(items, owner, period)
+
+    ledger.remove(5)
+    ledger.update(7, amount=1.25, period="2026-10")
+    ledger.add({"id": 9, "owner": "Carol", "property": "Pier View", "amount": "$10.00"})
+    edited = [e for e in items if e["id"] not in (5, 7, 9)]
+    edited += [dict(items[7], amount=1.25, period="2026-10")]
+    edited += [{"id": 9, "owner": "Carol", "property": "Pier View", "amount": "$10.00"}]
+    for owner in ("Alice", "Bob", "Carol"):
+        for period in ("2026-08", "2026-09", "2026-10"):
+            assert ledger.totals_for(owner, period) == scan(edited, owner, period)
+    assert len(ledger) == len(edited)
+
+
+def test_owner_expenses_keeps_the_period_and_undated_entries():
+    items = entries(50)
+    kept = owner_expenses(items, "Alice", 2026, 9)
+    assert kept == [
+        e for e in items if e["owner"] == "Alice" and e.get("period") in (None, "2026-09")
+    ]
@@ -0,0 +1,10 @@
+import numpy as np
+
+from guesty_reports.money import apply_rate
+
+
+def test_apply_rate_rounds_half_cents_to_even():
+    assert list(apply_rate(np.array([10, 30, 50, 70, 11]), 0.25)) == [2, 8, 12, 18, 3]
+    assert list(apply_rate(np.array([-10, -30]), 0.25)) == [-2, -8]
+    assert apply_rate(85050, 0.25) == 21262
+    assert isinstance(apply_rate(85050, 0.25), int)
@@ -0,0 +1,54 @@
+import re
+
+from guesty_reports import process_data
+from guesty_reports.pdf import statement_flowables, styles, write_statement_pdf
+
+
+def stay(day, code):
+    return {
+        "CHECK-IN DATE": f"2026-09-{day:02d}",
+        "CHECK-OUT DATE": f"2026-09-{day:02d}",
+        "LISTING'S NICKNAME": "Pier View",
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": "$120.00",
+        "ACCOMMODATION FARE": "$100.00",
+        "CLEANING FARE": "$20.00",
+    }
+
+
+def statement(export, n):
+    rows = [stay(1 + i % 28, f"AB-{i}") for i in range(n)]
+    expenses = [{"id": 1, "owner": "Ann", "property": "Pier View", "amount": 40,
+                 "period": "2026-09", "type": "Repair", "vendor": "Fix-It"}]
+    return process_data(export(rows), "Ann", {"type": "draft", "percent": 0.2}, 2026, 9,
+                        expenses), expenses
+
+
+def pages(body: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b", body))
+
+
+def test_pdf_is_deterministic_and_paginates_long_tables(export, tmp_path):
+    st, expenses = statement(export, 3)
+    one, two = tmp_path / "one.pdf", tmp_path / "two.pdf"
+    write_statement_pdf(one, st, expenses)
+    write_statement_pdf(two, st, expenses)
+    assert one.read_bytes().startswith(b"%PDF")
+    assert one.read_bytes() == two.read_bytes()
+    assert pages(one.read_bytes()) == 1
+
+    long, expenses = statement(export, 200)
+    write_statement_pdf(tmp_path / "long.pdf", long, expenses)
+    assert pages((tmp_path / "long.pdf").read_bytes()) > 1
+
+
+def test_layout_shares_styles_and_lists_every_reservation(export):
+    st, expenses = statement(export, 5)
+    assert styles() is styles()
+    flow = statement_flowables(st, expenses)
+    tables = [f for f in flow if hasattr(f, "_cellvalues")]
+    cells = [str(c) for t in tables for row in t._cellvalues for c in row]
+    assert {f"AB-{i}" for i in range(5)} <= set(cells)
+    assert "Fix-It" in cells
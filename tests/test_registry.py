@@ -0,0 +1,78 @@
+from guesty_reports.registry import (
+    UNASSIGNED, WITHHELD, WITHHELD_FILE, OwnershipRegistry, owner_rows, owner_statement,
+    split_export,
+)
+
+
+def stay(listing, code, acc):
+    return {
+        "CHECK-IN DATE": "2026-09-10",
+        "CHECK-OUT DATE": "2026-09-12",
+        "LISTING'S NICKNAME": listing,
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": acc,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": "$0.00",
+    }
+
+
+ROWS = [
+    stay("Beach House", "AB-1", "$100.00"),
+    stay("Pier View", "AB-2", "$200.00"),
+    stay("Dune Cottage", "AB-3", "$400.00"),
+]
+CONFIG = {"type": "draft", "percent": 0.2}
+
+
+def test_unregistered_owner_gets_only_unassigned_rows(export):
+    frame = export(ROWS)
+    owners = {
+        "Alice": {**CONFIG, "listings": [{"listing": "Beach House"}]},
+        "Bob": {**CONFIG, "listings": [{"listing": "Pier View"}]},
+        "Carol": CONFIG,
+    }
+    split = owner_rows(frame, OwnershipRegistry.from_owners(owners))
+
+    def acc(owner):
+        return owner_statement(frame, owner, CONFIG, 2026, 9, [], split).master.acc
+
+    assert (acc("Alice"), acc("Bob"), acc("Carol")) == (10000, 20000, 40000)
+
+
+def test_empty_registry_gives_every_owner_the_whole_frame(export):
+    frame = export(ROWS)
+    split = owner_rows(frame, OwnershipRegistry.from_owners({"Carol": CONFIG}))
+    assert owner_statement(frame, "Carol", CONFIG, 2026, 9, [], split).master.acc == 70000
+
+
+def test_conflicting_owners_rows_are_withheld_from_everyone(export):
+    frame = export(ROWS)
+    owners = {
+        "Alice": {**CONFIG, "listings": [{"listing": "Beach House"}, {"listing": "Pier View"}]},
+        "Bob": {**CONFIG, "listings": [{"listing": "Beach House"}]},
+        "Carol": CONFIG,
+    }
+    registry = OwnershipRegistry.from_owners(owners)
+    assert set(registry.conflicts) == {"Alice", "Bob"}
+    split = owner_rows(frame, registry)
+
+    carol = owner_statement(frame, "Carol", CONFIG, 2026, 9, [], split)
+    assert list(carol.properties) == ["Dune Cottage"]
+    assert sorted(frame["CONFIRMATION CODE"].iloc[split[WITHHELD]]) == ["AB-1", "AB-2"]
+
+
+def test_split_export_keeps_withheld_rows_apart(tmp_path):
+    import pandas as pd
+
+    path = tmp_path / "export.csv"
+    pd.DataFrame(ROWS).to_csv(path, index=False)
+    owners = {
+        "Alice": {"listings": ["Beach House"]},
+        "Bob": {"listings": ["Beach House"]},
+        "Dan": {"listings": ["Pier View"]},
+    }
+    counts = split_export(path, OwnershipRegistry.from_owners(owners), tmp_path / "parts")
+    assert counts == {WITHHELD: 1, "Dan": 1, UNASSIGNED: 1}
+    assert (tmp_path / "parts" / WITHHELD_FILE).exists()
@@ -0,0 +1,60 @@
+from guesty_reports import process_data
+from guesty_reports.render import FRAGMENTS, render_property, render_statement
+
+
+def stay(check_in, listing, code, acc):
+    return {
+        "CHECK-IN DATE": check_in,
+        "CHECK-OUT DATE": check_in,
+        "LISTING'S NICKNAME": listing,
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": acc,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": "$0.00",
+    }
+
+
+ROWS = [
+    stay("2026-09-01", "Beach House", "AB-1", "$100.00"),
+    stay("2026-09-02", "Beach House", "AB-2", "$200.00"),
+    stay("2026-09-03", "Beach House", "AB-3", "$300.00"),
+    stay("2026-09-04", "Pier <View>", "AB-4", "$400.00"),
+]
+CONFIG = {"type": "draft", "percent": 0.2}
+
+
+def test_statement_html_shows_the_totals_escaped(export):
+    st = process_data(export(ROWS), "Ann & Co", CONFIG, 2026, 9, [])
+    html = render_statement(st)
+    assert html.startswith("<!DOCTYPE html>")
+    assert "ANN &amp; CO" in html and "PIER &lt;VIEW&gt;" in html
+    assert "Pier <View>" not in html
+    assert "$1000.00" in html  # master accommodation
+    assert "$200.00" in html  # master PMC at 20%
+    assert html.endswith("</div></body></html>")
+
+
+def test_sections_come_from_the_fragment_cache_until_their_numbers_change(export):
+    FRAGMENTS.clear()
+    st = process_data(export(ROWS), "Ann", CONFIG, 2026, 9, [])
+    first = render_statement(st)
+    hits = FRAGMENTS.hits
+    assert render_statement(st) == first
+    assert FRAGMENTS.hits == hits + 2
+
+    expense = {"id": 1, "owner": "Ann", "property": "Beach House", "amount": 12.5,
+               "period": "2026-09", "type": "Repair", "vendor": "Fix-It"}
+    before = len(FRAGMENTS)
+    beach = render_property(st, "Beach House", [expense])
+    assert "Fix-It" in beach and "$12.50" in beach
+    assert len(FRAGMENTS) == before + 1
+    assert render_property(st, "Pier <View>", [expense]) in first
+
+
+def test_pages_split_the_reservation_table(export):
+    st = process_data(export(ROWS), "Ann", CONFIG, 2026, 9, [])
+    second = render_property(st, "Beach House", page=1, page_size=2)
+    assert "RESERVATIONS 3-3 OF 3" in second
+    assert "AB-3" in second and "AB-1" not in second
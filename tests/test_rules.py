@@ -0,0 +1,62 @@
+"""Platform fees from the rules table, deducted or drafted by owner type."""
+
+from guesty_reports import process_data
+from guesty_reports.engine import Totals
+
+
+def stay(code, platform, acc):
+    return {
+        "CHECK-IN DATE": "2026-09-10",
+        "CHECK-OUT DATE": "2026-09-12",
+        "LISTING'S NICKNAME": "Pier View",
+        "CONFIRMATION CODE": code,
+        "PLATFORM": platform,
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": acc,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": "$0.00",
+    }
+
+
+ROWS = [
+    stay("WB-1", "website", "$100.00"),
+    stay("HA-2", "vrbo", "$200.00"),
+    stay("HA-3", "manual", "$300.00"),
+    stay("MN-4", "Manual", "$400.00"),
+    stay("AB-5", "airbnb2", "$500.00"),
+]
+
+
+def fees_by_code(statement, columns):
+    res = statement.reservations["Pier View"]
+    return dict(zip(res["CONFIRMATION CODE"], res[columns].to_numpy().tolist()))
+
+
+def test_payout_owners_have_fees_deducted(export):
+    st = process_data(export(ROWS), "Ann", {"type": "payout", "percent": 0.2}, 2026, 9, [])
+    fees = fees_by_code(st, ["website_fee", "vrbo_fee"])
+    # 1% on website bookings only, 5% on homeaway/vrbo.
+    assert fees == {
+        "WB-1": [100, 0], "HA-2": [0, 1000], "HA-3": [0, 0], "MN-4": [0, 0], "AB-5": [0, 0],
+    }
+    m = st.master
+    assert (m.website_fee, m.vrbo_fee) == (100, 1000)
+    assert m.owner == m.acc - m.pmc - 1100
+    assert m.draft == m.pmc + m.clean
+
+
+def test_draft_owners_have_fees_added(export):
+    st = process_data(export(ROWS), "Bob", {"type": "draft", "percent": 0.2}, 2026, 9, [])
+    fees = fees_by_code(st, "website_fee")
+    # 1% on website or manual bookings, except ``HA`` codes.
+    assert fees == {"WB-1": 100, "HA-2": 0, "HA-3": 0, "MN-4": 400, "AB-5": 0}
+    m = st.master
+    assert (m.website_fee, m.vrbo_fee) == (500, 0)
+    assert m.owner == m.acc - m.pmc
+    assert m.draft == m.pmc + m.clean + 500
+
+
+def test_fees_are_charged_once_either_way():
+    t = Totals(acc=10000, pmc=2000, website_fee=100, vrbo_fee=500)
+    assert (t.settle(deduct_fees=True).owner, t.draft) == (7400, 2000)
+    assert (t.settle().owner, t.draft) == (8000, 2600)
@@ -0,0 +1,55 @@
+"""``SnapshotStore`` month replacement and the YTD 1099 rollup."""
+
+from guesty_reports import process_data
+from guesty_reports.snapshots import SnapshotStore
+
+CONFIG = {"type": "payout", "percent": 0.2}
+
+
+def stay(check_in, listing, code, acc, tax="$0.00"):
+    return {
+        "CHECK-IN DATE": check_in,
+        "CHECK-OUT DATE": check_in,
+        "LISTING'S NICKNAME": listing,
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": acc,
+        "ACCOMMODATION FARE": acc,
+        "CLEANING FARE": "$0.00",
+        "STATE TAX": tax,
+    }
+
+
+ROWS = [
+    stay("2026-01-10", "Pier View", "AB-1", "$100.00", "$7.00"),
+    stay("2026-02-10", "Pier View", "AB-2", "$200.00"),
+    stay("2026-02-11", "Beach House", "AB-3", "$300.00"),
+    stay("2026-03-10", "Pier View", "AB-4", "$400.00"),
+]
+
+
+def test_ytd_1099_sums_the_recorded_months(export, tmp_path):
+    frame = export(ROWS)
+    statements = {m: process_data(frame, "Ann", CONFIG, 2026, m, []) for m in (1, 2, 3)}
+    store = SnapshotStore(tmp_path / "snapshots.db")
+    try:
+        for st in statements.values():
+            store.record_statement(st)
+        # Re-running a month replaces it rather than adding to it.
+        store.record_statement(statements[2])
+        assert store.months(2026) == [1, 2, 3]
+
+        through_feb = store.report_1099(2026, "Ann", through_month=2)["Ann"]
+        assert through_feb["accommodation"] == 60000
+        assert through_feb["pmc"] == 12000
+        assert through_feb["tax"] == statements[1].master.tax
+        assert through_feb["netReportable"] == through_feb["net"] - through_feb["tax"]
+        assert set(through_feb["properties"]) == {"Pier View", "Beach House"}
+
+        year = store.report_1099(2026)["Ann"]
+        expected = sum(st.master.owner for st in statements.values())
+        assert (year["accommodation"], year["net"]) == (100000, expected)
+        assert store.report_1099(2025) == {}
+    finally:
+        store.close()
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from guesty_reports.datasource import DataSource
+from guesty_reports.github import Conflict, LocalContents
+from guesty_reports.store import (
+    ShardedStore, dump_data, expense_path, normalize, owner_path, settings_path,
+)
+
+DATA = {
+    "owners": {
+        "Alice": {"type": "draft", "percent": 0.2},
+        "Bob": {"type": "payout", "percent": 0.25},
+    },
+    "vendors": [{"id": 1, "name": "Pool Co", "phone": ""}],
+    "properties": {"Beach House": {"MB": True}},
+    "expenses": [
+        {"id": 10, "owner": "Alice", "property": "Beach House", "amount": 75.25,
+         "period": "2026-09"},
+        {"id": 11, "owner": "Alice", "property": "Beach House", "amount": 20,
+         "period": "2026-08"},
+        {"id": 12, "owner": "Bob", "property": "Pier View", "amount": 42.1},
+    ],
+}
+
+
+def by_id(data: dict) -> dict:
+    """``data`` with its expenses in id order; unsharding groups them by shard."""
+    data = normalize(data)
+    return {**data, "expenses": sorted(data["expenses"], key=lambda e: e["id"])}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return LocalContents(tmp_path / "repo")
+
+
+def test_round_trip(repo):
+    ShardedStore(repo).save(DATA)
+    assert by_id(ShardedStore(repo).load()) == by_id(DATA)
+    # The data.json mirror the browser reads holds the same document.
+    assert json.loads(repo.get("data.json")[0]) == normalize(DATA)
+
+
+def test_save_writes_only_changed_shards(repo):
+    store = ShardedStore(repo)
+    store.save(DATA)
+    data = store.load()
+    data["expenses"][0]["amount"] = 80
+    written = store.save(data)
+    assert sorted(written) == sorted([expense_path(data["expenses"][0]), "data.json"])
+    assert store.save(data) == []
+
+
+def test_conflicting_commit_writes_nothing(repo):
+    ShardedStore(repo).save(DATA)
+    first, second = ShardedStore(repo), ShardedStore(repo)
+    a, b = first.load(), second.load()
+    a["owners"]["Alice"]["percent"] = 0.18
+    first.save(a, dirty=[owner_path("Alice")])
+
+    b["owners"]["Alice"]["percent"] = 0.3
+    b["vendors"].append({"id": 2, "name": "Linens", "phone": ""})
+    commits = repo.stats["commit"]
+    with pytest.raises(Conflict):
+        second.save(b, dirty=[owner_path("Alice"), settings_path()])
+    assert repo.stats["commit"] == commits + 1
+    assert by_id(ShardedStore(repo).load()) == by_id(a)
+
+
+def test_browser_save_to_data_json_is_read(repo):
+    ShardedStore(repo).save(DATA)
+    browser = normalize(DATA)
+    browser["owners"]["Carol"] = {"type": "draft", "percent": 0.1}
+    repo.put("data.json", dump_data(browser), "browser", repo.get("data.json")[1])
+
+    store = ShardedStore(repo)
+    assert store.load() == browser
+    store.save(browser)
+    assert by_id(ShardedStore(repo, mirror_legacy=False).load()) == by_id(browser)
+
+
+def test_data_source_serves_the_local_copy_then_revalidates(repo, tmp_path):
+    ShardedStore(repo).save(DATA)
+    snapshot = tmp_path / "cache" / "data.json"
+    assert by_id(DataSource(ShardedStore(repo), snapshot).load(wait=True)) == by_id(DATA)
+
+    changed = normalize(DATA)
+    changed["vendors"] = []
+    writer = ShardedStore(repo)
+    writer.load()
+    writer.save(changed)
+    updates = []
+    source = DataSource(ShardedStore(repo), snapshot, on_update=updates.append)
+    assert by_id(source.load()) == by_id(DATA)
+    reads = repo.stats["get"]
+    source.revalidate().join()
+    assert by_id(source.data) == by_id(changed)
+    assert [by_id(u) for u in updates] == [by_id(changed)]
+    assert repo.stats["get"] > reads
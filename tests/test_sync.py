@@ -0,0 +1,79 @@
+import pytest
+import requests
+
+from guesty_reports.mockguesty import MockGuesty, sample_reservations
+from guesty_reports.sync import GuestyClient, ReservationStore, sync
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReservationStore(tmp_path / "reservations.db")
+    yield store
+    store.close()
+
+
+def client(guesty, **kw) -> GuestyClient:
+    return GuestyClient(guesty.token, guesty.api, session=requests.Session(), **kw)
+
+
+def test_pages_through_every_reservation(store):
+    with MockGuesty(sample_reservations(250)) as guesty:
+        result = sync(client(guesty, page_size=40), store)
+
+    assert result.fetched == 250
+    assert len(store) == 250
+    assert result.requests == 7
+    assert result.cursor == max(r["lastUpdatedAt"] for r in sample_reservations(250))
+
+
+def test_edit_during_sync_skips_nothing(store):
+    reservations = sample_reservations(120)
+    with MockGuesty(reservations) as guesty:
+        c = client(guesty, page_size=25)
+        page = c.page
+        first = min(reservations, key=lambda r: r["lastUpdatedAt"])["_id"]
+
+        def page_then_edit(skip, since=None):
+            out = page(skip, since)
+            if guesty.requests == 1:
+                # Moves a fetched row to the end; offset paging would now skip one.
+                guesty.touch(first, status="cancelled")
+            return out
+
+        c.page = page_then_edit
+        sync(c, store)
+
+    assert len(store) == 120
+    frame = store.frame()
+    assert frame.loc[frame["CONFIRMATION CODE"] == "GY-" + first[3:], "STATUS"].item() == "cancelled"
+
+
+def test_throttled_requests_are_retried(store):
+    sleeps = []
+    with MockGuesty(sample_reservations(50)) as guesty:
+        guesty.fault(1, 429)
+        guesty.fault(3, 503)
+        result = sync(client(guesty, page_size=20, sleep=sleeps.append), store)
+
+    assert len(store) == 50
+    assert result.requests == 5
+    assert sleeps[0] == 0  # Retry-After: 0
+    assert len(sleeps) == 2
+
+
+def test_failed_sync_resumes_from_the_last_stored_page(store):
+    reservations = sample_reservations(100)
+    with MockGuesty(reservations) as guesty:
+        guesty.fault(3, 500)
+        with pytest.raises(requests.HTTPError):
+            sync(client(guesty, page_size=20, attempts=1), store)
+        # The two pages before the failure are stored, with the cursor after them.
+        stored = len(store)
+        assert 30 < stored < 40
+        assert stored == sum(r["lastUpdatedAt"] <= store.cursor for r in reservations)
+
+        result = sync(client(guesty, page_size=20), store)
+
+    assert len(store) == 100
+    assert result.fetched < 100 - stored + 5
+    assert result.cursor == max(r["lastUpdatedAt"] for r in reservations)
@@ -0,0 +1,70 @@
+"""Municipality remittance against the ``MUNICIPALITIES`` table."""
+
+from guesty_reports.engine import TAX_COLUMNS
+from guesty_reports.tax import MUNICIPALITIES, UNFLAGGED, remittance, summarize
+
+
+def stay(check_in, listing, code, **taxes):
+    return {
+        "CHECK-IN DATE": check_in,
+        "CHECK-OUT DATE": check_in,
+        "LISTING'S NICKNAME": listing,
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": "$100.00",
+        "ACCOMMODATION FARE": "$100.00",
+        **{f"{name.upper()} TAX": amount for name, amount in taxes.items()},
+    }
+
+
+ROWS = [
+    stay("2026-09-10", "Pier View", "AB-1", city="$1.00", state="$2.00", county="$3.00",
+         occupancy="$4.00"),
+    stay("2026-09-11", "Pier View", "AB-2", state="$5.00"),
+    stay("2026-09-12", "Pier View", "AB-3"),
+    stay("2026-09-13", "Beach House", "AB-4", city="$6.00", state="$7.00", county="$8.00"),
+    stay("2026-09-14", "Dune Cottage", "AB-5", state="$9.00"),
+    stay("2026-10-01", "Pier View", "AB-6", city="$10.00"),
+]
+PROPERTIES = {
+    "Pier View": {"SC": True, "HC": True, "MB": True},
+    # Two cities: city tax cannot be assigned.
+    "Beach House": {"SC": True, "MB": True, "NMB": True},
+}
+
+
+def test_each_tax_goes_to_the_municipality_that_collects_it(export):
+    frame = export(ROWS)
+    report = remittance(frame, PROPERTIES, [(2026, 9)])
+    assert list(report["municipality"].unique()) == ["SC", "MB", "HC", UNFLAGGED]
+    assert set(report["municipality"]) <= set(MUNICIPALITIES + [UNFLAGGED])
+    by = {(r.municipality, r.property): r for r in report.itertuples()}
+    assert set(by) == {
+        ("SC", "Pier View"), ("SC", "Beach House"), ("MB", "Pier View"),
+        ("HC", "Pier View"), (UNFLAGGED, "Beach House"), (UNFLAGGED, "Dune Cottage"),
+    }
+    assert (by["SC", "Pier View"].state, by["SC", "Pier View"].total) == (700, 700)
+    assert by["SC", "Pier View"].reservations == 2
+    assert (by["MB", "Pier View"].city, by["MB", "Pier View"].occupancy) == (100, 400)
+    assert by["HC", "Pier View"].county == 300
+    assert by["SC", "Beach House"].total == 700
+    # Unflagged county and city tax of one property share one row.
+    unflagged = by[UNFLAGGED, "Beach House"]
+    assert (unflagged.city, unflagged.county, unflagged.state) == (600, 800, 0)
+    assert by[UNFLAGGED, "Dune Cottage"].state == 900
+
+    # Every cent in the period is remitted exactly once.
+    september = frame[frame["month"] == 9]
+    assert report["total"].sum() == september[TAX_COLUMNS].to_numpy().sum() == 4500
+
+    summary = summarize(report).set_index("municipality")
+    assert summary.loc["SC", "total"] == 1400
+    assert summary.loc["SC", "properties"] == 2
+    assert summary.loc[UNFLAGGED, "total"] == 2300
+
+
+def test_remittance_filters_by_month_and_municipality(export):
+    report = remittance(export(ROWS), PROPERTIES, municipalities=["MB"])
+    assert list(report["month"]) == ["2026-09", "2026-10"]
+    assert list(report["total"]) == [500, 1000]
@@ -0,0 +1,62 @@
+"""Spans and counters recorded around a statement run, as a Chrome trace."""
+
+import json
+
+from guesty_reports import process_data, trace
+
+
+def stay(check_in, code):
+    return {
+        "CHECK-IN DATE": check_in,
+        "CHECK-OUT DATE": check_in,
+        "LISTING'S NICKNAME": "Pier View",
+        "CONFIRMATION CODE": code,
+        "PLATFORM": "airbnb2",
+        "STATUS": "confirmed",
+        "TOTAL PAYOUT": "$100.00",
+        "ACCOMMODATION FARE": "$100.00",
+        "CLEANING FARE": "$0.00",
+    }
+
+
+def test_statement_run_writes_a_chrome_trace(export, tmp_path):
+    frame = export([stay("2026-09-10", "AB-1"), stay("2026-08-10", "AB-2")])
+    config = {"type": "payout", "percent": 0.2}
+    path = tmp_path / "trace.json"
+    with trace.tracing(path) as tracer:
+        process_data(frame, "Ann", config, 2026, 9, [])
+    assert not trace.enabled()
+
+    summary = tracer.summary()
+    assert summary["spans"]["filter"]["count"] == 1
+    assert summary["spans"]["aggregate"]["count"] == 1
+    assert summary["counters"]["rows_skipped"] == 1
+
+    events = json.loads(path.read_text())["traceEvents"]
+    assert events[0] == {
+        "name": "process_name", "ph": "M", "pid": tracer.pid, "args": {"name": "guesty_reports"},
+    }
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["filter", "aggregate"]
+    assert spans[0]["args"] == {"owner": "Ann"}
+    assert all(e["dur"] >= 0 for e in spans)
+    counter = next(e for e in events if e["ph"] == "C")
+    assert counter["args"] == {"rows_skipped": 1}
+
+
+def test_drained_counters_merge_into_the_parent():
+    worker = trace.Tracer("worker")
+    worker.count("rows_read", 5)
+    parent = trace.Tracer()
+    parent.merge(worker.drain())
+    worker.count("rows_read", 2)
+    parent.merge(worker.drain())
+    assert parent.counters == {"rows_read": 7}
+    assert worker.counters == {"rows_read": 7}
+    assert [e["args"]["rows_read"] for e in parent.events] == [5, 7]
+
+
+def test_spans_are_free_while_tracing_is_off():
+    assert trace.span("parse") is trace.span("render")
+    trace.count("rows_read", 3)
+    assert trace.current() is None
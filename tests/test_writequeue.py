@@ -0,0 +1,158 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from guesty_reports.cache import ExportCache
+from guesty_reports.datasource import DataSource
+from guesty_reports.github import LocalContents
+from guesty_reports.service import RequestError, StatementServer, StatementService
+from guesty_reports.store import ShardedStore, dump_data, empty_data
+from guesty_reports.writequeue import WriteQueue
+
+
+def seeded(tmp_path) -> LocalContents:
+    repo = LocalContents(tmp_path / "repo")
+    data = empty_data()
+    data["owners"]["Alice"] = {"type": "draft", "percent": 0.2}
+    repo.put("data.json", dump_data(data), "seed")
+    return repo
+
+
+def test_edits_coalesce_into_one_commit(tmp_path):
+    repo = seeded(tmp_path)
+    queue = WriteQueue(ShardedStore(repo), tmp_path / "edits.jsonl", sleep=lambda s: None)
+    expense = {"id": 1, "owner": "Alice", "amount": 5}
+    queue.submit({"op": "add_expense", "expense": expense}, "expenses")
+    queue.submit({"op": "set_owner", "name": "Bob", "config": {"type": "payout"}}, "owners")
+
+    assert queue.flush()
+    assert repo.stats["commit"] == 1
+    saved = json.loads(repo.get("data.json")[0])
+    assert set(saved["owners"]) == {"Alice", "Bob"}
+    assert [e["id"] for e in saved["expenses"]] == [1]
+    assert (tmp_path / "edits.jsonl").read_text() == ""
+
+
+def test_conflict_replays_edits_on_the_remote_change(tmp_path):
+    repo = seeded(tmp_path)
+    queue = WriteQueue(ShardedStore(repo), tmp_path / "edits.jsonl", sleep=lambda s: None)
+    # The browser saves data.json after the queue read it.
+    browser = json.loads(repo.get("data.json")[0])
+    browser["vendors"].append({"id": 7, "name": "Pool Co"})
+    repo.put("data.json", dump_data(browser), "browser", repo.get("data.json")[1])
+
+    queue.submit({"op": "delete_owner", "name": "Alice"}, "owners")
+    assert queue.flush()
+    saved = ShardedStore(repo).load()
+    assert saved["owners"] == {}
+    assert saved["vendors"] == [{"id": 7, "name": "Pool Co"}]
+
+
+def test_failed_reload_after_conflict_is_retried(tmp_path):
+    repo = seeded(tmp_path)
+    store = ShardedStore(repo)
+    queue = WriteQueue(store, tmp_path / "edits.jsonl", sleep=lambda s: None)
+    browser = json.loads(repo.get("data.json")[0])
+    browser["vendors"].append({"id": 7, "name": "Pool Co"})
+    repo.put("data.json", dump_data(browser), "browser", repo.get("data.json")[1])
+
+    load, failures = store.load, [OSError("network down")]
+
+    def flaky_load():
+        if failures:
+            raise failures.pop()
+        return load()
+
+    store.load = flaky_load
+    queue.submit({"op": "delete_owner", "name": "Alice"}, "owners")
+    assert queue.flush()
+    assert [type(e) for e in queue.errors] == [OSError]
+    assert ShardedStore(repo).load()["vendors"] == [{"id": 7, "name": "Pool Co"}]
+
+
+def test_writer_thread_survives_a_failing_flush(tmp_path):
+    queue = WriteQueue(
+        ShardedStore(seeded(tmp_path)), tmp_path / "edits.jsonl", window=0.01, max_delay=0.01,
+        sleep=lambda s: None,
+    ).start()
+    queue.submit({"op": "no_such_op"})
+    deadline = time.monotonic() + 5
+    while not queue.errors and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queue._thread.is_alive()
+    assert isinstance(queue.errors[0], ValueError)
+    with queue.lock:
+        queue.pending.clear()
+    assert queue.close()
+
+
+def test_service_edit_is_visible_before_and_after_commit(tmp_path):
+    repo = seeded(tmp_path)
+    source = DataSource(ShardedStore(repo), tmp_path / "cache" / "data.json")
+    service = StatementService(source, tmp_path, ExportCache(tmp_path / "cache"))
+    service.edits = WriteQueue(
+        ShardedStore(repo), tmp_path / "edits.jsonl", window=60, on_commit=service._committed
+    )
+    op = {"op": "set_owner", "name": "Carol", "config": {"type": "draft"}}
+    with StatementServer(service, port=0) as server:
+        request = urllib.request.Request(
+            server.url + "/edit", data=json.dumps({"ops": [op], "message": "owners"}).encode(),
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as r:
+            assert json.load(r) == {"pending": 1}
+    assert "Carol" in service.data()["owners"]
+    assert repo.stats["commit"] == 0
+
+    service.close()
+    assert repo.stats["commit"] == 1
+    assert not service.edits.pending
+    assert "Carol" in service.data()["owners"]
+
+
+def test_pending_view_is_one_snapshot_per_change(tmp_path):
+    queue = WriteQueue(ShardedStore(seeded(tmp_path)), tmp_path / "edits.jsonl")
+    queue.submit({"op": "set_owner", "name": "Bob", "config": {"type": "payout"}})
+    view = queue.data
+    assert queue.data is view
+    queue.submit({"op": "delete_owner", "name": "Bob"})
+    assert queue.data is not view
+    assert "Bob" in view["owners"] and "Bob" not in queue.data["owners"]
+
+
+def test_edit_needs_the_token_when_one_is_set(tmp_path):
+    repo = seeded(tmp_path)
+    source = DataSource(ShardedStore(repo), tmp_path / "cache" / "data.json")
+    service = StatementService(
+        source, tmp_path, ExportCache(tmp_path / "cache"), edit_token="s3cret",
+        edits=WriteQueue(ShardedStore(repo), tmp_path / "edits.jsonl", window=60),
+    )
+    op = json.dumps({"op": "delete_owner", "name": "Alice"}).encode()
+
+    def post(url, headers):
+        request = urllib.request.Request(url + "/edit", data=op, method="POST", headers=headers)
+        try:
+            with urllib.request.urlopen(request) as r:
+                return r.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    with StatementServer(service, port=0) as server:
+        assert post(server.url, {}) == 401
+        assert post(server.url, {"Authorization": "token wrong"}) == 401
+        assert post(server.url, {"Authorization": "token s3cret"}) == 200
+    assert len(service.edits.pending) == 1
+    service.close()
+
+
+def test_edit_without_a_token_is_local_only(tmp_path):
+    source = DataSource(ShardedStore(seeded(tmp_path)), tmp_path / "cache" / "data.json")
+    service = StatementService(source, tmp_path, ExportCache(tmp_path / "cache"))
+    service.authorize(None, "127.0.0.1")
+    service.authorize(None, "::1")
+    with pytest.raises(RequestError) as exc:
+        service.authorize("token anything", "192.168.1.20")
+    assert exc.value.status == 403